@@ -0,0 +1,647 @@
+"""
+analytics.py - Engine analisis yang dihitung langsung dari data transaksi
+Menggantikan hasil offline (trend_analysis_results.csv, dll.) dengan
+komputasi NumPy yang tervektorisasi
+"""
+
+import json
+import os
+
+from constants import CUSTOMER_CATEGORIES, OUTLET_CATEGORY_LABELS, TREND_CUTOFF, TREND_STATUS
+from ingest import coalesce_parts, ingest_parts, to_month, write_atomic
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+TREND_COLUMNS = [
+    'Produk', 'Slope_Kg_Per_Bulan', 'Intercept', 'R_Squared', 'Status',
+    'Jumlah_Bulan', 'Total_Kg', 'Rata_Rata_Kg',
+]
+
+# ==================== MATRIX BUILDING ====================
+
+def monthly_product_matrix(df, product_col='Asal Daerah', value_col='Qty Kg', first_month=None):
+    """
+    Agregasi transaksi ke matrix bulan × produk dalam satu kali bincount.
+    `first_month` (ordinal datetime64[M]) menyamakan baris pertama antar subset
+    data; default bulan pertama df. Return (months, products, values, counts)
+    """
+    month_ordinal = df['Tanggal'].values.astype('datetime64[M]').astype('int64')
+    if first_month is None:
+        first_month = month_ordinal.min()
+    month_idx = month_ordinal - first_month
+    n_months = int(month_idx.max()) + 1
+
+    product_codes, products = pd.factorize(df[product_col], sort=True)
+    n_products = len(products)
+
+    flat = month_idx * n_products + product_codes
+    size = n_months * n_products
+    values = np.bincount(flat, weights=df[value_col].values, minlength=size)
+    counts = np.bincount(flat, minlength=size)
+
+    months = pd.DatetimeIndex(np.arange(first_month, first_month + n_months).astype('datetime64[M]'))
+    return (
+        months,
+        pd.Index(list(products), dtype='object'),
+        values.reshape(n_months, n_products),
+        counts.reshape(n_months, n_products),
+    )
+
+# ==================== TREND ENGINE ====================
+
+def trend_from_sums(n, sum_x, sum_y, sum_xy, sum_xx, sum_yy):
+    """Slope, intercept dan R² least-squares dari sufficient statistics (array per produk)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = n * sum_xy - sum_x * sum_y
+        var_x = n * sum_xx - sum_x ** 2
+        var_y = n * sum_yy - sum_y ** 2
+        slope = np.where(var_x > 0, cov / var_x, 0.0)
+        intercept = np.where(n > 0, (sum_y - slope * sum_x) / n, 0.0)
+        r_squared = np.where((var_x > 0) & (var_y > 0), cov ** 2 / (var_x * var_y), 0.0)
+    return slope, intercept, r_squared
+
+def fit_linear_trends(x, values, mask):
+    """
+    Fit satu garis least-squares per kolom (produk) sekaligus. Bulan tanpa
+    transaksi (mask False) tidak ikut dihitung
+    """
+    weights = mask.astype('float64')
+    weighted = values * weights
+    return trend_from_sums(
+        weights.sum(axis=0),
+        x @ weights,
+        weighted.sum(axis=0),
+        x @ weighted,
+        (x * x) @ weights,
+        (values * weighted).sum(axis=0),
+    )
+
+def classify_trend(slope):
+    """Label status trend berdasarkan TREND_CUTOFF"""
+    return np.select(
+        [slope > TREND_CUTOFF['rising_star_threshold'], slope < TREND_CUTOFF['declining_threshold']],
+        [TREND_STATUS['rising'], TREND_STATUS['declining']],
+        default=TREND_STATUS['stable'],
+    )
+
+def trend_table(products, n, total, slope, intercept, r_squared):
+    """Susun hasil fit ke format trend_analysis_results.csv"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(n > 0, total / n, 0.0)
+    result = pd.DataFrame({
+        'Produk': products,
+        'Slope_Kg_Per_Bulan': np.round(slope, 2),
+        'Intercept': np.round(intercept, 2),
+        'R_Squared': np.round(r_squared, 4),
+        'Status': classify_trend(slope),
+        'Jumlah_Bulan': n.astype('int64'),
+        'Total_Kg': total.astype('float64'),
+        'Rata_Rata_Kg': np.round(mean, 2),
+    })
+    # Produk sebagai tie-breaker: urutan tetap sama walau produk dihitung per shard
+    return result.sort_values(
+        ['Slope_Kg_Per_Bulan', 'Produk'], ascending=[False, True], ignore_index=True,
+    )
+
+def compute_trend_results(df, product_col='Asal Daerah', first_month=None):
+    """
+    Trend kg per bulan untuk semua produk; x = bulan ke-1, 2, ... sejak bulan
+    pertama data (atau `first_month` jika df hanya sebagian produk)
+    """
+    if df.empty:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+
+    months, products, kg, counts = monthly_product_matrix(df, product_col, first_month=first_month)
+    x = np.arange(1, len(months) + 1, dtype='float64')
+    mask = counts > 0
+    slope, intercept, r_squared = fit_linear_trends(x, kg, mask)
+    return trend_table(products, mask.sum(axis=0), kg.sum(axis=0), slope, intercept, r_squared)
+
+# ==================== INCREMENTAL TREND ====================
+
+_STAT_FIELDS = ('n', 'sum_x', 'sum_y', 'sum_xy', 'sum_xx', 'sum_yy')
+
+class TrendStatsStore:
+    """
+    Sufficient statistics trend per produk (n, Σx, Σy, Σxy, Σx², Σy²) plus kg
+    per bulan × produk. Update dari baris transaksi baru hanya menyentuh
+    produk yang terdampak, sehingga histori tidak perlu di-scan ulang
+    """
+
+    def __init__(self, product_col='Asal Daerah'):
+        self.product_col = product_col
+        self.products = []
+        self.base_month = None          # Ordinal bulan untuk x = 1
+        self.month_kg = np.zeros((0, 0))
+        self.month_count = np.zeros((0, 0), dtype='int64')
+        self.stats = {field: np.zeros(0) for field in _STAT_FIELDS}
+        self.parts = []                 # Bagian sumber yang sudah dihitung (lihat ingest_parts)
+        self.rows = 0
+        self._product_index = {}
+
+    # ----- growth -----
+
+    def _register_products(self, names):
+        new = [name for name in names if name not in self._product_index]
+        if new:
+            for name in new:
+                self._product_index[name] = len(self.products)
+                self.products.append(name)
+            pad = len(new)
+            self.month_kg = np.pad(self.month_kg, ((0, 0), (0, pad)))
+            self.month_count = np.pad(self.month_count, ((0, 0), (0, pad)))
+            for field in _STAT_FIELDS:
+                self.stats[field] = np.pad(self.stats[field], (0, pad))
+        return np.array([self._product_index[name] for name in names], dtype='int64')
+
+    def _rebase(self, first_month):
+        """Geser x supaya bulan yang lebih awal dari base_month menjadi x = 1"""
+        shift = self.base_month - first_month
+        s = self.stats
+        s['sum_xx'] += 2 * shift * s['sum_x'] + shift ** 2 * s['n']
+        s['sum_xy'] += shift * s['sum_y']
+        s['sum_x'] += shift * s['n']
+        self.month_kg = np.pad(self.month_kg, ((shift, 0), (0, 0)))
+        self.month_count = np.pad(self.month_count, ((shift, 0), (0, 0)))
+        self.base_month = first_month
+
+    def _ensure_months(self, first_month, last_month):
+        if self.base_month is None:
+            self.base_month = first_month
+        elif first_month < self.base_month:
+            self._rebase(first_month)
+        needed = last_month - self.base_month + 1
+        if needed > self.month_kg.shape[0]:
+            extra = needed - self.month_kg.shape[0]
+            self.month_kg = np.pad(self.month_kg, ((0, extra), (0, 0)))
+            self.month_count = np.pad(self.month_count, ((0, extra), (0, 0)))
+
+    # ----- update -----
+
+    def update(self, df):
+        """Tambahkan baris transaksi baru; return index produk yang terdampak"""
+        if df.empty:
+            return np.zeros(0, dtype='int64')
+
+        months = df['Tanggal'].values.astype('datetime64[M]')
+        local_codes, names = pd.factorize(df[self.product_col])
+        kg = df['Qty Kg'].values
+        # Produk kosong (code -1) atau tanggal kosong tidak masuk statistik, tapi
+        # tetap dihitung di rows (posisi baris berikutnya di frame)
+        valid = (local_codes >= 0) & ~np.isnat(months)
+        if not valid.any():
+            self.rows += len(df)
+            return np.zeros(0, dtype='int64')
+        if not valid.all():
+            months, local_codes, kg = months[valid], local_codes[valid], kg[valid]
+        month_ordinal = months.astype('int64')
+        product_idx = self._register_products(list(names))
+        self._ensure_months(int(month_ordinal.min()), int(month_ordinal.max()))
+
+        # Agregasi baris baru ke pasangan (bulan, produk) yang unik
+        n_products = len(self.products)
+        flat = (month_ordinal - self.base_month) * n_products + product_idx[local_codes]
+        keys, inverse = np.unique(flat, return_inverse=True)
+        delta_kg = np.bincount(inverse, weights=kg)
+        delta_count = np.bincount(inverse)
+        month_idx, prod = np.divmod(keys, n_products)
+
+        old_kg = self.month_kg[month_idx, prod]
+        new_kg = old_kg + delta_kg
+        new_month = (self.month_count[month_idx, prod] == 0).astype('float64')
+        x = month_idx + 1.0
+
+        s = self.stats
+        np.add.at(s['n'], prod, new_month)
+        np.add.at(s['sum_x'], prod, x * new_month)
+        np.add.at(s['sum_xx'], prod, x * x * new_month)
+        np.add.at(s['sum_y'], prod, delta_kg)
+        np.add.at(s['sum_xy'], prod, x * delta_kg)
+        np.add.at(s['sum_yy'], prod, new_kg ** 2 - old_kg ** 2)
+
+        self.month_kg[month_idx, prod] = new_kg
+        self.month_count[month_idx, prod] += delta_count
+        self.rows += len(df)
+        return np.unique(prod)
+
+    def results(self, products=None):
+        """Tabel trend (format trend_analysis_results.csv), opsional hanya untuk index produk tertentu"""
+        idx = np.arange(len(self.products)) if products is None else np.asarray(products)
+        s = {field: values[idx] for field, values in self.stats.items()}
+        slope, intercept, r_squared = trend_from_sums(
+            s['n'], s['sum_x'], s['sum_y'], s['sum_xy'], s['sum_xx'], s['sum_yy']
+        )
+        names = np.array(self.products, dtype='object')[idx]
+        return trend_table(names, s['n'], s['sum_y'], slope, intercept, r_squared)
+
+    # ----- persistence -----
+
+    def save(self, path):
+        """Simpan store ke .npz (atomic)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    products=np.array(self.products, dtype='str'),
+                    month_kg=self.month_kg,
+                    month_count=self.month_count,
+                    meta=np.array([
+                        self.product_col, str(self.base_month), str(self.rows), json.dumps(self.parts),
+                    ]),
+                    **self.stats,
+                )
+        write_atomic(path, write)
+
+    @classmethod
+    def load(cls, path):
+        """Load store dari .npz; return None jika tidak ada atau rusak"""
+        try:
+            with np.load(path) as data:
+                product_col, base_month, rows, parts = data['meta'].tolist()
+                store = cls(product_col)
+                store.products = data['products'].tolist()
+                store.month_kg = data['month_kg']
+                store.month_count = data['month_count']
+                store.stats = {field: data[field] for field in _STAT_FIELDS}
+        except (OSError, KeyError, ValueError):
+            return None
+        store._product_index = {name: i for i, name in enumerate(store.products)}
+        store.base_month = None if base_month == 'None' else int(base_month)
+        store.rows = int(rows)
+        store.parts = json.loads(parts)
+        return store
+
+def sync_trend_store(df, store_path, product_col='Asal Daerah'):
+    """
+    Sinkronkan store dengan frame transaksi. Bagian sumber sama: pakai store
+    apa adanya. Frame = bagian lama + bagian baru di akhir (mis. partisi bulan
+    baru): update hanya baris baru. Selain itu store dibangun ulang
+    """
+    parts = ingest_parts(df)
+    store = TrendStatsStore.load(store_path) if parts else None
+    if store is not None and store.product_col == product_col:
+        if store.parts == parts:
+            return store
+        # Bagian file yang di-append bisa sudah digabung checkpoint ingest (coalesce_parts)
+        if any(0 < len(known) < len(parts) and parts[:len(known)] == known
+               for known in (store.parts, coalesce_parts(store.parts))):
+            store.update(df.iloc[store.rows:])
+        else:
+            store = None
+    else:
+        store = None
+
+    if store is None:
+        store = TrendStatsStore(product_col)
+        store.update(df)
+    store.parts = parts
+    if parts:
+        try:
+            store.save(store_path)
+        except OSError:
+            pass
+    return store
+
+# ==================== PREFERENCE ENGINE ====================
+
+PREFERENCE_COLUMNS = ['Produk', 'Tipe_Kedai', 'Jumlah_Transaksi', 'Preference_Pct', 'Rata_Rata_Revenue']
+
+def _category_order(labels):
+    """Urutan kategori kedai: sesuai CUSTOMER_CATEGORIES, label lain alfabetis di belakang"""
+    categories = [c for c in CUSTOMER_CATEGORIES if c in labels]
+    return categories + sorted(set(labels) - set(categories))
+
+def _outlet_category_codes(values):
+    """Integer code kategori kedai, urut sesuai CUSTOMER_CATEGORIES"""
+    raw_codes, raw_uniques = pd.factorize(values)
+    labels = [OUTLET_CATEGORY_LABELS.get(value, value) for value in raw_uniques]
+    categories = _category_order(labels)
+    position = {label: i for i, label in enumerate(categories)}
+    remap = np.array([position[label] for label in labels], dtype='int64')
+    return remap[raw_codes], categories
+
+def compute_preference_matrix(df, product_col='Asal Daerah', category_col='Kategori Kedai'):
+    """
+    Contingency table produk × kategori kedai (jumlah transaksi & revenue)
+    dalam satu bincount atas integer code
+    """
+    if df.empty:
+        return {'products': [], 'categories': [], 'counts': np.zeros((0, 0)), 'revenue': np.zeros((0, 0))}
+
+    product_codes, products = pd.factorize(df[product_col], sort=True)
+    category_codes, categories = _outlet_category_codes(df[category_col])
+    shape = (len(products), len(categories))
+
+    flat = product_codes * shape[1] + category_codes
+    size = shape[0] * shape[1]
+    return {
+        'products': list(products),
+        'categories': categories,
+        'counts': np.bincount(flat, minlength=size).reshape(shape),
+        'revenue': np.bincount(flat, weights=df['Jumlah'].values, minlength=size).reshape(shape),
+    }
+
+def preference_percentages(matrix):
+    """Persentase transaksi tiap produk per kategori kedai (tiap baris = 100%)"""
+    counts = matrix['counts']
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, counts * 100.0 / totals, 0.0)
+
+def preference_table(matrix):
+    """Bentuk panjang (format preference_analysis_results.csv), tanpa sel kosong"""
+    counts = matrix['counts']
+    product_idx, category_idx = np.nonzero(counts)
+    n = counts[product_idx, category_idx]
+    result = pd.DataFrame({
+        'Produk': np.array(matrix['products'], dtype='object')[product_idx],
+        'Tipe_Kedai': np.array(matrix['categories'], dtype='object')[category_idx],
+        'Jumlah_Transaksi': n,
+        'Preference_Pct': np.round(preference_percentages(matrix)[product_idx, category_idx], 1),
+        'Rata_Rata_Revenue': np.round(matrix['revenue'][product_idx, category_idx] / n, 0),
+    }, columns=PREFERENCE_COLUMNS)
+    return result.sort_values(['Produk', 'Jumlah_Transaksi'], ascending=[True, False], ignore_index=True)
+
+def _top_with_other(totals, limit):
+    """Index yang dipertahankan (top-N menurut total, urutan asli) dan sisanya"""
+    if len(totals) <= limit:
+        return np.arange(len(totals)), np.arange(0)
+    order = np.argsort(-totals, kind='stable')
+    return np.sort(order[:limit - 1]), order[limit - 1:]
+
+def _fold(values, keep, rest, axis):
+    kept = np.take(values, keep, axis=axis)
+    if not len(rest):
+        return kept
+    other = np.take(values, rest, axis=axis).sum(axis=axis, keepdims=True)
+    return np.concatenate([kept, other], axis=axis)
+
+def condense_preference_matrix(matrix, max_products, max_categories):
+    """
+    Ringkas matrix preferensi untuk visualisasi: top-N produk / kategori menurut
+    jumlah transaksi, sisanya dijumlahkan ke baris/kolom "Lainnya". Total tiap
+    baris tetap sama sehingga persentase preferensi tidak berubah.
+    """
+    counts, revenue = matrix['counts'], matrix['revenue']
+    products, categories = list(matrix['products']), list(matrix['categories'])
+
+    keep, rest = _top_with_other(counts.sum(axis=1), max_products)
+    counts, revenue = _fold(counts, keep, rest, 0), _fold(revenue, keep, rest, 0)
+    products = [products[i] for i in keep] + ([f"Lainnya ({len(rest)} produk)"] if len(rest) else [])
+    folded_products = len(rest)
+
+    keep, rest = _top_with_other(counts.sum(axis=0), max_categories)
+    counts, revenue = _fold(counts, keep, rest, 1), _fold(revenue, keep, rest, 1)
+    categories = [categories[i] for i in keep] + ([f"Lainnya ({len(rest)} kategori)"] if len(rest) else [])
+
+    return {
+        'products': products,
+        'categories': categories,
+        'counts': counts,
+        'revenue': revenue,
+        'folded': {'products': folded_products, 'categories': len(rest)},
+    }
+
+# ==================== OLAP CUBE ====================
+
+CUBE_DIMS = ('month', 'product', 'category', 'region')
+CUBE_MEASURES = ('kg', 'revenue', 'count')
+
+def _narrow_codes(codes, size):
+    """Integer dtype terkecil yang cukup untuk menampung code dimensi"""
+    return codes.astype(np.min_scalar_type(max(size - 1, 0)))
+
+def build_cube(df, aggregated=False):
+    """
+    Materialisasi cube bulan × produk × kategori kedai × asal daerah. Hanya sel
+    yang berisi transaksi yang disimpan (coordinate format), dengan jumlah kg,
+    revenue dan transaksi per sel. aggregated=True: tiap baris df sudah berupa
+    jumlah per grup (kolom kg, revenue, count), mis. hasil groupBy Spark
+    """
+    if df.empty:
+        return {
+            'dims': {'month': np.zeros(0, dtype='datetime64[M]'), 'product': [], 'category': [], 'region': []},
+            'coords': {dim: np.zeros(0, dtype='uint8') for dim in CUBE_DIMS},
+            **{measure: np.zeros(0, dtype='int64') for measure in CUBE_MEASURES},
+        }
+
+    month_ordinal = df['Tanggal'].values.astype('datetime64[M]').astype('int64')
+    first_month = month_ordinal.min()
+    month_codes = month_ordinal - first_month
+    product_codes, products = pd.factorize(df['Nama Produk'], sort=True)
+    category_codes, categories = _outlet_category_codes(df['Kategori Kedai'])
+    region_codes, regions = pd.factorize(df['Asal Daerah'], sort=True)
+
+    dims = {
+        'month': np.arange(first_month, first_month + month_codes.max() + 1).astype('datetime64[M]'),
+        'product': list(products),
+        'category': categories,
+        'region': list(regions),
+    }
+    shape = tuple(len(dims[dim]) for dim in CUBE_DIMS)
+    flat = np.ravel_multi_index((month_codes, product_codes, category_codes, region_codes), shape)
+    cell, keys = pd.factorize(flat)
+    coords = np.unravel_index(keys, shape)
+
+    return {
+        'dims': dims,
+        'coords': {dim: _narrow_codes(c, size) for dim, c, size in zip(CUBE_DIMS, coords, shape)},
+        'kg': np.bincount(cell, weights=df['kg' if aggregated else 'Qty Kg'].values, minlength=len(keys)).astype('int64'),
+        'revenue': np.bincount(cell, weights=df['revenue' if aggregated else 'Jumlah'].values, minlength=len(keys)).astype('int64'),
+        'count': np.bincount(cell, weights=df['count'].values if aggregated else None, minlength=len(keys)).astype('int64'),
+    }
+
+def merge_cubes(*cubes):
+    """
+    Gabungkan beberapa cube sekaligus (k-way), mis. cube baris lama + cube
+    baris yang di-append, atau cube parsial per rentang byte. Hasilnya sama
+    dengan build_cube atas seluruh baris berurutan: label dimensi di-union
+    dengan urutan yang sama dan sel cube berikutnya menyusul sel sebelumnya
+    """
+    cubes = [cube for cube in cubes if len(cube['count'])]
+    if not cubes:
+        return build_cube(pd.DataFrame())
+    if len(cubes) == 1:
+        return cubes[0]
+
+    months = np.concatenate([cube['dims']['month'] for cube in cubes])
+    dims = {
+        'month': np.arange(months.min(), months.max() + 1),
+        'product': sorted(set().union(*(cube['dims']['product'] for cube in cubes))),
+        'category': _category_order(set().union(*(cube['dims']['category'] for cube in cubes))),
+        'region': sorted(set().union(*(cube['dims']['region'] for cube in cubes))),
+    }
+    shape = tuple(len(dims[dim]) for dim in CUBE_DIMS)
+    # Lookup label -> code sekali per dimensi
+    codes = {dim: {label: i for i, label in enumerate(dims[dim])} for dim in CUBE_DIMS if dim != 'month'}
+
+    flat = []
+    for cube in cubes:
+        coords = [
+            cube['coords']['month'].astype('int64') + int((cube['dims']['month'][0] - dims['month'][0]).astype('int64'))
+            if dim == 'month' else
+            np.array([codes[dim][label] for label in cube['dims'][dim]], dtype='int64')[cube['coords'][dim]]
+            for dim in CUBE_DIMS
+        ]
+        flat.append(np.ravel_multi_index(coords, shape))
+    cell, keys = pd.factorize(np.concatenate(flat))
+    coords = np.unravel_index(keys, shape)
+
+    return {
+        'dims': dims,
+        'coords': {dim: _narrow_codes(c, size) for dim, c, size in zip(CUBE_DIMS, coords, shape)},
+        **{
+            measure: np.bincount(
+                cell, weights=np.concatenate([cube[measure] for cube in cubes]), minlength=len(keys)
+            ).astype('int64')
+            for measure in CUBE_MEASURES
+        },
+    }
+
+def cube_mask(cube, **filters):
+    """Mask sel cube untuk filter {dimensi: label yang dipilih}; None = semua sel"""
+    mask = None
+    for dim, selected in filters.items():
+        if selected is None:
+            continue
+        labels = cube['dims'][dim]
+        wanted = np.isin(labels, np.asarray(list(selected), dtype=np.asarray(labels).dtype))
+        dim_mask = wanted[cube['coords'][dim]]
+        mask = dim_mask if mask is None else mask & dim_mask
+    return mask
+
+def cube_rollup(cube, dims, measure, mask=None):
+    """Agregasi measure ke array dense atas dimensi yang diminta (dimensi lain dijumlahkan)"""
+    if isinstance(dims, str):
+        dims = (dims,)
+    shape = tuple(len(cube['dims'][dim]) for dim in dims)
+    coords = [cube['coords'][dim] for dim in dims]
+    values = cube[measure]
+    if mask is not None:
+        coords = [c[mask] for c in coords]
+        values = values[mask]
+    flat = np.ravel_multi_index(coords, shape) if shape else np.zeros(len(values), dtype='int64')
+    size = int(np.prod(shape))
+    return np.bincount(flat, weights=values, minlength=size).reshape(shape)
+
+def cube_metrics(cube, mask=None):
+    """Key metrics (format calculate_metrics) dari cube"""
+    count_by_region = cube_rollup(cube, 'region', 'count', mask)
+    transactions = int(count_by_region.sum())
+    if transactions == 0:
+        return {
+            'total_revenue': 0,
+            'total_volume': 0,
+            'avg_price': 0,
+            'total_transactions': 0,
+            'date_range': 'N/A',
+            'top_product': 'N/A'
+        }
+
+    revenue = cube_rollup(cube, (), 'revenue', mask).item()
+    active_months = cube['dims']['month'][cube_rollup(cube, 'month', 'count', mask) > 0]
+    first, last = pd.to_datetime(active_months[[0, -1]])
+    return {
+        'total_revenue': int(revenue),
+        'total_volume': int(cube_rollup(cube, (), 'kg', mask).item()),
+        'avg_price': revenue / transactions,
+        'total_transactions': transactions,
+        'date_range': f"{first.strftime('%d/%m/%Y')} - {last.strftime('%d/%m/%Y')}",
+        'top_product': cube['dims']['region'][int(count_by_region.argmax())],
+    }
+
+def cube_monthly_revenue(cube, mask=None):
+    """Revenue per bulan (format get_monthly_trend) dari cube"""
+    revenue = cube_rollup(cube, 'month', 'revenue', mask)
+    months = pd.to_datetime(cube['dims']['month']) + pd.offsets.MonthEnd(0)
+    return pd.DataFrame({'Month': months, 'Revenue': revenue})
+
+def cube_preference_matrix(cube, product_dim='region', mask=None):
+    """Matrix preferensi (format compute_preference_matrix) dari cube"""
+    return {
+        'products': list(cube['dims'][product_dim]),
+        'categories': list(cube['dims']['category']),
+        'counts': cube_rollup(cube, (product_dim, 'category'), 'count', mask).astype('int64'),
+        'revenue': cube_rollup(cube, (product_dim, 'category'), 'revenue', mask),
+    }
+
+def cube_trend_results(cube, mask=None, product_dim='region'):
+    """Trend kg per bulan per produk dari cube (untuk data yang sedang difilter)"""
+    kg = cube_rollup(cube, ('month', product_dim), 'kg', mask)
+    counts = cube_rollup(cube, ('month', product_dim), 'count', mask)
+    present = counts > 0
+    active_months = np.flatnonzero(present.any(axis=1))
+    active_products = np.flatnonzero(present.any(axis=0))
+    if not len(active_products):
+        return pd.DataFrame(columns=TREND_COLUMNS)
+
+    # x = 1 di bulan pertama yang berisi data, sama seperti compute_trend_results
+    kg = kg[active_months[0]:, active_products]
+    present = present[active_months[0]:, active_products]
+    x = np.arange(1, kg.shape[0] + 1, dtype='float64')
+    slope, intercept, r_squared = fit_linear_trends(x, kg, present)
+    products = np.array(cube['dims'][product_dim], dtype='object')[active_products]
+    return trend_table(products, present.sum(axis=0), kg.sum(axis=0), slope, intercept, r_squared)
+
+# ==================== CUBE INDEX ====================
+
+def build_cube_index(cube):
+    """
+    Index per dimensi: posisi sel cube diurutkan per code (CSR), sehingga sel
+    untuk satu label atau rentang bulan adalah satu slice
+    """
+    index = {}
+    for dim in CUBE_DIMS:
+        codes = cube['coords'][dim]
+        offsets = np.zeros(len(cube['dims'][dim]) + 1, dtype='int64')
+        np.cumsum(np.bincount(codes, minlength=len(cube['dims'][dim])), out=offsets[1:])
+        index[dim] = {
+            'positions': np.argsort(codes, kind='stable').astype(np.min_scalar_type(max(len(codes) - 1, 0))),
+            'offsets': offsets,
+        }
+    return index
+
+def _label_codes(cube, dim, labels):
+    lookup = {label: code for code, label in enumerate(cube['dims'][dim])}
+    return np.array(sorted(lookup[label] for label in labels if label in lookup), dtype='int64')
+
+def select_cells(cube, index, month_range=None, **filters):
+    """
+    Posisi sel cube yang lolos semua filter (irisan antar dimensi). Filter
+    kosong atau rentang bulan penuh diabaikan; return None jika tidak ada filter aktif
+    """
+    selected = {}
+    if month_range is not None:
+        months = cube['dims']['month']
+        lo = int(np.searchsorted(months, to_month(month_range[0]), side='left'))
+        hi = int(np.searchsorted(months, to_month(month_range[1]), side='right'))
+        if lo > 0 or hi < len(months):
+            selected['month'] = np.arange(lo, hi)
+    for dim, labels in filters.items():
+        if labels:
+            selected[dim] = _label_codes(cube, dim, labels)
+    if not selected:
+        return None
+
+    # Mulai dari dimensi dengan posting list terkecil, lalu saring dengan lookup dimensi lain
+    sizes = {
+        dim: int((index[dim]['offsets'][codes + 1] - index[dim]['offsets'][codes]).sum())
+        for dim, codes in selected.items()
+    }
+    first = min(sizes, key=sizes.get)
+    entry = index[first]
+    candidates = np.concatenate(
+        [entry['positions'][entry['offsets'][c]:entry['offsets'][c + 1]] for c in selected[first]]
+        or [np.zeros(0, dtype='int64')]
+    )
+    for dim, codes in selected.items():
+        if dim == first or not len(candidates):
+            continue
+        wanted = np.zeros(len(cube['dims'][dim]), dtype=bool)
+        wanted[codes] = True
+        candidates = candidates[wanted[cube['coords'][dim][candidates]]]
+    return np.sort(candidates)
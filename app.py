@@ -7,12 +7,17 @@ streamlit run app.py
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+import instrument
 from constants import *
 from utils import *
+from lazy import lazy_import
+from forecast import forecast_table, forecast_totals
+from query import engine_name, normalize_query, table_schema
+from refresh import refresh_status, refreshing
 from datetime import datetime
 
+pd = lazy_import('pandas')
+
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
     page_title=PAGE_CONFIG['page_title'],
@@ -91,17 +96,102 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ==================== PAGE REGISTRY ====================
+# Artefak data yang dipakai tiap halaman / bagian dashboard (lihat PAGE_ARTIFACTS).
+# Hanya artefak yang dideklarasikan yang dimuat atau dihitung.
+PAGES = {
+    "📊 Dashboard": ('cube',),
+    "📈 Analisis Trend": ('cube', 'trend'),
+    "❤️ Preferensi Customer": ('cube', 'preference_matrix', 'preference'),
+    "📋 Action Plan": (),
+    "🎯 KPI & Proyeksi": ('cube', 'monthly_revenue', 'forecast', 'scenarios'),
+    "🔎 Query": ('transactions',),
+    "ℹ️ Tentang": (),
+}
+
+DASHBOARD_SECTIONS = {
+    "🎯 Tujuan & Latar Belakang": (),
+    "📊 Key Metrics": ('metrics',),
+    "📈 Trend Analysis": ('trend',),
+    "❤️ Preference Analysis": ('preference_matrix', 'preference'),
+    "💰 Financial Projections": ('monthly_revenue', 'scenarios'),
+}
+
 # ==================== SIDEBAR ====================
 with st.sidebar:
     st.markdown("### ☕ Galunggung Green Glory")
     st.markdown("---")
     
     # Navigation
-    page = st.radio(
-        "Navigasi:",
-        ["📊 Dashboard", "📈 Analisis Trend", "❤️ Preferensi Customer", 
-         "📋 Action Plan", "🎯 KPI & Proyeksi", "ℹ️ Tentang"]
-    )
+    page = st.radio("Navigasi:", list(PAGES))
+    needs = set(PAGES[page])
+    instrument.start_run(page)
+    instrument.section("sidebar")
+    
+    if page == "📊 Dashboard":
+        sections = st.multiselect(
+            "Bagian Dashboard:",
+            list(DASHBOARD_SECTIONS),
+            default=list(DASHBOARD_SECTIONS)
+        )
+        for section in sections:
+            needs.update(DASHBOARD_SECTIONS[section])
+    
+    # Filter data (irisan index per dimensi atas sel cube)
+    selection = None
+    if 'cube' in needs:
+        cube = load_sales_cube()
+        st.markdown("---")
+        st.markdown("### 🔎 Filter Data")
+        
+        month_range = None
+        months = list(cube['dims']['month'])
+        if len(months) > 1:
+            month_range = st.select_slider(
+                "Periode:",
+                options=months,
+                value=(months[0], months[-1]),
+                format_func=lambda m: pd.Timestamp(m).strftime('%b %Y')
+            )
+        
+        selection = select_cells(
+            cube,
+            load_cube_index(),
+            month_range=month_range,
+            product=st.multiselect("Produk:", cube['dims']['product']),
+            category=st.multiselect("Kategori Kedai:", cube['dims']['category']),
+            region=st.multiselect("Asal Daerah:", cube['dims']['region'])
+        )
+        if selection is not None:
+            st.caption(f"{len(selection):,} sel cube terpilih")
+    
+    # Halaman frame transaksi mentah: periode menentukan partisi yang dibaca
+    period = None
+    if 'transactions' in needs and 'cube' not in needs:
+        months = dataset_months()
+        if months is not None and len(months) > 1:
+            st.markdown("---")
+            st.markdown("### 🔎 Filter Data")
+            start, end = st.select_slider(
+                "Periode:",
+                options=list(months),
+                value=(months[0], months[-1]),
+                format_func=lambda m: pd.Timestamp(m).strftime('%b %Y')
+            )
+            if start > months[0] or end < months[-1]:
+                period = (start, end)
+    
+    # Versi data yang sedang disajikan (loader stale-while-revalidate, lihat refresh.py)
+    data_status = refresh_status()['load_transaction_data']
+    if data_status is not None:
+        st.caption(
+            f"🗂️ Versi data `{(data_status['version'] or '-')[:8]}` · "
+            f"dimuat {datetime.fromtimestamp(data_status['loaded_at']):%d/%m %H:%M}"
+        )
+        if refreshing():
+            st.caption("🔄 Memperbarui data di latar belakang...")
+        elif data_status['error']:
+            st.caption("⚠️ Refresh terakhir gagal, menampilkan versi data sebelumnya")
     
     st.markdown("---")
     st.markdown(SIDEBAR_INFO)
@@ -117,386 +207,414 @@ with st.sidebar:
     with col2:
         if st.button("📊 Data CSV"):
             st.info("Link download akan disediakan")
+    
+    st.markdown("---")
+    debug_timing = st.checkbox("🐞 Debug timing", help="Tampilkan waktu loader, agregasi & chart untuk rerun ini")
 
 # ==================== MAIN APP ====================
 
+data = PageData(needs, selection, period)
+instrument.section(page)
+
+# Loader tidak menampilkan pesan sendiri (bisa berjalan di thread refresh);
+# load pertama yang gagal tercatat di status loader dan ditampilkan di sini
+if needs and period is None:
+    load_transaction_data()
+    load_status = refresh_status()['load_transaction_data']
+    if load_status['error'] and load_status['version'] is None:
+        st.error(f"File tidak ditemukan: {DATA_FILES['transactions']}")
+
 if page == "📊 Dashboard":
     # Header
     st.markdown('<h1 class="header-title">📊 Galunggung Green Glory Dashboard</h1>', unsafe_allow_html=True)
     st.markdown('<p class="header-subtitle">Analisis Penjualan & Big Data Analytics 2025</p>', unsafe_allow_html=True)
     
-    # Load data
-    df_transactions = load_transaction_data()
-    df_trend = load_trend_results()
-    df_preference = load_preference_results()
-    
-    if df_transactions.empty:
+    # Artefak dimuat per bagian yang ditampilkan (lihat DASHBOARD_SECTIONS)
+    if data['cube']['count'].size == 0:
         st.error("❌ Tidak bisa memuat data transaksi. Pastikan file CSV ada di folder `data/`")
         st.stop()
     
     # ===== SECTION TUJUAN TUGAS =====
-    st.markdown("---")
-    st.markdown("### 🎯 TUJUAN TUGAS & LATAR BELAKANG")
-    
-    # Tujuan Umum
-    st.markdown("#### 📋 Tujuan Umum")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        **📊 Menganalisis Data Penjualan**
+    if "🎯 Tujuan & Latar Belakang" in sections:
+        instrument.section(f"{page} / 🎯 Tujuan & Latar Belakang")
+        st.markdown("---")
+        st.markdown("### 🎯 TUJUAN TUGAS & LATAR BELAKANG")
         
-        Menggunakan Big Data Analytics untuk memahami pola penjualan 6 jenis kopi dari Galunggung Green Glory selama tahun 2025.
-        """)
-    
-    with col2:
-        st.markdown("""
-        **💡 Mengoptimalkan Strategi**
+        # Tujuan Umum
+        st.markdown("#### 📋 Tujuan Umum")
+        col1, col2, col3 = st.columns(3)
         
-        Mengidentifikasi rising stars dan declining products untuk optimasi portfolio dan peningkatan revenue growth 20% dalam 6 bulan.
-        """)
-    
-    with col3:
-        st.markdown("""
-        **🎯 Mendukung Keputusan**
-        
-        Menyediakan insights berbasis data untuk mendukung strategic decision-making dan ROI improvement 48% Year 1.
-        """)
-    
-    # Pertanyaan Bisnis
-    st.markdown("#### 💰 Pertanyaan Bisnis")
-    
-    with st.expander("💰 Q1: Bagaimana Cara Meningkatkan Value Penjualan?", expanded=True):
-        st.markdown("""
-        **Pertanyaan:**
-        Bagaimana cara meningkatkan value penjualan Galunggung Green Glory secara signifikan dan sustainable dalam 6 bulan ke depan?
-        
-        **Context:**
-        - Revenue baseline 2025: Rp 176.5M/bulan
-        - Target 6 bulan: Rp 212M/bulan (+20% growth)
-        - Investment needed: Rp 357M
-        
-        **Expected Answer:**
-        - Fokus pada rising stars (Java Halu ⭐, Bunar ⭐)
-        - Agresif marketing untuk high-potential segments
-        - Optimize pricing & promotional strategy per category
-        """)
-    
-    with st.expander("📦 Q2: Apakah Perlu Menambahkan Produk Kopi Baru?"):
-        st.markdown("""
-        **Pertanyaan:**
-        Apakah Galunggung Green Glory perlu menambahkan produk kopi baru atau lebih baik fokus optimasi existing portfolio?
-        
-        **Context:**
-        - Current portfolio: 6 jenis kopi (Java Halu, Bunar, Parentas, Taraju, Gunung Puntang, Regional)
-        - Declining products: Taraju ↘️, Regional ↘️
-        - Available budget: Rp 50-75M untuk product development
-        
-        **Expected Answer:**
-        - Rekomendasi: Optimasi existing portfolio dulu
-        - Revitalisasi declining products sebelum launch baru
-        - New product launch target: Q4 2025 (setelah optimize existing)
-        """)
-    
-    # Pertanyaan Analisis
-    st.markdown("#### 📊 Pertanyaan Analisis & Metodologi")
-    
-    analysis_items = [
-        {
-            'num': '1️⃣',
-            'title': 'Trend Penjualan Per Jenis Kopi',
-            'description': 'Menganalisis trend penjualan untuk 6 jenis kopi menggunakan Linear Regression untuk mengidentifikasi rising stars vs declining products. Metric: Monthly slope & R-squared.',
-        },
-        {
-            'num': '2️⃣',
-            'title': 'Preferensi Pelanggan Berdasarkan Demografis',
-            'description': 'Menganalisis preferensi customer per kategori (Big Cafe, Medium Cafe, Perorangan) menggunakan Logistic Regression untuk memahami buying behavior dan targeting strategy.',
-        },
-        {
-            'num': '3️⃣',
-            'title': 'Implementasi dengan Apache PySpark',
-            'description': 'Processing 951 transaksi menggunakan Apache PySpark untuk parallel computation + Scikit-learn ML models + output visualization dengan interactive charts.',
-        }
-    ]
-    
-    for item in analysis_items:
-        col1, col2 = st.columns([0.5, 3])
         with col1:
-            st.markdown(f"### {item['num']}")
-        with col2:
-            st.markdown(f"**{item['title']}**")
-            st.markdown(item['description'])
-    
-    # Teknologi & Metodologi
-    st.markdown("#### ⚙️ Teknologi & Metodologi")
-    
-    tech_cols = st.columns(4)
-    
-    tech_items = [
-        {
-            'title': '🔧 Big Data',
-            'desc': 'Apache PySpark untuk processing 951 transaksi dengan efficient parallel computation',
-            'col': tech_cols[0]
-        },
-        {
-            'title': '🤖 ML Models',
-            'desc': 'Linear Regression (Trend) + Logistic Regression (Preference) + Scikit-learn',
-            'col': tech_cols[1]
-        },
-        {
-            'title': '📊 Visualization',
-            'desc': 'Interactive Charts (Plotly) + Static visualizations (Matplotlib)',
-            'col': tech_cols[2]
-        },
-        {
-            'title': '📁 Output',
-            'desc': 'Jupyter Notebook + Dashboard HTML + CSV Data + PNG Charts + MD Reports',
-            'col': tech_cols[3]
-        }
-    ]
-    
-    for tech in tech_items:
-        with tech['col']:
-            st.markdown(f"**{tech['title']}**")
-            st.markdown(tech['desc'])
-    
-    # Expected Business Impact
-    st.markdown("#### 🎯 Expected Business Impact")
-    
-    impact_cols = st.columns(4)
-    
-    impact_items = [
-        {
-            'icon': '📈',
-            'title': 'Revenue Growth',
-            'current': 'Rp 176.5M/bulan',
-            'target': 'Rp 212M/bulan',
-            'growth': '+20%',
-            'col': impact_cols[0]
-        },
-        {
-            'icon': '🎯',
-            'title': 'Portfolio Optimization',
-            'current': '6 products',
-            'target': '4-5 focus products',
-            'growth': '+Revenue mix',
-            'col': impact_cols[1]
-        },
-        {
-            'icon': '🌍',
-            'title': 'Market Strategy',
-            'current': 'General approach',
-            'target': 'Segmented targeting',
-            'growth': '+Efficiency',
-            'col': impact_cols[2]
-        },
-        {
-            'icon': '💰',
-            'title': 'ROI Investment',
-            'current': 'Rp 357M invest',
-            'target': 'Year 1: 48% ROI',
-            'growth': 'Payback: 2.1yr',
-            'col': impact_cols[3]
-        }
-    ]
-    
-    for impact in impact_items:
-        with impact['col']:
-            st.markdown(f"### {impact['icon']} {impact['title']}")
-            st.markdown(f"**Saat ini:** {impact['current']}")
-            st.markdown(f"**Target:** {impact['target']}")
-            st.markdown(f"**Impact:** {impact['growth']}")
-    
-    # ===== KEY METRICS =====
-    st.markdown("---")
-    st.markdown("### 📊 KEY METRICS")
-    
-    metrics = calculate_metrics(df_transactions)
-    
-    metric_cols = st.columns(6)
-    
-    with metric_cols[0]:
-        st.metric(
-            "💰 Total Revenue",
-            format_currency(metrics['total_revenue']),
-            help="Total penjualan selama periode"
-        )
-    
-    with metric_cols[1]:
-        st.metric(
-            "📦 Total Volume",
-            format_number(metrics['total_volume']),
-            help="Total unit yang terjual"
-        )
-    
-    with metric_cols[2]:
-        st.metric(
-            "💵 Avg Price",
-            format_currency(metrics['avg_price']),
-            help="Average harga per transaksi"
-        )
-    
-    with metric_cols[3]:
-        st.metric(
-            "🔢 Total Transactions",
-            format_number(metrics['total_transactions']),
-            help="Total jumlah transaksi"
-        )
-    
-    with metric_cols[4]:
-        st.metric(
-            "📅 Period",
-            metrics['date_range'],
-            help="Range periode data"
-        )
-    
-    with metric_cols[5]:
-        st.metric(
-            "⭐ Top Product",
-            metrics['top_product'],
-            help="Produk dengan volume tertinggi"
-        )
-    
-    # Trend Analysis Section
-    st.markdown("---")
-    st.markdown("### 📈 TREND ANALYSIS")
-    
-    if not df_trend.empty:
-        col1, col2 = st.columns([2, 1])
+            st.markdown("""
+            **📊 Menganalisis Data Penjualan**
         
-        with col1:
-            fig_trend = create_trend_chart(df_trend)
-            st.plotly_chart(fig_trend, width='stretch')
+            Menggunakan Big Data Analytics untuk memahami pola penjualan 6 jenis kopi dari Galunggung Green Glory selama tahun 2025.
+            """)
         
         with col2:
-            st.markdown("**📊 Trend Interpretation:**")
-            for _, row in df_trend.iterrows():
-                # Get slope from available columns
-                slope = 0
-                for col_name in ['Slope_Kg_Per_Bulan', 'Slope', 'slope']:
-                    if col_name in row.index:
-                        slope = float(row[col_name])
-                        break
-                # Get product from available columns
-                product = 'N/A'
-                for col_name in ['Produk', 'Product', 'produk']:
-                    if col_name in row.index:
-                        product = str(row[col_name])
-                        break
-                interpretation = get_trend_interpretation(slope)
-                st.markdown(f"**{product}**  \n{interpretation}")
-            
-            st.markdown("**Aksi Rekomendasi:**")
             st.markdown("""
-            - **Rising Stars**: Maksimalkan marketing & pricing
-            - **Stable**: Maintain current strategy
-            - **Declining**: Review & reposition
+            **💡 Mengoptimalkan Strategi**
+        
+            Mengidentifikasi rising stars dan declining products untuk optimasi portfolio dan peningkatan revenue growth 20% dalam 6 bulan.
             """)
         
-        # Detailed Trend Results
-        st.markdown("#### 📋 Detailed Trend Results")
-        st.dataframe(
-            df_trend.style.format({
-                'Slope': '{:.2f}',
-                'Intercept': '{:.0f}',
-                'R_squared': '{:.3f}',
-                'Volume': '{:,.0f}',
-                'Revenue': '{:,.0f}'
-            }),
-            width='stretch'
-        )
-    
-    else:
-        st.warning("⚠️ Data trend tidak tersedia")
-    
-    # Preference Analysis Section
-    st.markdown("---")
-    st.markdown("### ❤️ PREFERENCE ANALYSIS")
-    
-    if not df_preference.empty:
-        col1, col2 = st.columns([2, 1])
+        with col3:
+            st.markdown("""
+            **🎯 Mendukung Keputusan**
         
-        with col1:
-            fig_heatmap = create_preference_heatmap(df_preference)
-            st.plotly_chart(fig_heatmap, use_container_width=True)
+            Menyediakan insights berbasis data untuk mendukung strategic decision-making dan ROI improvement 48% Year 1.
+            """)
         
-        with col2:
-            st.markdown("**🔍 Key Insights:**")
-            
-            # Find top preferences
-            if 'Preference_Percentage' in df_preference.columns:
-                top_prefs = df_preference.nlargest(3, 'Preference_Percentage')
-            else:
-                top_prefs = df_preference.head(3)
-                
-            for idx, row in top_prefs.iterrows():
-                product_name = row.get('Produk', row.get('Product', 'N/A')) if hasattr(row, 'get') else 'N/A'
-                category = row.get('Kategori', row.get('Category', 'N/A')) if hasattr(row, 'get') else 'N/A'
-                pref_pct = row.get('Preference_Percentage', 0) if hasattr(row, 'get') else 0
-                st.markdown(f"""
-                **{product_name}** → {category}
-                - {pref_pct:.1f}% preference
-                """)
-            
-            st.markdown("**💡 Strategy:**")
+        # Pertanyaan Bisnis
+        st.markdown("#### 💰 Pertanyaan Bisnis")
+        
+        with st.expander("💰 Q1: Bagaimana Cara Meningkatkan Value Penjualan?", expanded=True):
+            st.markdown("""
+            **Pertanyaan:**
+            Bagaimana cara meningkatkan value penjualan Galunggung Green Glory secara signifikan dan sustainable dalam 6 bulan ke depan?
+        
+            **Context:**
+            - Revenue baseline 2025: Rp 176.5M/bulan
+            - Target 6 bulan: Rp 212M/bulan (+20% growth)
+            - Investment needed: Rp 357M
+        
+            **Expected Answer:**
+            - Fokus pada rising stars (Java Halu ⭐, Bunar ⭐)
+            - Agresif marketing untuk high-potential segments
+            - Optimize pricing & promotional strategy per category
+            """)
+        
+        with st.expander("📦 Q2: Apakah Perlu Menambahkan Produk Kopi Baru?"):
             st.markdown("""
-            - Target high-preference segments
-            - Customize offerings per category
-            - Focus on Big Cafe & Medium Cafe
+            **Pertanyaan:**
+            Apakah Galunggung Green Glory perlu menambahkan produk kopi baru atau lebih baik fokus optimasi existing portfolio?
+        
+            **Context:**
+            - Current portfolio: 6 jenis kopi (Java Halu, Bunar, Parentas, Taraju, Gunung Puntang, Regional)
+            - Declining products: Taraju ↘️, Regional ↘️
+            - Available budget: Rp 50-75M untuk product development
+        
+            **Expected Answer:**
+            - Rekomendasi: Optimasi existing portfolio dulu
+            - Revitalisasi declining products sebelum launch baru
+            - New product launch target: Q4 2025 (setelah optimize existing)
             """)
         
-        # Detailed Preference Results
-        st.markdown("#### 📋 Detailed Preference Results")
+        # Pertanyaan Analisis
+        st.markdown("#### 📊 Pertanyaan Analisis & Metodologi")
         
-        # Check if required columns exist before sorting and formatting
-        if 'Preference_Percentage' in df_preference.columns:
-            sorted_df = df_preference.sort_values('Preference_Percentage', ascending=False)
-            format_dict = {
-                'Preference_Percentage': '{:.1f}%',
-                'Transactions': '{:,.0f}',
-                'Revenue_IDR': '{:,.0f}'
+        analysis_items = [
+            {
+                'num': '1️⃣',
+                'title': 'Trend Penjualan Per Jenis Kopi',
+                'description': 'Menganalisis trend penjualan untuk 6 jenis kopi menggunakan Linear Regression untuk mengidentifikasi rising stars vs declining products. Metric: Monthly slope & R-squared.',
+            },
+            {
+                'num': '2️⃣',
+                'title': 'Preferensi Pelanggan Berdasarkan Demografis',
+                'description': 'Menganalisis preferensi customer per kategori (Big Cafe, Medium Cafe, Perorangan) menggunakan Logistic Regression untuk memahami buying behavior dan targeting strategy.',
+            },
+            {
+                'num': '3️⃣',
+                'title': 'Implementasi dengan Apache PySpark',
+                'description': 'Processing 951 transaksi menggunakan Apache PySpark untuk parallel computation + Scikit-learn ML models + output visualization dengan interactive charts.',
             }
-            # Only include columns that exist in the dataframe
-            available_formats = {k: v for k, v in format_dict.items() if k in sorted_df.columns}
+        ]
+        
+        for item in analysis_items:
+            col1, col2 = st.columns([0.5, 3])
+            with col1:
+                st.markdown(f"### {item['num']}")
+            with col2:
+                st.markdown(f"**{item['title']}**")
+                st.markdown(item['description'])
+        
+        # Teknologi & Metodologi
+        st.markdown("#### ⚙️ Teknologi & Metodologi")
+        
+        tech_cols = st.columns(4)
+        
+        tech_items = [
+            {
+                'title': '🔧 Big Data',
+                'desc': 'Apache PySpark untuk processing 951 transaksi dengan efficient parallel computation',
+                'col': tech_cols[0]
+            },
+            {
+                'title': '🤖 ML Models',
+                'desc': 'Linear Regression (Trend) + Logistic Regression (Preference) + Scikit-learn',
+                'col': tech_cols[1]
+            },
+            {
+                'title': '📊 Visualization',
+                'desc': 'Interactive Charts (Plotly) + Static visualizations (Matplotlib)',
+                'col': tech_cols[2]
+            },
+            {
+                'title': '📁 Output',
+                'desc': 'Jupyter Notebook + Dashboard HTML + CSV Data + PNG Charts + MD Reports',
+                'col': tech_cols[3]
+            }
+        ]
+        
+        for tech in tech_items:
+            with tech['col']:
+                st.markdown(f"**{tech['title']}**")
+                st.markdown(tech['desc'])
+        
+        # Expected Business Impact
+        st.markdown("#### 🎯 Expected Business Impact")
+        
+        impact_cols = st.columns(4)
+        
+        impact_items = [
+            {
+                'icon': '📈',
+                'title': 'Revenue Growth',
+                'current': 'Rp 176.5M/bulan',
+                'target': 'Rp 212M/bulan',
+                'growth': '+20%',
+                'col': impact_cols[0]
+            },
+            {
+                'icon': '🎯',
+                'title': 'Portfolio Optimization',
+                'current': '6 products',
+                'target': '4-5 focus products',
+                'growth': '+Revenue mix',
+                'col': impact_cols[1]
+            },
+            {
+                'icon': '🌍',
+                'title': 'Market Strategy',
+                'current': 'General approach',
+                'target': 'Segmented targeting',
+                'growth': '+Efficiency',
+                'col': impact_cols[2]
+            },
+            {
+                'icon': '💰',
+                'title': 'ROI Investment',
+                'current': 'Rp 357M invest',
+                'target': 'Year 1: 48% ROI',
+                'growth': 'Payback: 2.1yr',
+                'col': impact_cols[3]
+            }
+        ]
+        
+        for impact in impact_items:
+            with impact['col']:
+                st.markdown(f"### {impact['icon']} {impact['title']}")
+                st.markdown(f"**Saat ini:** {impact['current']}")
+                st.markdown(f"**Target:** {impact['target']}")
+                st.markdown(f"**Impact:** {impact['growth']}")
+    
+    # ===== KEY METRICS =====
+    if "📊 Key Metrics" in sections:
+        instrument.section(f"{page} / 📊 Key Metrics")
+        st.markdown("---")
+        st.markdown("### 📊 KEY METRICS")
+        
+        metrics = data['metrics']
+        
+        metric_cols = st.columns(6)
+        
+        with metric_cols[0]:
+            st.metric(
+                "💰 Total Revenue",
+                format_currency(metrics['total_revenue']),
+                help="Total penjualan selama periode"
+            )
+        
+        with metric_cols[1]:
+            st.metric(
+                "📦 Total Volume",
+                format_number(metrics['total_volume']),
+                help="Total unit yang terjual"
+            )
+        
+        with metric_cols[2]:
+            st.metric(
+                "💵 Avg Price",
+                format_currency(metrics['avg_price']),
+                help="Average harga per transaksi"
+            )
+        
+        with metric_cols[3]:
+            st.metric(
+                "🔢 Total Transactions",
+                format_number(metrics['total_transactions']),
+                help="Total jumlah transaksi"
+            )
+        
+        with metric_cols[4]:
+            st.metric(
+                "📅 Period",
+                metrics['date_range'],
+                help="Range periode data"
+            )
+        
+        with metric_cols[5]:
+            st.metric(
+                "⭐ Top Product",
+                metrics['top_product'],
+                help="Produk dengan volume tertinggi"
+            )
+    
+    # Trend Analysis Section
+    if "📈 Trend Analysis" in sections:
+        instrument.section(f"{page} / 📈 Trend Analysis")
+        df_trend = data['trend']
+        
+        st.markdown("---")
+        st.markdown("### 📈 TREND ANALYSIS")
+        
+        if not df_trend.empty:
+            col1, col2 = st.columns([2, 1])
+        
+            with col1:
+                fig_trend = create_trend_chart(df_trend)
+                st.plotly_chart(fig_trend, width='stretch')
+        
+            with col2:
+                st.markdown("**📊 Trend Interpretation:**")
+                for _, row in df_trend.iterrows():
+                    # Get slope from available columns
+                    slope = 0
+                    for col_name in ['Slope_Kg_Per_Bulan', 'Slope', 'slope']:
+                        if col_name in row.index:
+                            slope = float(row[col_name])
+                            break
+                    # Get product from available columns
+                    product = 'N/A'
+                    for col_name in ['Produk', 'Product', 'produk']:
+                        if col_name in row.index:
+                            product = str(row[col_name])
+                            break
+                    interpretation = get_trend_interpretation(slope)
+                    st.markdown(f"**{product}**  \n{interpretation}")
+        
+                st.markdown("**Aksi Rekomendasi:**")
+                st.markdown("""
+                - **Rising Stars**: Maksimalkan marketing & pricing
+                - **Stable**: Maintain current strategy
+                - **Declining**: Review & reposition
+                """)
+        
+            # Detailed Trend Results
+            st.markdown("#### 📋 Detailed Trend Results")
             st.dataframe(
-                sorted_df.style.format(available_formats),
-                use_container_width=True
+                df_trend.style.format({
+                    'Slope': '{:.2f}',
+                    'Intercept': '{:.0f}',
+                    'R_squared': '{:.3f}',
+                    'Volume': '{:,.0f}',
+                    'Revenue': '{:,.0f}'
+                }),
+                width='stretch'
             )
+        
         else:
-            st.dataframe(df_preference, use_container_width=True)
+            st.warning("⚠️ Data trend tidak tersedia")
     
-    else:
-        st.warning("⚠️ Data preferensi tidak tersedia")
+    # Preference Analysis Section
+    if "❤️ Preference Analysis" in sections:
+        instrument.section(f"{page} / ❤️ Preference Analysis")
+        preference_matrix = data['preference_matrix']
+        df_preference = data['preference']
+        
+        st.markdown("---")
+        st.markdown("### ❤️ PREFERENCE ANALYSIS")
+        
+        if not df_preference.empty:
+            col1, col2 = st.columns([2, 1])
+        
+            with col1:
+                fig_heatmap = create_preference_heatmap(preference_matrix)
+                st.plotly_chart(fig_heatmap, use_container_width=True)
+        
+            with col2:
+                st.markdown("**🔍 Key Insights:**")
+        
+                # Find top preferences
+                if 'Preference_Pct' in df_preference.columns:
+                    top_prefs = df_preference.nlargest(3, 'Preference_Pct')
+                else:
+                    top_prefs = df_preference.head(3)
+        
+                for idx, row in top_prefs.iterrows():
+                    product_name = row.get('Produk', row.get('Product', 'N/A')) if hasattr(row, 'get') else 'N/A'
+                    category = row.get('Tipe_Kedai', row.get('Category', 'N/A')) if hasattr(row, 'get') else 'N/A'
+                    pref_pct = row.get('Preference_Pct', 0) if hasattr(row, 'get') else 0
+                    st.markdown(f"""
+                    **{product_name}** → {category}
+                    - {pref_pct:.1f}% preference
+                    """)
+        
+                st.markdown("**💡 Strategy:**")
+                st.markdown("""
+                - Target high-preference segments
+                - Customize offerings per category
+                - Focus on Big Cafe & Medium Cafe
+                """)
+        
+            # Detailed Preference Results
+            st.markdown("#### 📋 Detailed Preference Results")
+        
+            # Check if required columns exist before sorting and formatting
+            if 'Preference_Pct' in df_preference.columns:
+                sorted_df = df_preference.sort_values('Preference_Pct', ascending=False)
+                format_dict = {
+                    'Preference_Pct': '{:.1f}%',
+                    'Jumlah_Transaksi': '{:,.0f}',
+                    'Rata_Rata_Revenue': '{:,.0f}'
+                }
+                # Only include columns that exist in the dataframe
+                available_formats = {k: v for k, v in format_dict.items() if k in sorted_df.columns}
+                st.dataframe(
+                    sorted_df.style.format(available_formats),
+                    use_container_width=True
+                )
+            else:
+                st.dataframe(df_preference, use_container_width=True)
+        
+        else:
+            st.warning("⚠️ Data preferensi tidak tersedia")
     
     # Financial Projections
-    st.markdown("---")
-    st.markdown("### 💰 FINANCIAL PROJECTIONS")
-    
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        fig_projection = create_revenue_projection(
-            metrics['total_revenue'],
-            20,
-            6
-        )
-        st.plotly_chart(fig_projection, use_container_width=True)
-    
-    with col2:
-        st.markdown("**📊 Projection Details:**")
-        st.markdown(f"""
-        - **Base Revenue**: {format_currency(metrics['total_revenue'])}/bulan
-        - **Growth Target**: 20% dalam 6 bulan
-        - **Month 6 Target**: Rp 212M/bulan
-        - **Investment**: Rp 357M
-        - **Expected ROI**: 48% Year 1
-        - **Payback Period**: 2.1 tahun
-        """)
+    if "💰 Financial Projections" in sections:
+        instrument.section(f"{page} / 💰 Financial Projections")
+        base_revenue = latest_month_revenue(data['monthly_revenue'])
+        
+        st.markdown("---")
+        st.markdown("### 💰 FINANCIAL PROJECTIONS")
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            fig_projection = create_revenue_projection(
+                base_revenue,
+                20,
+                6,
+                scenarios=data['scenarios']
+            )
+            st.plotly_chart(fig_projection, use_container_width=True)
+        
+        with col2:
+            st.markdown("**📊 Projection Details:**")
+            st.markdown(f"""
+            - **Base Revenue**: {format_currency(base_revenue)}/bulan
+            - **Growth Target**: 20% dalam 6 bulan
+            - **Month 6 Target**: Rp 212M/bulan
+            - **Investment**: Rp 357M
+            - **Expected ROI**: 48% Year 1
+            - **Payback Period**: 2.1 tahun
+            """)
 
 elif page == "📈 Analisis Trend":
     st.header("📈 Analisis Trend Penjualan")
     
-    df_trend = load_trend_results()
+    df_trend = data['trend']
     
     if df_trend.empty:
         st.error("Data trend tidak tersedia")
@@ -532,12 +650,13 @@ elif page == "📈 Analisis Trend":
 elif page == "❤️ Preferensi Customer":
     st.header("❤️ Analisis Preferensi Customer")
     
-    df_pref = load_preference_results()
+    preference_matrix = data['preference_matrix']
+    df_pref = data['preference']
     
     if df_pref.empty:
         st.error("Data preferensi tidak tersedia")
     else:
-        fig = create_preference_heatmap(df_pref)
+        fig = create_preference_heatmap(preference_matrix)
         st.plotly_chart(fig, width='stretch')
         
         st.markdown("---")
@@ -545,8 +664,8 @@ elif page == "❤️ Preferensi Customer":
         
         col1, col2, col3 = st.columns(3)
         
-        if 'Preference_Percentage' in df_pref.columns:
-            top_3 = df_pref.nlargest(3, 'Preference_Percentage')
+        if 'Preference_Pct' in df_pref.columns:
+            top_3 = df_pref.nlargest(3, 'Preference_Pct')
         else:
             top_3 = df_pref.head(3)
         
@@ -554,8 +673,8 @@ elif page == "❤️ Preferensi Customer":
             col = [col1, col2, col3][idx]
             with col:
                 product_name = row.get('Produk', row.get('Product', 'N/A')) if hasattr(row, 'get') else 'N/A'
-                category = row.get('Kategori', row.get('Category', 'N/A')) if hasattr(row, 'get') else 'N/A'
-                pref_pct = row.get('Preference_Percentage', 0) if hasattr(row, 'get') else 0
+                category = row.get('Tipe_Kedai', row.get('Category', 'N/A')) if hasattr(row, 'get') else 'N/A'
+                pref_pct = row.get('Preference_Pct', 0) if hasattr(row, 'get') else 0
                 st.metric(
                     f"{product_name} → {category}",
                     f"{pref_pct:.1f}%"
@@ -563,8 +682,8 @@ elif page == "❤️ Preferensi Customer":
         
         st.markdown("---")
         st.markdown("### 📋 Semua Data")
-        if 'Preference_Percentage' in df_pref.columns:
-            sorted_df = df_pref.sort_values('Preference_Percentage', ascending=False)
+        if 'Preference_Pct' in df_pref.columns:
+            sorted_df = df_pref.sort_values('Preference_Pct', ascending=False)
         else:
             sorted_df = df_pref
             
@@ -606,11 +725,89 @@ elif page == "🎯 KPI & Proyeksi":
     st.markdown("---")
     
     # Financial projection
-    df_trans = load_transaction_data()
-    if not df_trans.empty:
-        metrics = calculate_metrics(df_trans)
-        fig = create_revenue_projection(metrics['total_revenue'], 20, 6)
+    if data['cube']['count'].size > 0:
+        base_revenue = latest_month_revenue(data['monthly_revenue'])
+        fig = create_revenue_projection(base_revenue, 20, 6, scenarios=data['scenarios'])
+        st.plotly_chart(fig, width='stretch')
+        
+        # Forecast exponential smoothing per produk × kategori kedai (lihat forecast.py)
+        st.markdown("---")
+        st.markdown("### 🔮 Forecast Permintaan")
+        
+        model = data['forecast']
+        measure = st.radio(
+            "Ukuran:",
+            ['revenue', 'kg'],
+            format_func=lambda m: "💰 Revenue (IDR)" if m == 'revenue' else "📦 Volume (Kg)",
+            horizontal=True
+        )
+        unit = "Revenue (IDR)" if measure == 'revenue' else "Volume (Kg)"
+        
+        fig = create_forecast_chart(
+            forecast_totals(model, measure),
+            f"🔮 Forecast {len(model['future_months'])} Bulan - Total {len(model['product_idx'])} Seri",
+            unit
+        )
         st.plotly_chart(fig, width='stretch')
+        
+        st.caption(
+            "Holt-Winters aditif (musiman)" if model[measure]['seasonal']
+            else "Holt linear trend (histori < 2 musim, tanpa komponen musiman)"
+        )
+        st.dataframe(forecast_table(model, measure), width='stretch', hide_index=True)
+
+elif page == "🔎 Query":
+    st.header("🔎 Query SQL")
+    
+    df_tx = data['transactions']
+    
+    if df_tx.empty:
+        st.error("Data transaksi tidak tersedia")
+    else:
+        ingest_info = df_tx.attrs.get('ingest', {})
+        st.caption(
+            f"Tabel `{QUERY_CONFIG['table']}` · {len(df_tx):,} baris · "
+            f"read-only (SELECT / WITH) · engine {engine_name()}"
+            + (
+                f" · {ingest_info['partitions_read']}/{ingest_info['partitions_total']} partisi dibaca"
+                if 'partitions_read' in ingest_info else ""
+            )
+        )
+        with st.expander("📋 Kolom tabel"):
+            st.dataframe(table_schema(df_tx), hide_index=True)
+        
+        # Form: query hanya dijalankan saat tombol ditekan, bukan setiap ketikan
+        with st.form("query_form"):
+            sql = st.text_area("SQL:", value=QUERY_EXAMPLE, height=160)
+            st.form_submit_button("▶️ Jalankan")
+        
+        try:
+            normalized = normalize_query(sql)
+            result = run_query(normalized, data_version(df_tx) or frame_hash(df_tx), df_tx)
+        except ValueError as exc:
+            st.error(f"Query gagal: {exc}")
+        else:
+            frame = result['frame']
+            page_size = QUERY_CONFIG['page_size']
+            n_pages = max((len(frame) - 1) // page_size + 1, 1)
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.caption(
+                    f"{len(frame):,} baris · {result['elapsed_ms']:,} ms"
+                    + (f" · dipotong di {QUERY_CONFIG['max_rows']:,} baris" if result['truncated'] else "")
+                )
+            with col2:
+                page_number = st.number_input("Halaman", min_value=1, max_value=n_pages, value=1, step=1)
+            
+            start = (page_number - 1) * page_size
+            st.dataframe(frame.iloc[start:start + page_size], width='stretch', hide_index=True)
+            st.download_button(
+                "📥 Download CSV",
+                frame.to_csv(index=False).encode('utf-8'),
+                file_name="query_result.csv",
+                mime="text/csv"
+            )
 
 elif page == "ℹ️ Tentang":
     st.header("ℹ️ Tentang Dashboard")
@@ -653,6 +850,7 @@ elif page == "ℹ️ Tentang":
     """)
 
 # Footer
+instrument.section("footer")
 st.markdown("---")
 st.markdown("""
 <div style="text-align: center; color: #7f8c8d; font-size: 0.9rem;">
@@ -660,3 +858,19 @@ st.markdown("""
     <p>Dibuat: 16 Januari 2026 | Version 2.0</p>
 </div>
 """, unsafe_allow_html=True)
+
+# ==================== DEBUG TIMING ====================
+run = instrument.finish_run()
+if run is not None:
+    instrument.export_run(run, force=debug_timing)
+    if debug_timing:
+        with st.sidebar:
+            st.markdown("### 🐞 Debug Timing")
+            st.caption(f"Total rerun: {run['total_ms']:,.0f} ms")
+            st.dataframe(
+                pd.DataFrame(run['spans'], columns=['name', 'kind', 'depth', 'ms', 'rows', 'cache']).assign(
+                    name=lambda spans: ['  ' * depth + name for name, depth in zip(spans['name'], spans['depth'])]
+                ).drop(columns='depth'),
+                hide_index=True,
+                width='stretch'
+            )
@@ -0,0 +1,237 @@
+"""
+backends.py - Backend eksekusi analisis: pandas, process pool, atau PySpark lokal
+Semua backend mereduksi transaksi ke cube yang sama (analytics.build_cube),
+lalu metrics, trend bulanan, fit trend dan preferensi dihitung dari cube itu,
+sehingga hasilnya identik apa pun backend-nya
+"""
+
+import importlib.util
+import io
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import ANALYTICS_BACKEND, DATA_FILES, TRANSACTION_DTYPES
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# ==================== SOURCE ====================
+
+def default_source():
+    """Sumber yang sama dengan dashboard: folder partisi jika ada, selain itu CSV export"""
+    if os.path.isdir(DATA_FILES['transactions_dir']):
+        return DATA_FILES['transactions_dir']
+    return DATA_FILES['transactions']
+
+def source_files(source):
+    """File CSV penyusun sumber (file tunggal atau partisi di folder) beserta ukurannya"""
+    from ingest import TransactionDataset
+
+    if os.path.isdir(source):
+        return [
+            (os.path.join(source, p['relpath']), p['size'])
+            for p in TransactionDataset(source).partitions()
+        ]
+    return [(source, os.path.getsize(source))]
+
+def load_source(source):
+    """Load transaksi lewat cache yang sama dengan dashboard (Parquet / mmap bersama)"""
+    from ingest import TransactionDataset, load_transactions
+    from utils import read_typed_transactions
+
+    if os.path.isdir(source):
+        return TransactionDataset(source, parser=read_typed_transactions).load()
+    return load_transactions(source, parser=read_typed_transactions)
+
+# ==================== BACKENDS ====================
+
+class Backend:
+    """API analisis bersama; subclass hanya mengimplementasikan cube(source)"""
+
+    name = None
+
+    def cube(self, source):
+        raise NotImplementedError
+
+    def metrics(self, source=None, cube=None):
+        from analytics import cube_metrics
+        return cube_metrics(self._cube(source, cube))
+
+    def monthly_trend(self, source=None, cube=None):
+        from analytics import cube_monthly_revenue
+        return cube_monthly_revenue(self._cube(source, cube))
+
+    def trend(self, source=None, cube=None):
+        from analytics import cube_trend_results
+        return cube_trend_results(self._cube(source, cube))
+
+    def preference(self, source=None, cube=None):
+        from analytics import cube_preference_matrix, preference_table
+        return preference_table(cube_preference_matrix(self._cube(source, cube)))
+
+    def _cube(self, source, cube):
+        return cube if cube is not None else self.cube(source or default_source())
+
+
+class PandasBackend(Backend):
+    """Satu frame pandas di proses ini; paling cepat selama data muat di memory"""
+
+    name = 'pandas'
+
+    def cube(self, source):
+        from analytics import build_cube
+        return build_cube(load_source(source))
+
+
+def split_ranges(path, size, chunk_bytes):
+    """Rentang byte [begin, end) ~chunk_bytes yang berakhir di batas baris (header tidak ikut)"""
+    with open(path, 'rb') as f:
+        begin = len(f.readline())
+        ranges = []
+        while begin < size:
+            end = min(begin + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                end += len(f.readline())
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+def _range_cube(path, begin, end):
+    """Cube dari satu rentang byte file export (dijalankan di proses worker)"""
+    from analytics import build_cube
+    from ingest import is_sales_export, read_sales_export, read_transactions_csv
+
+    if not is_sales_export(path):
+        return build_cube(read_transactions_csv(path))
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(begin)
+        data = f.read(end - begin)
+    return build_cube(read_sales_export(io.BytesIO(header + data)))
+
+
+class ProcessPoolBackend(Backend):
+    """
+    Sumber dipotong per rentang byte, tiap worker mem-parse satu rentang dan
+    mengembalikan cube parsial yang lalu di-merge. Memory per worker dibatasi
+    chunk_bytes, jadi data yang tidak muat sebagai satu frame tetap bisa diproses
+    """
+
+    name = 'process'
+
+    def __init__(self, workers=None, chunk_bytes=ANALYTICS_BACKEND['chunk_bytes']):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes
+
+    def tasks(self, source):
+        from ingest import is_sales_export
+
+        tasks = []
+        for path, size in source_files(source):
+            if is_sales_export(path):
+                tasks.extend((path, begin, end) for begin, end in split_ranges(path, size, self.chunk_bytes))
+            else:
+                tasks.append((path, 0, size))
+        return tasks
+
+    def cube(self, source):
+        from analytics import build_cube, merge_cubes
+
+        tasks = self.tasks(source)
+        if not tasks:
+            return build_cube(pd.DataFrame())
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            cubes = pool.map(_range_cube, *zip(*tasks))
+            return merge_cubes(*cubes)
+
+
+def _spark_schema():
+    """Schema DDL export penjualan; kolom yang tidak dipakai dibaca sebagai string"""
+    types = {'Int64': 'BIGINT'}
+    columns = ['No', 'Bulan', 'Jumlah Transaksi Bulan'] + [c for c in TRANSACTION_DTYPES if c != 'Bulan']
+    return ', '.join(f"`{c}` {types.get(TRANSACTION_DTYPES.get(c), 'STRING')}" for c in columns)
+
+
+class SparkBackend(Backend):
+    """
+    PySpark mode lokal (local[*]): parse dan groupBy ke sel cube dikerjakan
+    Spark, hanya tabel sel (kecil) yang di-collect ke driver
+    """
+
+    name = 'spark'
+
+    def __init__(self, master=ANALYTICS_BACKEND['spark_master']):
+        self.master = master
+        self._session = None
+
+    @staticmethod
+    def available():
+        """True jika pyspark terpasang dan Java tersedia"""
+        has_java = bool(os.environ.get('JAVA_HOME') or shutil.which('java'))
+        return has_java and importlib.util.find_spec('pyspark') is not None
+
+    def session(self):
+        if self._session is None:
+            from pyspark.sql import SparkSession
+
+            self._session = (
+                SparkSession.builder
+                .master(self.master)
+                .appName('galunggung-analytics')
+                .config('spark.driver.memory', ANALYTICS_BACKEND['spark_driver_memory'])
+                .getOrCreate()
+            )
+        return self._session
+
+    def cube(self, source):
+        from pyspark.sql import functions as F
+
+        from analytics import build_cube
+        from ingest import parse_month_codes
+
+        paths = [path for path, _ in source_files(source)]
+        if not paths:
+            return build_cube(pd.DataFrame())
+        frame = (
+            self.session().read
+            .csv(paths, schema=_spark_schema(), sep=';', header=True, encoding='UTF-8')
+            .where(F.col('Bulan').isNotNull())
+        )
+        keys = ['Bulan', 'Nama Produk', 'Kategori Kedai', 'Asal Daerah']
+        cells = frame.groupBy(*keys).agg(
+            F.sum('Qty Kg').alias('kg'),
+            F.sum('Jumlah').alias('revenue'),
+            F.count(F.lit(1)).alias('count'),
+        ).toPandas()
+        if cells.empty:
+            return build_cube(pd.DataFrame())
+        cells.insert(0, 'Tanggal', parse_month_codes(cells['Bulan'].values))
+        return build_cube(cells, aggregated=True)
+
+# ==================== SELECTION ====================
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'process': ProcessPoolBackend,
+    'spark': SparkBackend,
+}
+
+def select_backend(source=None, name='auto'):
+    """
+    Backend menurut nama, atau otomatis menurut total ukuran file sumber:
+    pandas untuk data kecil, process pool di atas process_min_bytes, Spark di
+    atas spark_min_bytes jika tersedia
+    """
+    if name != 'auto':
+        if name == 'spark' and not SparkBackend.available():
+            raise RuntimeError("Backend spark butuh pyspark dan Java (JAVA_HOME)")
+        return BACKENDS[name]()
+    size = sum(size for _, size in source_files(source or default_source()))
+    if size >= ANALYTICS_BACKEND['spark_min_bytes'] and SparkBackend.available():
+        return SparkBackend()
+    if size >= ANALYTICS_BACKEND['process_min_bytes']:
+        return ProcessPoolBackend()
+    return PandasBackend()
@@ -0,0 +1,136 @@
+"""
+benchmarks/startup.py - Benchmark cold start dashboard
+Mengukur waktu import (breakdown ala `python -X importtime`) dan waktu sampai
+render pertama app.py, masing-masing di interpreter baru.
+
+Cara menjalankan:
+python benchmarks/startup.py --runs 5 --import-budget-ms 800 --render-budget-ms 5000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout=600)
+at.run()
+print('FIRST_RENDER', time.perf_counter() - start, len(at.exception))
+"""
+
+# ==================== RUNNERS ====================
+
+def _run_python(args):
+    """Jalankan interpreter baru di root repo; return (wall seconds, proses)"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env,
+        capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} gagal:\n{proc.stderr[-2000:]}")
+    return elapsed, proc
+
+def parse_importtime(stderr):
+    """Baris `import time:` -> list (module, depth, self_us, cumulative_us)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+def measure_import(module):
+    """Waktu import `module` dengan breakdown per modul yang di-import langsung olehnya"""
+    wall, proc = _run_python(['-X', 'importtime', '-c', f'import {module}'])
+    rows = parse_importtime(proc.stderr)
+    # Anak modul dicetak sebelum induknya: ambil baris depth 1 tepat sebelum `module`
+    end = max(i for i, (name, depth, _, _) in enumerate(rows) if name == module and depth == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    total = rows[end][3]
+    breakdown = {name: cumulative for name, depth, _, cumulative in rows[start:end] if depth == 1}
+    return {'wall_ms': wall * 1000, 'import_ms': total / 1000,
+            'breakdown_ms': {k: v / 1000 for k, v in breakdown.items()}}
+
+def measure_first_render():
+    """Waktu dari interpreter baru sampai app.py selesai render pertama"""
+    wall, proc = _run_python(['-c', FIRST_RENDER_SNIPPET])
+    line = next(l for l in proc.stdout.splitlines() if l.startswith('FIRST_RENDER'))
+    _, render_s, n_exceptions = line.split()
+    return {'wall_ms': wall * 1000, 'render_ms': float(render_s) * 1000,
+            'exceptions': int(n_exceptions)}
+
+# ==================== REPORT ====================
+
+def run(runs, module, top):
+    imports = [measure_import(module) for _ in range(runs)]
+    renders = [measure_first_render() for _ in range(runs)]
+
+    breakdown = {}
+    for result in imports:
+        for name, ms in result['breakdown_ms'].items():
+            breakdown.setdefault(name, []).append(ms)
+    breakdown = sorted(((statistics.median(v), k) for k, v in breakdown.items()), reverse=True)
+
+    return {
+        'runs': runs,
+        'module': module,
+        'import_ms': statistics.median(r['import_ms'] for r in imports),
+        'import_wall_ms': statistics.median(r['wall_ms'] for r in imports),
+        'first_render_ms': statistics.median(r['render_ms'] for r in renders),
+        'first_render_wall_ms': statistics.median(r['wall_ms'] for r in renders),
+        'render_exceptions': max(r['exceptions'] for r in renders),
+        'top_imports_ms': {name: round(ms, 1) for ms, name in breakdown[:top]},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold start dashboard")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--module', default='utils', help="Modul yang diukur waktu import-nya")
+    parser.add_argument('--top', type=int, default=10, help="Jumlah modul di breakdown")
+    parser.add_argument('--import-budget-ms', type=float)
+    parser.add_argument('--render-budget-ms', type=float)
+    parser.add_argument('--json', help="Tulis hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.runs, args.module, args.top)
+
+    print(f"import {result['module']:<12} {result['import_ms']:8.1f} ms "
+          f"(proses {result['import_wall_ms']:.1f} ms)")
+    print(f"first render       {result['first_render_ms']:8.1f} ms "
+          f"(proses {result['first_render_wall_ms']:.1f} ms, exceptions: {result['render_exceptions']})")
+    print("\nImport terberat (cumulative, median):")
+    for name, ms in result['top_imports_ms'].items():
+        print(f"  {name:<24} {ms:8.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    over_budget = []
+    if args.import_budget_ms is not None and result['import_ms'] > args.import_budget_ms:
+        over_budget.append(f"import {result['import_ms']:.0f} ms > {args.import_budget_ms:.0f} ms")
+    if args.render_budget_ms is not None and result['first_render_ms'] > args.render_budget_ms:
+        over_budget.append(f"first render {result['first_render_ms']:.0f} ms > {args.render_budget_ms:.0f} ms")
+    if result['render_exceptions']:
+        over_budget.append("app.py melempar exception saat render pertama")
+    for message in over_budget:
+        print(f"❌ {message}")
+    return 1 if over_budget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
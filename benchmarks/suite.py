@@ -0,0 +1,226 @@
+"""
+benchmarks/suite.py - Benchmark loader, agregasi dan chart builder dashboard
+Tiap fungsi diukur di export sintetis (synthetic.py) 1k / 100k / 1M / 10M baris: waktu
+(min & median dari beberapa repeat) dan peak memory (tracemalloc).
+
+Cara menjalankan:
+python benchmarks/suite.py --sizes 1k,100k --save benchmarks/baseline.json
+python benchmarks/suite.py --compare benchmarks/baseline.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from streamlit import config as st_config, logger as st_logger
+
+# Fungsi ber-cache dijalankan tanpa runtime Streamlit (bare mode): redam warning-nya.
+# Level logger di-reset saat Streamlit mendeteksi bare mode, filter tetap berlaku
+st_config.set_option('global.showWarningOnDirectExecution', False)
+st_logger.set_log_level('error')
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+    lambda record: record.levelno >= logging.ERROR
+)
+
+import utils
+from analytics import compute_preference_matrix, compute_trend_results
+from constants import CACHE_SUBDIR, DATA_FILES
+from ingest import cache_file
+from synthetic import fit_profile, generate_sales_export
+
+DEFAULT_SIZES = '1k,100k,1M,10M'
+
+# ==================== DATASETS ====================
+
+def parse_size(label):
+    """'1k' -> 1000, '1M' -> 1000000"""
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(label[-1].lower(), 1)
+    return int(float(label.rstrip('kKmM')) * multiplier)
+
+def dataset_path(workdir, n, seed, profile):
+    """
+    Export sintetis n baris (dipakai ulang antar run selama ukuran dan seed
+    sama). Katalog produk ikut membesar (~sqrt(n) asal daerah) agar chart
+    builder juga diuji di kardinalitas tinggi
+    """
+    path = os.path.join(workdir, f"sales_{n}_{seed}.csv")
+    if not os.path.exists(path):
+        product_scale = max(1, round(np.sqrt(n) / len(profile['items'][profile['categories'][0]]['values'])))
+        generate_sales_export(path, n, profile, seed=seed, product_scale=product_scale)
+    return path
+
+@contextlib.contextmanager
+def transactions_source(path):
+    """Arahkan DATA_FILES ke dataset benchmark selama blok berjalan"""
+    saved = dict(DATA_FILES)
+    DATA_FILES['transactions'] = path
+    DATA_FILES['transactions_dir'] = os.path.join(os.path.dirname(path), 'no-partitions')
+    try:
+        yield
+    finally:
+        DATA_FILES.update(saved)
+
+# ==================== MEASUREMENT ====================
+
+def measure(fn, repeats, setup=None):
+    """
+    Waktu (ms) dari `repeats` pemanggilan + peak memory (MB) dari satu pemanggilan.
+    Satu pemanggilan pemanasan (import lazy, validator plotly) tidak dihitung
+    """
+    if setup:
+        setup()
+    fn()
+    times = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'min_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'peak_mb': round(peak / 2 ** 20, 3),
+    }
+
+def bench_size(path, repeats):
+    """Semua case untuk satu dataset"""
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_SUBDIR)
+    results = {}
+
+    def load():
+        return utils.load_transaction_data()
+
+    def cold():
+        utils.load_transaction_data.clear()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def unshared():
+        utils.load_transaction_data.clear()
+        shutil.rmtree(cache_file(path, '.shared'), ignore_errors=True)
+
+    with transactions_source(path):
+        results['load_transaction_data[csv]'] = measure(load, repeats, setup=cold)
+        results['load_transaction_data[parquet]'] = measure(load, repeats, setup=unshared)
+        results['load_transaction_data[shared]'] = measure(load, repeats, setup=utils.load_transaction_data.clear)
+        results['load_transaction_data[memory]'] = measure(load, repeats)
+        df = load()
+
+    metrics = utils.calculate_metrics(df)
+    trend = compute_trend_results(df)
+    matrix = compute_preference_matrix(df)
+
+    results['calculate_metrics'] = measure(lambda: utils.calculate_metrics(df), repeats)
+    # Kolom produk object (CSV lama tanpa schema kategori): factorize string mendominasi
+    df_object = df.astype({utils.transaction_columns(df)['product']: 'object'})
+    results['calculate_metrics[object]'] = measure(lambda: utils.calculate_metrics(df_object), repeats)
+    results['get_monthly_trend'] = measure(lambda: utils.get_monthly_trend(df), repeats)
+    results['create_trend_chart'] = measure(
+        lambda: utils.create_trend_chart(trend), repeats, setup=utils._trend_chart_for.clear
+    )
+    results['create_preference_heatmap'] = measure(lambda: utils.create_preference_heatmap(matrix), repeats)
+    results['create_revenue_projection'] = measure(
+        lambda: utils.create_revenue_projection(metrics['total_revenue'], 20, 6), repeats
+    )
+    return results
+
+def run(sizes, repeats, workdir, seed):
+    os.makedirs(workdir, exist_ok=True)
+    profile = fit_profile()
+    results = {}
+    for label in sizes:
+        n = parse_size(label)
+        print(f"▶ {label} ({n:,} baris)", flush=True)
+        results[label] = bench_size(dataset_path(workdir, n, seed, profile), repeats)
+        for case, result in results[label].items():
+            print(f"  {case:<34} {result['median_ms']:12.2f} ms {result['peak_mb']:10.1f} MB", flush=True)
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'repeats': repeats,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+# ==================== BASELINE ====================
+
+def compare(current, baseline, threshold, min_ms=5.0, min_mb=1.0):
+    """
+    Bandingkan dengan baseline; return list regresi (waktu minimum / peak memory
+    naik lebih dari threshold). Selisih di bawah min_ms / min_mb dianggap noise.
+    """
+    regressions = []
+    for size, cases in current['results'].items():
+        for case, result in cases.items():
+            base = baseline['results'].get(size, {}).get(case)
+            if base is None:
+                continue
+            for key, floor in (('min_ms', min_ms), ('peak_mb', min_mb)):
+                delta = result[key] - base[key]
+                if delta > floor and result[key] > base[key] * (1 + threshold):
+                    regressions.append({
+                        'size': size, 'case': case, 'metric': key,
+                        'baseline': base[key], 'current': result[key],
+                        'change_pct': round(delta * 100 / base[key], 1) if base[key] else None,
+                    })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite dashboard")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Ukuran dataset, mis. 1k,100k,1M,10M")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'ggg-benchmarks'),
+                        help="Folder dataset sintetis (dipakai ulang antar run)")
+    parser.add_argument('--save', help="Simpan hasil sebagai baseline JSON")
+    parser.add_argument('--compare', help="Baseline JSON pembanding")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Batas regresi relatif (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes.split(','), args.repeats, args.workdir, args.seed)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"💾 Baseline disimpan: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for r in regressions:
+            print(f"❌ {r['size']} {r['case']} {r['metric']}: {r['baseline']} -> {r['current']} (+{r['change_pct']}%)")
+        if regressions:
+            return 1
+        print(f"✅ Tidak ada regresi > {args.threshold:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -78,6 +78,13 @@ CUSTOMER_CATEGORIES = {
     }
 }
 
+# Kode Kategori Kedai di export penjualan → label kategori customer
+OUTLET_CATEGORY_LABELS = {
+    'Big': 'Big Cafe',
+    'Medium': 'Medium Cafe',
+    'Perorangan': 'Perorangan',
+}
+
 # ==================== KPI TARGETS ====================
 KPI_TARGETS = {
     'revenue_target_6month': 212_000_000,      # Rp 212M per bulan
@@ -105,6 +112,33 @@ TREND_CUTOFF = {
     'stable_range': (-2, 5),                   # Slope between -2 and 5
 }
 
+TREND_STATUS = {
+    'rising': '⭐ Rising Star',
+    'stable': '➡️ Stable',
+    'declining': '🔴 Declining',
+}
+
+# ==================== FORECAST ====================
+# Exponential smoothing per produk × kategori kedai (lihat forecast.py)
+FORECAST_CONFIG = {
+    'horizon': 6,                                   # Bulan ke depan
+    'season_length': 12,                            # Musiman dipakai jika histori >= 2 musim
+    'alpha_grid': (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9),   # Level
+    'beta_grid': (0.0, 0.05, 0.1, 0.2, 0.3),                        # Trend
+    'gamma_grid': (0.0, 0.1, 0.3, 0.5),                             # Musiman
+    'max_state_values': 4_000_000,                  # Batas elemen state (grid × seri) per batch
+}
+
+# ==================== REVENUE SCENARIOS ====================
+# Monte Carlo skenario revenue (lihat simulation.py)
+SIMULATION_CONFIG = {
+    'paths': 200_000,           # Jumlah path per simulasi
+    'months': 6,                # Horizon proyeksi
+    'seed': 2025,               # Seed tetap: grafik sama di setiap rerun
+    'chunk_paths': 250_000,     # Path per chunk (unit kerja process pool)
+    'percentiles': (5, 50, 95),
+}
+
 # ==================== VISUALIZATION CONFIG ====================
 CHART_CONFIG = {
     'height': 500,
@@ -118,15 +152,105 @@ HEATMAP_CONFIG = {
     'colorscale': 'Blues',
     'height': 400,
     'show_values': True,
+    'max_products': 60,                         # Baris lain dilipat ke "Lainnya"
+    'max_categories': 30,                       # Kolom lain dilipat ke "Lainnya"
+    'max_cells': 3000,                          # Batas payload z yang dikirim ke browser
+    'row_height': 18,                           # Tinggi per baris saat produk banyak
 }
 
 # ==================== DATA FILES ====================
 DATA_FILES = {
     'transactions': 'data/Transaksi-Penjualan-2025.csv',
+    'transactions_dir': 'data/transactions',     # Export multi-tahun (mis. year=2025/month=01/*.csv)
     'trend_results': 'data/trend_analysis_results.csv',
     'preference_results': 'data/preference_analysis_results.csv',
 }
 
+# Cache kolumnar ditulis di subfolder ini, di sebelah file sumber
+CACHE_SUBDIR = '.cache'
+
+# Cache bersama antar worker: kolom & agregat sebagai .npy yang di-memory-map
+SHARED_CACHE = {
+    'enabled': True,
+    'keep_versions': 2,   # Versi data lama yang disimpan (worker yang belum reload)
+}
+
+# ==================== ANALYTICS BACKEND ====================
+# Pemilihan backend otomatis menurut ukuran sumber (lihat backends.py)
+ANALYTICS_BACKEND = {
+    'process_min_bytes': 256_000_000,     # Di atas ini: process pool per rentang byte
+    'spark_min_bytes': 8_000_000_000,     # Di atas ini: PySpark lokal (jika terpasang)
+    'chunk_bytes': 64_000_000,            # Ukuran satu tugas process pool
+    'spark_master': 'local[*]',
+    'spark_driver_memory': '4g',
+}
+
+# ==================== SQL QUERY ====================
+# Halaman Query: SQL read-only atas data transaksi (lihat query.py)
+QUERY_CONFIG = {
+    'table': 'transaksi',
+    'max_rows': 100_000,        # Baris hasil yang disimpan; sisanya tidak di-fetch
+    'page_size': 100,           # Baris per halaman tabel
+    'fetch_rows': 10_000,       # Ukuran batch fetchmany
+    'load_rows': 100_000,       # Baris per batch saat kolom disalin ke SQLite (tanpa DuckDB)
+    'cache_entries': 64,        # Hasil query yang di-cache (per query + versi data)
+    'timeout_seconds': 30,
+}
+QUERY_EXAMPLE = """SELECT "Asal Daerah", COUNT(*) AS transaksi, SUM(Jumlah) AS revenue
+FROM transaksi
+WHERE Tanggal >= '2025-07-01'
+GROUP BY "Asal Daerah"
+ORDER BY revenue DESC"""
+
+# ==================== INSTRUMENTATION ====================
+# Export timing per rerun (lihat instrument.py); aktif lewat panel debug di sidebar
+# Satu file per proses server ({pid}), sehingga tidak ada dua proses yang menulis file yang sama
+METRICS_FILES = {
+    'jsonl': 'data/.cache/metrics/runs-{pid}.jsonl',           # Satu baris JSON per rerun, dirotasi
+    'prometheus': 'data/.cache/metrics/dashboard-{pid}.prom',  # Counter kumulatif (textfile collector)
+}
+METRICS_ROTATION = {
+    'max_bytes': 5_000_000,  # Rotasi runs-{pid}.jsonl saat melewati ukuran ini
+    'backups': 3,            # runs-{pid}.jsonl.1 .. .3
+}
+# Tanpa panel debug, rerun dikumpulkan dan ditulis paling sering sekali per interval ini
+METRICS_EXPORT_INTERVAL = 60
+
+# ==================== TRANSACTION SCHEMA ====================
+# Export "Transaksi Penjualan": delimiter ';', UTF-8 dengan BOM, baris TOTAL di akhir
+TRANSACTION_CSV_OPTIONS = {
+    'sep': ';',
+    'encoding': 'utf-8-sig',
+}
+
+# Kolom No & Jumlah Transaksi Bulan hanya nomor urut, tidak ikut dibaca
+TRANSACTION_DTYPES = {
+    'Bulan': 'object',
+    'Nama Kedai': 'object',
+    'Kategori Kedai': 'object',
+    'Nama Produk': 'object',
+    'Asal Daerah': 'object',
+    'Qty Kg': 'Int64',              # Nullable saat parse, int64 setelah baris TOTAL dibuang
+    'Harga Per Kg': 'Int64',
+    'Jumlah': 'Int64',              # Nilai transaksi (IDR)
+}
+
+MONTH_NUMBERS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Mei': 5,
+    'Jun': 6, 'Jul': 7, 'Aug': 8, 'Agu': 8, 'Agt': 8, 'Sep': 9,
+    'Oct': 10, 'Okt': 10, 'Nov': 11, 'Dec': 12, 'Des': 12,
+}
+
+INGEST_CHUNK_ROWS = 500_000
+
+# Representasi compact di memory (lihat utils.apply_transaction_schema)
+CATEGORICAL_COLUMNS = ['Nama Kedai', 'Kategori Kedai', 'Nama Produk', 'Asal Daerah']
+NARROW_INT_COLUMNS = {
+    'Qty Kg': 'int32',
+    'Harga Per Kg': 'int32',
+}
+AMOUNT_COLUMNS = ['Jumlah']                     # int32 jika muat, int64 jika perlu
+
 # ==================== TEXT CONTENT ====================
 APP_TITLE = "📊 Dashboard Analisis Penjualan Galunggung Green Glory"
 APP_SUBTITLE = "Big Data & Machine Learning Analysis | 2025"
@@ -0,0 +1,168 @@
+"""
+forecast.py - Forecast permintaan per produk × kategori kedai
+Exponential smoothing aditif (Holt, plus komponen musiman jika histori
+mencakup ≥ 2 musim) di-fit untuk semua seri sekaligus: state level / trend /
+musim berupa array (kombinasi parameter × seri) yang di-update per bulan
+"""
+
+from analytics import cube_rollup
+from constants import FORECAST_CONFIG
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+FORECAST_MEASURES = ('kg', 'revenue')
+
+# ==================== SERIES ====================
+
+def series_matrix(cube, product_dim='region', mask=None):
+    """
+    Seri bulanan per produk × kategori kedai dari cube (hanya pasangan yang
+    pernah bertransaksi, dalam filter sel mask jika ada). Return dict labels +
+    matrix bulan × seri per measure
+    """
+    counts = cube_rollup(cube, (product_dim, 'category'), 'count', mask)
+    product_idx, category_idx = np.nonzero(counts)
+    n_categories = counts.shape[1] if counts.ndim == 2 else 0
+    keep = product_idx * n_categories + category_idx
+    series = {
+        'months': np.asarray(cube['dims']['month']),
+        'products': list(cube['dims'][product_dim]),
+        'categories': list(cube['dims']['category']),
+        'product_idx': product_idx.astype('int64'),
+        'category_idx': category_idx.astype('int64'),
+    }
+    n_months = len(series['months'])
+    # Dengan filter, histori dipotong ke rentang bulan yang berisi data terpilih
+    active = np.flatnonzero(cube_rollup(cube, 'month', 'count', mask)) if mask is not None else None
+    span = slice(active[0], active[-1] + 1) if active is not None and len(active) else slice(None)
+    series['months'] = series['months'][span]
+    for measure in FORECAST_MEASURES:
+        values = cube_rollup(cube, ('month', product_dim, 'category'), measure, mask)
+        series[measure] = values.reshape(n_months, counts.size)[span, keep].astype('float64')
+    return series
+
+# ==================== SMOOTHING ====================
+
+def _parameter_grid(seasonal):
+    alpha, beta, gamma = np.meshgrid(
+        np.asarray(FORECAST_CONFIG['alpha_grid'], dtype='float64'),
+        np.asarray(FORECAST_CONFIG['beta_grid'], dtype='float64'),
+        np.asarray(FORECAST_CONFIG['gamma_grid'] if seasonal else (0.0,), dtype='float64'),
+        indexing='ij',
+    )
+    return alpha.ravel(), beta.ravel(), gamma.ravel()
+
+def smooth(y, alpha, beta, gamma, season_length=0):
+    """
+    Recursion Holt(-Winters) aditif untuk G kombinasi parameter × S seri
+    sekaligus. y: (bulan, S); alpha/beta/gamma: (G,). Return dict sse, level,
+    trend (G, S) dan season (G, season_length, S)
+    """
+    n_months, n_series = y.shape
+    shape = (len(alpha), n_series)
+    a, b, g = alpha[:, None], beta[:, None], gamma[:, None]
+
+    if season_length:
+        # Inisialisasi dari rata-rata dua musim pertama
+        first, second = y[:season_length].mean(axis=0), y[season_length:2 * season_length].mean(axis=0)
+        level = np.broadcast_to(first, shape).copy()
+        trend = np.broadcast_to((second - first) / season_length, shape).copy()
+        season = np.broadcast_to((y[:season_length] - first)[None], (shape[0], season_length, n_series)).copy()
+        start = season_length
+    else:
+        level = np.broadcast_to(y[0], shape).copy()
+        trend = np.broadcast_to(y[1] - y[0] if n_months > 1 else np.zeros(n_series), shape).copy()
+        season = np.zeros((shape[0], 0, n_series))
+        start = 1
+
+    sse = np.zeros(shape)
+    for t in range(start, n_months):
+        s = season[:, t % season_length] if season_length else 0.0
+        error = y[t] - (level + trend + s)
+        sse += error * error
+        new_level = a * (y[t] - s) + (1 - a) * (level + trend)
+        trend = b * (new_level - level) + (1 - b) * trend
+        if season_length:
+            season[:, t % season_length] = g * (y[t] - new_level) + (1 - g) * s
+        level = new_level
+    return {'sse': sse, 'level': level, 'trend': trend, 'season': season}
+
+def fit_series(y, horizon=FORECAST_CONFIG['horizon'], season_length=FORECAST_CONFIG['season_length']):
+    """
+    Grid search parameter per seri (SSE one-step-ahead terkecil), diproses per
+    batch seri supaya memory state (grid × seri) tetap terbatas. Return
+    parameter terpilih, state akhir dan forecast (horizon × seri, ≥ 0)
+    """
+    n_months, n_series = y.shape
+    seasonal = n_months >= 2 * season_length
+    season_length = season_length if seasonal else 0
+    alpha, beta, gamma = _parameter_grid(seasonal)
+    per_series = len(alpha) * (season_length + 4)
+    batch = max(1, FORECAST_CONFIG['max_state_values'] // per_series)
+
+    fields = ('alpha', 'beta', 'gamma', 'level', 'trend', 'sse')
+    model = {field: np.zeros(n_series) for field in fields}
+    model['season'] = np.zeros((season_length, n_series))
+    for begin in range(0, n_series, batch):
+        part = slice(begin, begin + batch)
+        if n_months < 2:
+            model['level'][part] = y[-1, part] if n_months else 0.0
+            continue
+        state = smooth(y[:, part], alpha, beta, gamma, season_length)
+        best = state['sse'].argmin(axis=0)
+        columns = np.arange(len(best))
+        model['alpha'][part], model['beta'][part], model['gamma'][part] = alpha[best], beta[best], gamma[best]
+        for field in ('level', 'trend', 'sse'):
+            model[field][part] = state[field][best, columns]
+        model['season'][:, part] = state['season'][best, :, columns].T
+
+    steps = np.arange(1, horizon + 1, dtype='float64')[:, None]
+    forecast = model['level'] + steps * model['trend']
+    if season_length:
+        forecast += model['season'][(n_months + np.arange(horizon)) % season_length]
+    model['forecast'] = np.maximum(forecast, 0.0)
+    model['seasonal'] = bool(seasonal)
+    return model
+
+def fit_forecasts(cube, horizon=FORECAST_CONFIG['horizon'], mask=None):
+    """Fit model kg & revenue untuk semua seri produk × kategori kedai di cube (opsional difilter)"""
+    series = series_matrix(cube, mask=mask)
+    months = series['months']
+    last = months[-1] if len(months) else np.datetime64('today', 'M')
+    result = {
+        key: series[key] for key in ('months', 'products', 'categories', 'product_idx', 'category_idx')
+    }
+    result['future_months'] = np.arange(last + 1, last + 1 + horizon).astype('datetime64[M]')
+    for measure in FORECAST_MEASURES:
+        result[measure] = {'history': series[measure], **fit_series(series[measure], horizon)}
+    return result
+
+# ==================== RESULTS ====================
+
+def forecast_totals(model, measure):
+    """Histori + forecast total semua seri per bulan (kolom Month, Value, Jenis)"""
+    history = model[measure]['history'].sum(axis=1)
+    forecast = model[measure]['forecast'].sum(axis=1)
+    return pd.DataFrame({
+        'Month': pd.to_datetime(np.concatenate([model['months'], model['future_months']])),
+        'Value': np.concatenate([history, forecast]),
+        'Jenis': ['Histori'] * len(history) + ['Forecast'] * len(forecast),
+    })
+
+def forecast_table(model, measure):
+    """Satu baris per seri: parameter fit dan forecast bulan pertama / total horizon"""
+    fitted = model[measure]
+    products = np.array(model['products'], dtype='object')
+    categories = np.array(model['categories'], dtype='object')
+    return pd.DataFrame({
+        'Produk': products[model['product_idx']],
+        'Tipe_Kedai': categories[model['category_idx']],
+        'Rata_Rata_Bulanan': np.round(fitted['history'].mean(axis=0), 2) if len(fitted['history']) else 0.0,
+        'Forecast_Bulan_Depan': np.round(fitted['forecast'][0], 2) if len(fitted['forecast']) else 0.0,
+        'Forecast_Total': np.round(fitted['forecast'].sum(axis=0), 2),
+        'Alpha': fitted['alpha'],
+        'Beta': fitted['beta'],
+        'Gamma': fitted['gamma'],
+    }).sort_values('Forecast_Total', ascending=False, ignore_index=True)
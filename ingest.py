@@ -0,0 +1,650 @@
+"""
+ingest.py - Ingest data transaksi dengan cache kolumnar di disk
+CSV hanya di-parse ulang jika file sumber berubah, selain itu kolom yang
+sudah bertipe dibaca langsung dari cache bersama (mmap) atau Parquet
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import (
+    CACHE_SUBDIR, INGEST_CHUNK_ROWS, MONTH_NUMBERS,
+    TRANSACTION_CSV_OPTIONS, TRANSACTION_DTYPES,
+)
+from lazy import lazy_import
+from shared_cache import open_frame, shared_frame
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+CACHE_FORMAT_VERSION = 6
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Konversi pandas -> Arrow tidak thread-safe saat pertama dipakai: tulisan Parquet
+# paralel (TransactionDataset.load) kadang menyimpan timestamp[us] alih-alih [ns]
+_parquet_lock = threading.Lock()
+
+# ==================== FINGERPRINT ====================
+
+def content_hash(path):
+    """Hitung hash isi file secara streaming"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_fingerprint(path, with_hash=True):
+    """Size, mtime dan (opsional) content hash dari file sumber"""
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        fingerprint['hash'] = content_hash(path)
+    return fingerprint
+
+def data_version(df):
+    """Versi data (content hash sumber) dari frame hasil load_transactions"""
+    return df.attrs.get('ingest', {}).get('data_version')
+
+def ingest_parts(df):
+    """Urutan bagian sumber (name, version, rows) yang membentuk frame"""
+    return df.attrs.get('ingest', {}).get('parts', [])
+
+def appended_from(df):
+    """
+    {'version', 'rows'} jika frame = frame versi sebelumnya (rows baris pertama)
+    + baris yang di-append di akhir file; None jika frame dibangun utuh
+    """
+    return df.attrs.get('ingest', {}).get('appended')
+
+def cache_file(path, suffix):
+    """Path file cache turunan (mis. '.parquet') untuk sebuah file sumber"""
+    directory, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(directory, CACHE_SUBDIR, f"{stem}{suffix}")
+
+def cache_paths(path):
+    """Path file Parquet dan manifest cache untuk sebuah file sumber"""
+    return cache_file(path, '.parquet'), cache_file(path, '.manifest.json')
+
+# ==================== PARSING ====================
+
+def parse_month_codes(values):
+    """
+    Konversi kode bulan ("Jan-2025") ke datetime awal bulan. Setiap kode unik
+    hanya di-parse sekali, lalu di-broadcast lewat lookup table
+    """
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        # Mis. chunk terakhir yang hanya berisi baris TOTAL
+        return np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    parts = pd.Series(uniques, dtype='object').str.split('-', n=1, expand=True)
+    months = parts[0].str.strip().str[:3].str.title().map(MONTH_NUMBERS)
+    years = pd.to_numeric(parts[1], errors='coerce')
+
+    invalid = months.isna() | years.isna()
+    if invalid.any():
+        raise ValueError(f"Kode bulan tidak dikenal: {', '.join(map(str, uniques[invalid.values][:5]))}")
+
+    lookup = pd.to_datetime(pd.DataFrame({'year': years, 'month': months, 'day': 1})).values
+    return lookup[codes]
+
+def _prepare_sales_chunk(chunk):
+    """Buang baris TOTAL/kosong, narrowing ke int64 dan tambah kolom Tanggal"""
+    chunk = chunk[chunk['Bulan'].notna()]
+    df = pd.DataFrame({'Tanggal': parse_month_codes(chunk['Bulan'].values)})
+    for column, dtype in TRANSACTION_DTYPES.items():
+        if column == 'Bulan':
+            continue
+        values = chunk[column]
+        df[column] = values.to_numpy(dtype='int64') if dtype == 'Int64' else values.values
+    return df
+
+def iter_sales_export(path, chunksize=INGEST_CHUNK_ROWS):
+    """Baca export penjualan per chunk dengan memory yang terbatas"""
+    reader = pd.read_csv(
+        path,
+        usecols=list(TRANSACTION_DTYPES),
+        dtype=TRANSACTION_DTYPES,
+        chunksize=chunksize,
+        **TRANSACTION_CSV_OPTIONS,
+    )
+    with reader:
+        for chunk in reader:
+            yield _prepare_sales_chunk(chunk)
+
+def read_sales_export(path, chunksize=INGEST_CHUNK_ROWS):
+    """Parse file "Transaksi Penjualan" (delimiter ';') ke frame bertipe"""
+    chunks = list(iter_sales_export(path, chunksize))
+    if not chunks:
+        return _prepare_sales_chunk(pd.DataFrame({c: pd.Series(dtype=t) for c, t in TRANSACTION_DTYPES.items()}))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+def is_sales_export(path):
+    """Deteksi format export penjualan dari baris header"""
+    with open(path, encoding=TRANSACTION_CSV_OPTIONS['encoding']) as f:
+        header = f.readline()
+    return TRANSACTION_CSV_OPTIONS['sep'] in header and 'Bulan' in header
+
+def read_transactions_csv(path):
+    """Parse CSV transaksi langsung (export ';' atau CSV dengan kolom Tanggal)"""
+    if is_sales_export(path):
+        return read_sales_export(path)
+
+    df = pd.read_csv(path)
+    if 'Tanggal' in df.columns:
+        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+    return df
+
+# ==================== CACHE ====================
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        return None
+    return manifest
+
+def write_atomic(path, write):
+    """Tulis ke file sementara lalu rename, supaya reader tidak melihat file setengah jadi"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_manifest(manifest_path, manifest):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    write_atomic(manifest_path, write)
+
+def _write_cache(df, parquet_path, manifest_path, fingerprint, checkpoint, appended=None):
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+
+    def write(tmp_path):
+        with _parquet_lock:
+            df.to_parquet(tmp_path, index=False)
+    write_atomic(parquet_path, write)
+    _write_manifest(manifest_path, {
+        'format_version': CACHE_FORMAT_VERSION,
+        'source': fingerprint,
+        'rows': len(df),
+        'segments': checkpoint['segments'],
+        'tail': checkpoint['tail'],
+        'appended': appended,
+    })
+
+def _cached_fingerprint(path, manifest):
+    """Cek apakah cache masih valid; return fingerprint sumber atau None"""
+    if manifest is None:
+        return None
+    cached = manifest['source']
+    current = file_fingerprint(path, with_hash=False)
+    if current['size'] != cached['size']:
+        return None
+    if current['mtime_ns'] == cached['mtime_ns']:
+        return cached
+    # mtime berubah (mis. file di-copy ulang) tapi isi bisa saja sama
+    current['hash'] = content_hash(path)
+    if current['hash'] != cached['hash']:
+        return None
+    return current
+
+# ==================== APPEND CHECKPOINT ====================
+# Export ditambah baris baru sepanjang bulan. Manifest mencatat segmen byte
+# yang sudah di-parse (offset akhir, hash, jumlah baris); jika semua segmen
+# lama masih utuh, hanya byte setelah segmen terakhir yang di-parse ulang.
+# Paling banyak dua segmen disimpan: prefix gabungan (hash kumulatif byte
+# [0, end) + versi berantai untuk ingest_parts) dan segmen append terakhir.
+
+# Baris penutup yang isinya berubah tiap export ditambah (TOTAL, baris kosong)
+_TRAILER_MARKERS = (b'TOTAL', TRANSACTION_CSV_OPTIONS['sep'].encode())
+_CHECKPOINT_WINDOW = 1 << 16
+
+def checkpoint_offset(path, size):
+    """
+    Offset byte setelah baris data lengkap terakhir. Baris tanpa newline dan
+    trailer (TOTAL / baris kosong) ada di belakang offset ini, karena akan
+    ditulis ulang saat export ditambah
+    """
+    start = max(0, size - _CHECKPOINT_WINDOW)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        window = f.read(size - start)
+    end = window.rfind(b'\n') + 1
+    while end > 0:
+        line_start = window.rfind(b'\n', 0, end - 1) + 1
+        line = window[line_start:end].strip()
+        if line and not line.startswith(_TRAILER_MARKERS):
+            break
+        end = line_start
+    return start + end
+
+def _hash_ranges(path, boundaries):
+    """
+    Hash tiap rentang byte [boundaries[i], boundaries[i+1]), hash kumulatif
+    [0, boundaries[i+1]) dan hash seluruh file, dalam satu kali baca
+    """
+    full = hashlib.blake2b(digest_size=16)
+    hashes, prefixes = [], []
+    with open(path, 'rb') as f:
+        for begin, end in zip(boundaries, boundaries[1:]):
+            digest = hashlib.blake2b(digest_size=16)
+            remaining = end - begin
+            while remaining > 0:
+                chunk = f.read(min(_HASH_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                full.update(chunk)
+                remaining -= len(chunk)
+            hashes.append(digest.hexdigest())
+            prefixes.append(full.copy().hexdigest())
+    return hashes, prefixes, full.hexdigest()
+
+def _parse_range(path, begin, end, parser):
+    """Parse byte [begin, end) dengan baris header file, lewat file sementara di folder cache"""
+    tmp_path = cache_file(path, f".range.{os.getpid()}.csv")
+    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+    try:
+        with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            header = src.readline()
+            dst.write(header)
+            src.seek(max(begin, len(header)))
+            dst.write(src.read(max(end - max(begin, len(header)), 0)))
+        return parser(tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _scan(path, segments):
+    """
+    Fingerprint file + checkpoint baru. `segments` = segmen lama yang harus
+    tetap utuh; return None jika salah satunya berubah (file ditulis ulang)
+    """
+    fingerprint = file_fingerprint(path, with_hash=False)
+    size = fingerprint['size']
+    ends = [segment['end'] for segment in segments]
+    if ends and ends[-1] > size:
+        return None
+    offset = checkpoint_offset(path, size)
+    if ends and offset < ends[-1]:
+        offset = ends[-1]
+    boundaries = [0, *ends]
+    if offset > boundaries[-1] or not ends:
+        boundaries.append(offset)
+    hashes, prefixes, fingerprint['hash'] = _hash_ranges(path, [*boundaries, size])
+    if any(segment['hash'] != h for segment, h in zip(segments, hashes)):
+        return None
+    return {
+        'fingerprint': fingerprint,
+        'boundaries': boundaries,
+        'hashes': hashes,
+        'prefixes': prefixes,
+        'size': size,
+    }
+
+def _chain_version(version, digest):
+    """Versi prefix setelah segmen berhash `digest` digabung ke prefix berversi `version`"""
+    return hashlib.blake2b(f"{version}:{digest}".encode(), digest_size=16).hexdigest()
+
+def _coalesce_segments(segments, prefixes):
+    """
+    Gabungkan semua segmen kecuali yang terakhir menjadi satu prefix: hash
+    kumulatif dari `prefixes` (untuk verifikasi), versi berantai (untuk parts)
+    """
+    if len(segments) <= 2:
+        return segments
+    version = segments[0]['version']
+    for segment in segments[1:-1]:
+        version = _chain_version(version, segment['hash'])
+    prefix = {
+        'end': segments[-2]['end'],
+        'hash': prefixes[len(segments) - 2],
+        'version': version,
+        'rows': sum(segment['rows'] for segment in segments[:-1]),
+    }
+    return [prefix, segments[-1]]
+
+def coalesce_parts(parts):
+    """
+    Parts seperti sesudah checkpoint berikutnya: bagian-bagian file terakhir
+    (name, name@offset, ...) digabung menjadi satu prefix berversi berantai
+    """
+    names = [re.sub(r'@\d+$', '', part['name']) for part in parts]
+    if not parts or names[-1] not in (part['name'] for part in parts):
+        return list(parts)
+    start = max(i for i, part in enumerate(parts) if part['name'] == names[-1])
+    run = parts[start:]
+    version = run[0]['version']
+    for part in run[1:]:
+        version = _chain_version(version, part['version'])
+    return [*parts[:start], {'name': names[-1], 'version': version, 'rows': sum(part['rows'] for part in run)}]
+
+def _segment_parts(path, manifest):
+    """Bagian sumber (lihat ingest_parts) dari segmen manifest: satu per segmen, plus tail jika berisi baris"""
+    name = os.path.basename(path)
+    parts, begin = [], 0
+    for segment in manifest['segments']:
+        version = segment['version'] if begin == 0 else segment['hash']
+        parts.append({'name': name if begin == 0 else f"{name}@{begin}", 'version': version, 'rows': segment['rows']})
+        begin = segment['end']
+    tail = manifest['tail']
+    if tail['rows']:
+        parts.append({'name': f"{name}@{begin}", 'version': tail['hash'], 'rows': tail['rows']})
+    return parts
+
+def _parse_segments(path, parser, scan, segments, previous):
+    """
+    Parse byte yang belum tercakup `segments` lalu gabungkan dengan frame
+    `previous` (None = parse seluruh file). Return (frame, checkpoint baru)
+    """
+    boundaries, hashes, size = scan['boundaries'], scan['hashes'], scan['size']
+    known = len(segments)
+    tail = _parse_range(path, boundaries[-1], size, parser)
+    if previous is None:
+        whole = parser(path)
+        frames, rows = [whole], [len(whole) - len(tail)]
+    else:
+        new = [_parse_range(path, begin, end, parser) for begin, end in zip(boundaries[known:], boundaries[known + 1:])]
+        frames, rows = [previous, *new, tail], [len(frame) for frame in new]
+    df = concat_frames([frame for frame in frames if len(frame)] or frames[:1])
+    segments = segments + [
+        {'end': end, 'hash': digest, 'rows': n}
+        for end, digest, n in zip(boundaries[known + 1:], hashes[known:], rows)
+    ]
+    if segments:
+        segments[0] = dict(segments[0], version=segments[0].get('version', segments[0]['hash']))
+    checkpoint = {
+        'segments': _coalesce_segments(segments, scan['prefixes']),
+        'tail': {'hash': hashes[-1], 'rows': len(tail)},
+    }
+    return df, checkpoint
+
+def _previous_frame(shared_root, parquet_path, manifest):
+    """Frame versi sebelumnya dari cache bersama atau Parquet"""
+    df = open_frame(shared_root, manifest['source']['hash'], 'transactions')
+    if df is None:
+        df = pd.read_parquet(parquet_path)
+    if len(df) != manifest['rows']:
+        raise ValueError("Cache tidak sesuai manifest")
+    return df
+
+def load_transactions(path, parser=read_transactions_csv):
+    """
+    Load transaksi lewat cache bersama (mmap, lihat shared_cache.py), lalu
+    cache Parquet, lalu CSV. Jika file hanya ditambah di akhir, cukup byte
+    baru yang di-parse dan digabung ke frame versi sebelumnya. Metadata load
+    (source, data_version, parts, appended, load_seconds) ada di df.attrs['ingest']
+    """
+    start = time.perf_counter()
+    parquet_path, manifest_path = cache_paths(path)
+    shared_root = cache_file(path, '.shared')
+    manifest = _read_manifest(manifest_path)
+    fingerprint = _cached_fingerprint(path, manifest)
+    scan = None
+    if fingerprint is None:
+        # File berubah: prefix lama dipakai ulang hanya jika semua segmennya masih utuh
+        if manifest is not None and not manifest['tail']['rows']:
+            scan = _scan(path, manifest['segments'])
+        if scan is None:
+            manifest, scan = None, _scan(path, [])
+        fingerprint = scan['fingerprint']
+    elif fingerprint is not manifest['source']:
+        manifest['source'] = fingerprint
+        try:
+            _write_manifest(manifest_path, manifest)
+        except OSError:
+            pass
+
+    loaded = {'source': 'shared', 'manifest': manifest}
+
+    def finish(df, checkpoint, previous):
+        appended = None if previous is None else {'version': manifest['source']['hash'], 'rows': len(previous)}
+        loaded['source'] = 'csv' if previous is None else 'append'
+        loaded['manifest'] = {'source': fingerprint, 'rows': len(df), 'appended': appended, **checkpoint}
+        try:
+            _write_cache(df, parquet_path, manifest_path, fingerprint, checkpoint, appended)
+        except (OSError, ValueError, ImportError):
+            # Folder read-only atau pyarrow tidak tersedia: tetap jalan tanpa cache
+            pass
+        return df
+
+    def build():
+        if scan is None:
+            try:
+                df = pd.read_parquet(parquet_path)
+                loaded['source'] = 'cache'
+                return df
+            except (OSError, ValueError, ImportError):
+                pass
+        elif manifest is not None:
+            try:
+                previous = _previous_frame(shared_root, parquet_path, manifest)
+                return finish(*_parse_segments(path, parser, scan, manifest['segments'], previous), previous)
+            except (OSError, ValueError, ImportError):
+                pass
+        full_scan = scan if scan is not None and manifest is None else _scan(path, [])
+        return finish(*_parse_segments(path, parser, full_scan, [], None), None)
+
+    df = shared_frame(shared_root, fingerprint['hash'], 'transactions', build)
+    current = loaded['manifest']
+    if current is None or current['source']['hash'] != fingerprint['hash']:
+        # Frame dibangun worker lain: metadata segmen dari manifest yang ditulisnya
+        current = _read_manifest(manifest_path)
+        if current is not None and current['source']['hash'] != fingerprint['hash']:
+            current = None
+    df.attrs['ingest'] = {
+        'source': loaded['source'],
+        'data_version': fingerprint['hash'],
+        'load_seconds': time.perf_counter() - start,
+        'parts': _segment_parts(path, current) if current is not None else [
+            {'name': os.path.basename(path), 'version': fingerprint['hash'], 'rows': len(df)}
+        ],
+        'appended': current['appended'] if current is not None else None,
+    }
+    return df
+
+# ==================== PARTITIONED DATASET ====================
+
+_HIVE_YEAR = re.compile(r'^year=(\d{4})$')
+_HIVE_MONTH = re.compile(r'^month=(\d{1,2})$')
+_NAME_YEAR_MONTH = re.compile(r'(?<!\d)(\d{4})[-_](\d{2})(?!\d)')
+_NAME_YEAR = re.compile(r'(?<!\d)(20\d{2})(?!\d)')
+
+def to_month(value):
+    """Konversi tanggal/string ke numpy datetime64[M]; None tetap None"""
+    if value is None:
+        return None
+    return np.datetime64(pd.Timestamp(value), 'M')
+
+def partition_hint(relpath):
+    """
+    Tebak rentang bulan partisi dari path: year=YYYY/month=MM (gaya hive),
+    YYYY-MM atau YYYY di nama file. Return (min_month, max_month) atau (None, None)
+    """
+    parts = relpath.replace(os.sep, '/').split('/')
+    year = month = None
+    for part in parts[:-1]:
+        if _HIVE_YEAR.match(part):
+            year = int(_HIVE_YEAR.match(part).group(1))
+        elif _HIVE_MONTH.match(part):
+            month = int(_HIVE_MONTH.match(part).group(1))
+    if year is None:
+        match = _NAME_YEAR_MONTH.search(parts[-1])
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+        else:
+            match = _NAME_YEAR.search(parts[-1])
+            year = int(match.group(1)) if match else None
+    if year is None:
+        return None, None
+    if month is not None:
+        period = f"{year:04d}-{month:02d}"
+        return period, period
+    return f"{year:04d}-01", f"{year:04d}-12"
+
+def filter_months(df, start=None, end=None):
+    """Ambil baris dengan Tanggal di rentang bulan [start, end] (inklusif)"""
+    if df.empty or (start is None and end is None):
+        return df
+    months = df['Tanggal'].values.astype('datetime64[M]')
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= months >= to_month(start)
+    if end is not None:
+        mask &= months <= to_month(end)
+    if mask.all():
+        return df
+
+    filtered = df[mask].reset_index(drop=True)
+    # Subset bukan lagi gabungan utuh dari bagian sumbernya
+    ingest = dict(df.attrs.get('ingest', {}))
+    ingest['data_version'] = f"{ingest.get('data_version')}:{start}:{end}"
+    ingest['parts'] = []
+    ingest['appended'] = None
+    filtered.attrs['ingest'] = ingest
+    return filtered
+
+def concat_frames(frames):
+    """Gabungkan frame partisi; kolom categorical tetap categorical (kategori di-union)"""
+    frames = [f for f in frames if len(f.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.Index(sorted(set().union(*(f[column].cat.categories for f in frames))))
+            frames = [f.assign(**{column: f[column].cat.set_categories(categories)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+class TransactionDataset:
+    """
+    Kumpulan file export transaksi di satu folder (boleh bertingkat, mis.
+    year=2025/month=01/). Manifest kecil menyimpan jumlah baris dan bulan
+    min/max per partisi, sehingga load dengan filter tanggal hanya membaca
+    partisi yang relevan
+    """
+
+    def __init__(self, root, parser=read_transactions_csv, pattern=r'\.csv$'):
+        self.root = root
+        self.parser = parser
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.manifest_path = os.path.join(root, CACHE_SUBDIR, '_partitions.json')
+
+    def _discover(self):
+        found = []
+        for directory, subdirs, files in os.walk(self.root):
+            subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+            for name in sorted(files):
+                if self.pattern.search(name):
+                    found.append(os.path.relpath(os.path.join(directory, name), self.root))
+        return found
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def partitions(self):
+        """Daftar partisi dengan statistik manifest (jika masih valid) atau tebakan dari path"""
+        manifest = self._read_manifest()
+        result = []
+        for relpath in self._discover():
+            path = os.path.join(self.root, relpath)
+            fingerprint = file_fingerprint(path, with_hash=False)
+            entry = manifest.get(relpath)
+            if entry and entry['size'] == fingerprint['size'] and entry['mtime_ns'] == fingerprint['mtime_ns']:
+                result.append({'relpath': relpath, **entry})
+            else:
+                min_month, max_month = partition_hint(relpath)
+                result.append({
+                    'relpath': relpath, **fingerprint,
+                    'rows': None, 'min_month': min_month, 'max_month': max_month,
+                })
+        # Urut kronologis menurut path (bukan manifest), supaya urutan bagian frame
+        # tetap sama antar load dan partisi bulan baru ditambahkan di akhir
+        return sorted(result, key=lambda p: (partition_hint(p['relpath'])[0] or '9999-99', p['relpath']))
+
+    def select(self, start=None, end=None, partitions=None):
+        """Partition pruning: partisi yang rentang bulannya beririsan dengan [start, end]"""
+        start, end = to_month(start), to_month(end)
+        selected = []
+        for partition in self.partitions() if partitions is None else partitions:
+            if partition['min_month'] is not None:
+                if end is not None and np.datetime64(partition['min_month'], 'M') > end:
+                    continue
+                if start is not None and np.datetime64(partition['max_month'], 'M') < start:
+                    continue
+            selected.append(partition)
+        return selected
+
+    def _update_manifest(self, loaded):
+        manifest = self._read_manifest()
+        for partition, df in loaded:
+            months = df['Tanggal'].values.astype('datetime64[M]') if len(df) else None
+            manifest[partition['relpath']] = {
+                'size': partition['size'],
+                'mtime_ns': partition['mtime_ns'],
+                'rows': len(df),
+                'min_month': str(months.min()) if months is not None else partition['min_month'],
+                'max_month': str(months.max()) if months is not None else partition['max_month'],
+            }
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+        write_atomic(self.manifest_path, write)
+
+    def load(self, start=None, end=None, max_workers=None):
+        """Load partisi yang lolos pruning secara paralel, lalu filter baris ke rentang bulan"""
+        began = time.perf_counter()
+        partitions = self.partitions()
+        selected = self.select(start, end, partitions)
+        paths = [os.path.join(self.root, p['relpath']) for p in selected]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(lambda path: load_transactions(path, self.parser), paths))
+
+        try:
+            self._update_manifest(zip(selected, frames))
+        except OSError:
+            pass
+
+        # Nama bagian relatif ke root dataset (file yang di-append punya beberapa bagian)
+        parts = [
+            dict(part, name=os.path.join(os.path.dirname(partition['relpath']), part['name']))
+            for frame, partition in zip(frames, selected) for part in ingest_parts(frame)
+        ]
+        version = hashlib.blake2b(json.dumps([parts, str(start), str(end)]).encode(), digest_size=16).hexdigest()
+        if start is None and end is None:
+            # Hasil concat (copy) dipublish ke cache bersama: worker lain membuka mmap-nya
+            root = os.path.join(self.root, CACHE_SUBDIR, 'dataset.shared')
+            df = shared_frame(root, version, 'transactions', lambda: concat_frames(frames))
+        else:
+            df = filter_months(concat_frames(frames), start, end)
+        df.attrs['ingest'] = {
+            'source': 'dataset',
+            'data_version': version,
+            'load_seconds': time.perf_counter() - began,
+            'parts': parts if start is None and end is None else [],
+            'partitions_read': len(selected),
+            'partitions_total': len(partitions),
+        }
+        return df
@@ -0,0 +1,266 @@
+"""
+instrument.py - Instrumentasi ringan untuk hot path dashboard
+Mencatat wall time, jumlah baris dan cache hit/miss per span selama satu
+rerun, lalu mengekspor hasilnya ke JSON-lines (dirotasi) dan Prometheus text
+"""
+
+import functools
+import atexit
+import glob
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from constants import METRICS_EXPORT_INTERVAL, METRICS_FILES, METRICS_ROTATION
+from ingest import write_atomic
+
+# Satu rerun Streamlit berjalan di satu thread; span dicatat per thread
+_local = threading.local()
+# Agregat kumulatif semua rerun di proses ini (untuk export Prometheus)
+_totals = {}
+_totals_lock = threading.Lock()
+# Rerun yang belum diekspor dan waktu export terakhir di proses ini. Session
+# Streamlit berjalan di thread masing-masing, jadi keduanya (dan rotasi file)
+# hanya disentuh di bawah _export_lock
+_pending = []
+_last_export = {'at': 0.0, 'cleaned': False}
+_export_lock = threading.Lock()
+
+# ==================== RECORDING ====================
+
+def _current_run():
+    return getattr(_local, 'run', None)
+
+def _row_count(args, result):
+    """Jumlah baris: DataFrame pertama di argumen, atau hasilnya jika DataFrame"""
+    for value in (*args, result):
+        if hasattr(value, 'columns') and hasattr(value, '__len__'):
+            return len(value)
+    return None
+
+def start_run(page):
+    """Mulai merekam span untuk satu rerun"""
+    _local.run = {'page': page, 'started': time.time(), 'spans': [], 'stack': [], 'section': None}
+
+@contextmanager
+def span(name, kind='block', rows=None):
+    """Context manager yang mencatat wall time; tidak melakukan apa-apa di luar rerun"""
+    run = _current_run()
+    if run is None:
+        yield None
+        return
+    record = {'name': name, 'kind': kind, 'depth': len(run['stack']), 'ms': None, 'rows': rows, 'cache': None}
+    run['spans'].append(record)
+    run['stack'].append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['ms'] = round((time.perf_counter() - start) * 1000, 3)
+        run['stack'].pop()
+        if record['cache'] is None and kind == 'loader':
+            record['cache'] = 'hit'
+
+def timed(name=None, kind='function'):
+    """
+    Decorator span untuk fungsi. Untuk fungsi st.cache_data pasang di atas
+    decorator cache, dengan cache_miss di bawahnya, agar hit/miss tercatat
+    """
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_run() is None:
+                return func(*args, **kwargs)
+            with span(label, kind) as record:
+                result = func(*args, **kwargs)
+                if record['rows'] is None:
+                    record['rows'] = _row_count(args, result)
+                return result
+
+        # Pertahankan .clear() milik fungsi ber-cache
+        if hasattr(func, 'clear'):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorate
+
+def cache_miss(func):
+    """Tandai span pemanggil sebagai cache miss saat body fungsi ber-cache benar-benar jalan"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        run = _current_run()
+        if run is not None and run['stack']:
+            run['stack'][-1]['cache'] = 'miss'
+        return func(*args, **kwargs)
+    return wrapper
+
+def section(name):
+    """Tutup section sebelumnya dan mulai section baru (span level atas di app.py)"""
+    run = _current_run()
+    if run is None:
+        return
+    _close_section(run)
+    context = span(name, 'section')
+    context.__enter__()
+    run['section'] = context
+
+def _close_section(run):
+    if run['section'] is not None:
+        run['section'].__exit__(None, None, None)
+        run['section'] = None
+
+def finish_run():
+    """Selesaikan rerun: tutup section terbuka, update agregat, return record rerun"""
+    run = _current_run()
+    if run is None:
+        return None
+    _close_section(run)
+    _local.run = None
+    record = {
+        'page': run['page'],
+        'started': run['started'],
+        'total_ms': round((time.time() - run['started']) * 1000, 3),
+        'spans': run['spans'],
+    }
+    with _totals_lock:
+        for s in run['spans']:
+            totals = _totals.setdefault((s['name'], s['kind']), {'calls': 0, 'ms': 0.0, 'rows': 0, 'hit': 0, 'miss': 0})
+            totals['calls'] += 1
+            totals['ms'] += s['ms'] or 0.0
+            totals['rows'] += s['rows'] or 0
+            if s['cache']:
+                totals[s['cache']] += 1
+    return record
+
+# ==================== EXPORT ====================
+
+def _rotate(path, backups):
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+def metrics_path(kind):
+    """Path file metrics milik proses ini ({pid} di METRICS_FILES diisi)"""
+    return METRICS_FILES[kind].format(pid=os.getpid())
+
+def export_jsonl(records, path=None, max_bytes=METRICS_ROTATION['max_bytes'],
+                 backups=METRICS_ROTATION['backups']):
+    """
+    Tambah satu baris JSON per rerun; file dirotasi (path.1 .. path.N) saat
+    melewati max_bytes. File per proses dan dipanggil di bawah _export_lock
+    """
+    path = path or metrics_path('jsonl')
+    pid = os.getpid()
+    text = ''.join(json.dumps(dict(record, pid=pid), ensure_ascii=False) + '\n' for record in records)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) + len(text) > max_bytes:
+        _rotate(path, backups)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+def prometheus_text():
+    """Agregat kumulatif dalam format text exposition Prometheus"""
+    metrics = [
+        ('dashboard_span_calls_total', 'counter', 'Jumlah eksekusi span', 'calls'),
+        ('dashboard_span_seconds_total', 'counter', 'Total wall time span (detik)', 'ms'),
+        ('dashboard_span_rows_total', 'counter', 'Total baris yang diproses span', 'rows'),
+        ('dashboard_cache_hits_total', 'counter', 'Cache hit loader', 'hit'),
+        ('dashboard_cache_misses_total', 'counter', 'Cache miss loader', 'miss'),
+    ]
+    with _totals_lock:
+        totals = {key: dict(value) for key, value in _totals.items()}
+    pid = os.getpid()
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, span_kind), values in sorted(totals.items()):
+            if field in ('hit', 'miss') and not values['hit'] + values['miss']:
+                continue
+            value = values[field] / 1000 if field == 'ms' else values[field]
+            lines.append(f'{metric}{{name="{_label(name)}",kind="{_label(span_kind)}",pid="{pid}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+def export_prometheus(path=None):
+    """
+    Tulis agregat proses ini ke file .prom miliknya (atomic, cocok untuk
+    textfile collector); series diberi label pid
+    """
+    path = path or metrics_path('prometheus')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    text = prometheus_text()
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    write_atomic(path, write)
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill(pid, 0) di Windows mengirim CTRL_C_EVENT; anggap masih hidup
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def cleanup_stale_metrics():
+    """
+    Hapus file metrics (termasuk hasil rotasi) milik proses server yang sudah
+    mati, agar direktori tidak tumbuh dan .prom basi tidak ikut di-scrape
+    """
+    removed = []
+    for template in METRICS_FILES.values():
+        pattern = re.escape(os.path.basename(template)).replace(re.escape('{pid}'), r'(\d+)') + r'(?:\.\d+)?'
+        for path in glob.glob(os.path.join(os.path.dirname(template), '*')):
+            match = re.fullmatch(pattern, os.path.basename(path))
+            if match is None or int(match.group(1)) == os.getpid() or _pid_alive(int(match.group(1))):
+                continue
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError:
+                pass
+    return removed
+
+def flush_metrics():
+    """Tulis rerun yang tertunda ke JSON-lines dan perbarui .prom; kegagalan I/O diabaikan"""
+    with _export_lock:
+        if not _pending:
+            return
+        records = _pending[:]
+        _pending.clear()
+        _last_export['at'] = time.time()
+        try:
+            if not _last_export['cleaned']:
+                _last_export['cleaned'] = True
+                cleanup_stale_metrics()
+            export_jsonl(records)
+            export_prometheus()
+        except OSError:
+            pass
+
+def export_run(record, force=False):
+    """
+    Catat satu rerun untuk diekspor. Tanpa force (panel debug mati) rerun
+    dikumpulkan dan ditulis sekaligus paling sering sekali per
+    METRICS_EXPORT_INTERVAL; sisa buffer ditulis saat proses keluar
+    """
+    with _export_lock:
+        _pending.append(record)
+        due = force or time.time() - _last_export['at'] >= METRICS_EXPORT_INTERVAL
+    if due:
+        flush_metrics()
+
+atexit.register(flush_metrics)
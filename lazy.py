@@ -0,0 +1,40 @@
+"""
+lazy.py - Import modul berat (pandas, numpy, plotly) saat pertama dipakai
+Halaman yang tidak memuat data atau chart tidak membayar biaya import-nya
+"""
+
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    Pengganti modul yang baru di-import saat atribut pertama diakses. Tidak
+    didaftarkan di sys.modules, jadi library lain yang mengecek keberadaan
+    pandas/numpy tidak ikut memicu import.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        # Simpan di instance agar akses berikutnya tidak lewat __getattr__
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Modul `name` jika sudah di-import, selain itu LazyModule"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
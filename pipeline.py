@@ -0,0 +1,70 @@
+"""
+pipeline.py - Batch headless untuk regenerasi file hasil analisis
+Membaca data transaksi lewat backend analisis (pandas, process pool atau
+PySpark lokal, lihat backends.py), lalu menulis trend_analysis_results.csv dan
+preference_analysis_results.csv secara atomic
+
+Cara menjalankan:
+python pipeline.py --backend process --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from backends import BACKENDS, ProcessPoolBackend, default_source, select_backend
+from constants import DATA_FILES
+
+# ==================== PIPELINE ====================
+
+def compute_tables(source, backend):
+    """Tabel trend & preferensi dari satu cube; hasil identik untuk semua backend"""
+    cube = backend.cube(source)
+    return backend.trend(cube=cube), backend.preference(cube=cube), cube
+
+def write_csv(df, path):
+    """Tulis CSV via file sementara + rename: dashboard tidak pernah membaca file setengah jadi"""
+    from ingest import write_atomic
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_atomic(path, lambda tmp_path: df.to_csv(tmp_path, index=False))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerasi hasil analisis trend & preferensi')
+    parser.add_argument('--source', default=None,
+                        help='CSV export atau folder partisi (default: sumber dashboard)')
+    parser.add_argument('--backend', choices=['auto', *BACKENDS], default='auto',
+                        help='Backend analisis (default: otomatis menurut ukuran sumber)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Jumlah proses untuk backend process (default: jumlah CPU)')
+    parser.add_argument('--trend-out', default=DATA_FILES['trend_results'])
+    parser.add_argument('--preference-out', default=DATA_FILES['preference_results'])
+    args = parser.parse_args(argv)
+
+    source = args.source or default_source()
+    try:
+        backend = select_backend(source, args.backend)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if isinstance(backend, ProcessPoolBackend) and args.workers:
+        backend.workers = args.workers
+
+    start = time.perf_counter()
+    trend, preference, cube = compute_tables(source, backend)
+    computed = time.perf_counter()
+    write_csv(trend, args.trend_out)
+    write_csv(preference, args.preference_out)
+
+    print(f"{int(cube['count'].sum()):,} baris dari {source} (backend {backend.name})")
+    print(f"Analisis {computed - start:.2f}s · total {time.perf_counter() - start:.2f}s")
+    print(f"{args.trend_out}: {len(trend)} produk")
+    print(f"{args.preference_out}: {len(preference)} segmen")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+query.py - SQL read-only tertanam atas data transaksi bertipe
+DuckDB (jika terpasang) memindai kolom frame langsung tanpa copy, dengan
+projection & predicate pushdown di scan-nya. Tanpa DuckDB, hanya kolom yang
+dirujuk query yang dimuat ke SQLite in-memory. Read-only dijamin engine:
+query DuckDB dibungkus sebagai subquery, SQLite memakai authorizer
+"""
+
+import importlib.util
+import re
+import sqlite3
+import threading
+import time
+
+from constants import QUERY_CONFIG
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# ==================== NORMALIZATION ====================
+
+def _tokens(sql):
+    """
+    Pecah SQL menjadi (jenis, teks): 'code', 'string' ('...'), 'ident' ("...").
+    Komentar -- dan /* */ dibuang
+    """
+    tokens, code, i, n = [], [], 0, len(sql)
+    while i < n:
+        char = sql[i]
+        if char in ("'", '"'):
+            end = i + 1
+            while end < n:
+                if sql[end] == char:
+                    if end + 1 < n and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            if end >= n:
+                raise ValueError("Tanda kutip tidak ditutup")
+            tokens.append(('code', ''.join(code)))
+            code = []
+            tokens.append(('string' if char == "'" else 'ident', sql[i:end + 1]))
+            i = end + 1
+        elif sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = n if end < 0 else end
+            code.append(' ')
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            code.append(' ')
+        else:
+            code.append(char)
+            i += 1
+    tokens.append(('code', ''.join(code)))
+    return [(kind, text) for kind, text in tokens if text]
+
+def normalize_query(sql):
+    """
+    Bentuk kanonik query untuk cache key: tanpa komentar, spasi dirapikan dan
+    titik koma penutup dibuang. Isi literal string / identifier tidak diubah
+    """
+    parts = []
+    for kind, text in _tokens(sql):
+        parts.append(re.sub(r'\s+', ' ', text) if kind == 'code' else text)
+    return ''.join(parts).strip().rstrip(';').strip()
+
+def validate_read_only(sql):
+    """ValueError jika query bukan satu statement SELECT / WITH"""
+    code = ' '.join(text for kind, text in _tokens(sql) if kind == 'code')
+    if not code.strip():
+        raise ValueError("Query kosong")
+    if ';' in code.strip().rstrip(';'):
+        raise ValueError("Hanya satu statement per query")
+    if not re.match(r'\s*\(*\s*(SELECT|WITH)\b', code, re.IGNORECASE):
+        raise ValueError("Hanya query SELECT / WITH yang diizinkan")
+
+def referenced_columns(sql, columns):
+    """Kolom tabel yang dirujuk query (projection pushdown); semua kolom jika ada '*'"""
+    tokens = _tokens(sql)
+    code = ' '.join(text for kind, text in tokens if kind == 'code')
+    # SELECT * / t.* (bukan COUNT(*))
+    if re.search(r'(^|[\s,.])\*', code):
+        return list(columns)
+    quoted = {text[1:-1].replace('""', '"').lower() for kind, text in tokens if kind == 'ident'}
+    words = {word.lower() for word in re.findall(r'[A-Za-z_][A-Za-z0-9_]*', code)}
+    return [c for c in columns if c.lower() in quoted or c.lower() in words]
+
+# ==================== ENGINES ====================
+
+class _DuckDBEngine:
+    """Frame didaftarkan sebagai view DuckDB: kolom dibaca langsung dari array pandas"""
+
+    name = 'duckdb'
+
+    def __init__(self, df):
+        import duckdb
+
+        self.con = duckdb.connect(':memory:')
+        self.con.register(QUERY_CONFIG['table'], df)
+        # Tidak ada akses file / ekstensi dari query, dan konfigurasi dikunci
+        self.con.execute("SET enable_external_access = false")
+        self.con.execute("SET lock_configuration = true")
+
+    def cursor(self, sql):
+        timer = threading.Timer(QUERY_CONFIG['timeout_seconds'], self.con.interrupt)
+        timer.start()
+        try:
+            # Sebagai subquery, statement selain query (DDL / DML / SET) gagal di parser
+            return self.con.execute(f"SELECT * FROM ({sql}) AS q"), timer
+        except BaseException:
+            timer.cancel()
+            raise
+
+
+_SQLITE_READ_ACTIONS = (sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE)
+
+
+class _SQLiteEngine:
+    """
+    Fallback tanpa DuckDB: kolom yang dirujuk query disalin ke tabel SQLite
+    in-memory (tabel dibangun ulang hanya jika query butuh kolom baru)
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, df):
+        self.df = df
+        self.loaded = []
+        self.con = sqlite3.connect(':memory:', check_same_thread=False)
+        self.con.set_authorizer(self._authorize)
+        self._building = False
+        self._deadline = None
+        self.con.set_progress_handler(self._check_timeout, 100_000)
+
+    @staticmethod
+    def _column_chunks(series):
+        """Fungsi (begin, end) -> list nilai Python satu potong kolom, dikonversi dari array NumPy"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            # Code -1 (missing) menunjuk ke None di posisi terakhir
+            labels = np.append(np.asarray(series.cat.categories, dtype=object), None)
+            return lambda begin, end: labels[codes[begin:end]].tolist()
+        values = series.to_numpy()
+        if values.dtype.kind == 'M':
+            def dates(begin, end):
+                part = values[begin:end]
+                return np.where(np.isnat(part), None, np.datetime_as_string(part, unit='D')).tolist()
+            return dates
+        if values.dtype.kind == 'f':
+            return lambda begin, end: np.where(np.isnan(values[begin:end]), None, values[begin:end]).tolist()
+        if values.dtype.kind in 'iub':
+            return lambda begin, end: values[begin:end].tolist()
+        return lambda begin, end: [None if pd.isna(v) else v for v in values[begin:end]]
+
+    def _authorize(self, action, *args):
+        if self._building or action in _SQLITE_READ_ACTIONS:
+            return sqlite3.SQLITE_OK
+        return sqlite3.SQLITE_DENY
+
+    def _check_timeout(self):
+        return int(self._deadline is not None and time.monotonic() > self._deadline)
+
+    def _load(self, columns):
+        columns = [c for c in self.df.columns if c in set(columns) | set(self.loaded)] or [self.df.columns[0]]
+        table = QUERY_CONFIG['table']
+        names = ', '.join('"' + c.replace('"', '""') + '"' for c in columns)
+        self._building = True
+        try:
+            self.con.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.con.execute(f'CREATE TABLE "{table}" ({names})')
+            chunks = [self._column_chunks(self.df[c]) for c in columns]
+            marks = ', '.join('?' * len(columns))
+            # Per potongan baris: memory Python dibatasi load_rows, bukan seluruh tabel
+            for begin in range(0, len(self.df), QUERY_CONFIG['load_rows']):
+                end = begin + QUERY_CONFIG['load_rows']
+                self.con.executemany(
+                    f'INSERT INTO "{table}" VALUES ({marks})', zip(*(chunk(begin, end) for chunk in chunks))
+                )
+            self.con.commit()
+        finally:
+            self._building = False
+        self.loaded = columns
+
+    def cursor(self, sql):
+        self._deadline = None
+        needed = referenced_columns(sql, list(self.df.columns))
+        if not self.loaded or not set(needed) <= set(self.loaded):
+            self._load(needed)
+        self._deadline = time.monotonic() + QUERY_CONFIG['timeout_seconds']
+        return self.con.execute(sql), None
+
+
+def engine_name():
+    """Engine SQL yang dipakai: duckdb jika terpasang, selain itu sqlite"""
+    return 'duckdb' if importlib.util.find_spec('duckdb') is not None else 'sqlite'
+
+# Satu engine per versi data; versi lama dilepas saat data berganti
+_engines = {}
+_engines_lock = threading.Lock()
+
+def _engine_for(df, version):
+    with _engines_lock:
+        entry = _engines.get('current')
+        if entry is None or entry['version'] != version:
+            engine = _DuckDBEngine(df) if engine_name() == 'duckdb' else _SQLiteEngine(df)
+            entry = {'version': version, 'engine': engine, 'lock': threading.Lock()}
+            _engines['current'] = entry
+        return entry
+
+def execute_query(df, version, sql, max_rows=QUERY_CONFIG['max_rows']):
+    """
+    Jalankan query read-only atas df (tabel QUERY_CONFIG['table']). Hasil
+    diambil bertahap (fetchmany) sampai max_rows; return {'frame', 'truncated',
+    'engine', 'elapsed_ms'}. ValueError untuk query yang tidak valid / gagal
+    """
+    validate_read_only(sql)
+    entry = _engine_for(df, version)
+    start = time.perf_counter()
+    with entry['lock']:
+        engine = entry['engine']
+        timer = None
+        try:
+            cursor, timer = engine.cursor(sql)
+            names = [d[0] for d in cursor.description or []]
+            rows = []
+            while len(rows) <= max_rows:
+                batch = cursor.fetchmany(QUERY_CONFIG['fetch_rows'])
+                if not batch:
+                    break
+                rows.extend(batch)
+        except ValueError:
+            raise
+        except Exception as exc:
+            # Error sintaks, kolom tidak dikenal, timeout, operasi yang ditolak
+            raise ValueError(str(exc)) from exc
+        finally:
+            if timer is not None:
+                timer.cancel()
+    return {
+        'frame': pd.DataFrame.from_records(rows[:max_rows], columns=names),
+        'truncated': len(rows) > max_rows,
+        'engine': engine.name,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+def table_schema(df):
+    """Nama & tipe kolom tabel query (untuk panel bantuan di halaman Query)"""
+    return pd.DataFrame({'Kolom': [str(c) for c in df.columns], 'Tipe': [str(t) for t in df.dtypes]})
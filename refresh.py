@@ -0,0 +1,173 @@
+"""
+refresh.py - Stale-while-revalidate untuk loader data
+Entry yang kedaluwarsa tetap disajikan sementara satu thread latar belakang
+memuat ulang; hasil baru dipasang secara atomic sehingga request pengguna
+tidak pernah menunggu reload (kecuali load pertama di proses)
+"""
+
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Satu thread: refresh berurutan, sehingga loader hulu selesai sebelum turunannya
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='data-refresh')
+_registry = {}
+
+# Setelah refresh gagal, entry lama dipakai lagi selama ini sebelum dicoba ulang
+RETRY_SECONDS = 60
+
+
+class RefreshingLoader:
+    """
+    Cache per argumen dengan TTL. Entry dianggap stale jika umurnya > ttl atau
+    versi loader hulu (`after`) sudah berganti; entry stale tetap dikembalikan
+    sambil refresh dijadwalkan di latar belakang.
+    """
+
+    def __init__(self, func, ttl, after=(), version=None, fallback=None):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.ttl = ttl
+        self.after = tuple(after)
+        self._version = version
+        self._fallback = fallback
+        self._entries = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _upstream(self):
+        return tuple(_registry[name].version() for name in self.after)
+
+    def _stale(self, entry):
+        return time.time() - entry['loaded_at'] > self.ttl or entry['upstream'] != self._upstream()
+
+    def _compute(self, args, kwargs):
+        # Loader hulu dimuat dulu supaya versi yang dicatat sama dengan yang dipakai func
+        for name in self.after:
+            _registry[name]()
+        upstream = self._upstream()
+        value = self.func(*args, **kwargs)
+        return {
+            'value': value,
+            'version': self._version(value) if self._version else upstream,
+            'upstream': upstream,
+            'loaded_at': time.time(),
+            'error': None,
+        }
+
+    def __call__(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        entry = self._entries.get(key)
+        if entry is None:
+            # Load pertama: sinkron, request lain untuk key yang sama ikut menunggu
+            with self._lock:
+                load_lock = self._load_locks.setdefault(key, threading.Lock())
+            with load_lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._initial(args, kwargs)
+                    self._entries[key] = entry
+            return entry['value']
+        if self._stale(entry):
+            self._schedule(key, args, kwargs)
+        return entry['value']
+
+    def _initial(self, args, kwargs):
+        """
+        Load pertama. Jika gagal dan ada fallback, nilai fallback(exc) dipakai
+        sementara dan dicoba ulang setelah RETRY_SECONDS. Saat refresh, error
+        tidak pernah menimpa entry lama (lihat _refresh)
+        """
+        try:
+            return self._compute(args, kwargs)
+        except Exception as exc:
+            if self._fallback is None:
+                raise
+            upstream = self._upstream()
+            value = self._fallback(exc)
+            return {
+                'value': value,
+                'version': self._version(value) if self._version else upstream,
+                'upstream': upstream,
+                'loaded_at': time.time() - self.ttl + RETRY_SECONDS,
+                'error': repr(exc),
+            }
+
+    def _schedule(self, key, args, kwargs):
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        _executor.submit(self._refresh, key, args, kwargs)
+
+    def _refresh(self, key, args, kwargs):
+        try:
+            entry = self._entries.get(key)
+            if entry is not None and not self._stale(entry):
+                return
+            for name in self.after:
+                _registry[name].revalidate()
+            # Swap atomic: reader melihat entry lama atau baru, tidak pernah setengah jadi
+            self._entries[key] = self._compute(args, kwargs)
+        except Exception as exc:
+            old = self._entries.get(key)
+            if old is not None:
+                self._entries[key] = dict(
+                    old, error=repr(exc), upstream=self._upstream(),
+                    loaded_at=time.time() - self.ttl + RETRY_SECONDS,
+                )
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def revalidate(self, *args, **kwargs):
+        """Refresh sinkron jika entry stale (dipakai dari thread refresh)"""
+        key = (args, tuple(sorted(kwargs.items())))
+        entry = self._entries.get(key)
+        if entry is not None and self._stale(entry):
+            self._refresh(key, args, kwargs)
+
+    def version(self, *args, **kwargs):
+        entry = self._entries.get((args, tuple(sorted(kwargs.items()))))
+        return None if entry is None else entry['version']
+
+    def status(self):
+        """Metadata entry tanpa argumen: versi, waktu load, refresh berjalan, error terakhir"""
+        entry = self._entries.get(((), ()))
+        if entry is None:
+            return None
+        return {
+            'version': entry['version'],
+            'loaded_at': entry['loaded_at'],
+            'stale': self._stale(entry),
+            'refreshing': bool(self._pending),
+            'error': entry['error'],
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def stale_while_revalidate(ttl, after=(), version=None, fallback=None):
+    """
+    Decorator RefreshingLoader. `after` berisi nama loader hulu (yang juga
+    memakai decorator ini); `version(value)` memberi versi data hasil load,
+    default-nya versi loader hulu. `fallback(exc)` memberi nilai pengganti
+    jika load pertama gagal (raise ulang untuk error yang tidak ditangani)
+    """
+    def decorate(func):
+        loader = RefreshingLoader(func, ttl, after, version, fallback)
+        _registry[func.__name__] = loader
+        return loader
+    return decorate
+
+def refresh_status():
+    """Status semua loader yang terdaftar, per nama fungsi"""
+    return {name: loader.status() for name, loader in _registry.items()}
+
+def refreshing():
+    """True jika ada refresh latar belakang yang sedang berjalan / antre"""
+    return any(loader._pending for loader in _registry.values())
@@ -0,0 +1,211 @@
+"""
+shared_cache.py - Cache data lintas proses berbasis file .npy yang di-memory-map
+Satu worker mematerialisasi kolom bertipe dan agregat ke disk, worker lain
+membukanya read-only tanpa copy, sehingga N worker berbagi satu salinan fisik
+(page cache OS) dan hanya satu yang membayar biaya parse
+"""
+
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+from constants import SHARED_CACHE
+from lazy import lazy_import
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa lock, publish tetap aman karena rename atomic
+    fcntl = None
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+SHARED_FORMAT_VERSION = 1
+_META_FILE = 'meta.json'
+
+# ==================== LOCK ====================
+
+@contextmanager
+def build_lock(path):
+    """Lock eksklusif antar proses (flock) selama satu worker membangun artefak"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, 'a')
+    except OSError:
+        f = None
+    if fcntl is None or f is None:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# ==================== ARRAY TREE ====================
+
+def _encode(value, arrays):
+    """Dict bersarang -> struktur JSON; ndarray diganti referensi file .npy"""
+    if isinstance(value, dict):
+        return {'dict': {key: _encode(item, arrays) for key, item in value.items()}}
+    if isinstance(value, np.ndarray):
+        name = f"a{len(arrays)}.npy"
+        arrays[name] = value
+        return {'array': name}
+    return {'value': value}
+
+def _decode(node, directory):
+    if 'dict' in node:
+        return {key: _decode(item, directory) for key, item in node['dict'].items()}
+    if 'array' in node:
+        path = os.path.join(directory, node['array'])
+        try:
+            # Ndarray biasa (view, tanpa copy) supaya hasil operasi bukan subclass memmap
+            return np.asarray(np.load(path, mmap_mode='r', allow_pickle=False))
+        except ValueError:
+            # Array kosong tidak bisa di-mmap
+            return np.load(path, allow_pickle=False)
+    return node['value']
+
+def open_arrays(directory):
+    """Buka artefak yang sudah dipublish (array read-only, zero copy); None jika belum ada"""
+    try:
+        with open(os.path.join(directory, _META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != SHARED_FORMAT_VERSION:
+            return None
+        return _decode(meta['tree'], directory)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def publish_arrays(directory, tree):
+    """
+    Tulis dict bersarang berisi ndarray ke folder sementara lalu rename ke
+    `directory`. Reader hanya pernah melihat folder lengkap; jika worker lain
+    lebih dulu publish, hasil kita dibuang. Return True jika folder tersedia
+    """
+    arrays = {}
+    meta = {'format_version': SHARED_FORMAT_VERSION, 'tree': _encode(tree, arrays)}
+    if any(a.dtype.hasobject for a in arrays.values()):
+        return False
+    try:
+        payload = json.dumps(meta)
+    except TypeError:
+        return False
+
+    tmp_dir = f"{directory}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, name), np.ascontiguousarray(array), allow_pickle=False)
+        with open(os.path.join(tmp_dir, _META_FILE), 'w', encoding='utf-8') as f:
+            f.write(payload)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            if not os.path.exists(os.path.join(directory, _META_FILE)):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return True
+
+def prune_versions(root, current, keep=SHARED_CACHE['keep_versions']):
+    """
+    Hapus folder versi lama di `root` (selain `current` dan keep-1 versi terbaru).
+    Worker yang masih memetakan file lama tidak terganggu: file yang di-unlink
+    tetap bisa dibaca sampai mmap-nya ditutup
+    """
+    try:
+        versions = [
+            entry for entry in os.scandir(root)
+            if entry.is_dir() and entry.name != current and not entry.name.endswith('.tmp')
+        ]
+    except OSError:
+        return
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[max(keep - 1, 0):]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+def shared_artifact(root, version, name, build):
+    """
+    Artefak `name` untuk versi data `version` dari cache bersama. Jika belum
+    ada, satu worker membangun (build() -> dict array, None = jangan dibagi)
+    sementara worker lain menunggu lock lalu ikut membuka hasilnya
+    """
+    if not SHARED_CACHE['enabled']:
+        return build()
+    directory = os.path.join(root, version, name)
+    tree = open_arrays(directory)
+    if tree is not None:
+        return tree
+    with build_lock(os.path.join(root, '.lock')):
+        tree = open_arrays(directory)
+        if tree is not None:
+            return tree
+        value = build()
+        if value is None:
+            return None
+        try:
+            published = publish_arrays(directory, value)
+        except OSError:
+            # Folder cache read-only: tetap jalan dengan salinan privat
+            published = False
+    if not published:
+        return value
+    prune_versions(root, version)
+    return open_arrays(directory) or value
+
+# ==================== DATAFRAME ====================
+
+def frame_to_tree(df):
+    """
+    Kolom DataFrame -> dict array. Categorical disimpan sebagai codes + daftar
+    kategori; None jika ada kolom yang tidak bisa di-mmap (object / nullable)
+    """
+    values, categories = {}, {}
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            labels = series.cat.categories
+            if labels.dtype.kind not in 'OiuU':
+                return None
+            values[str(i)] = series.cat.codes.to_numpy()
+            categories[str(i)] = labels.tolist()
+        elif isinstance(series.dtype, np.dtype) and not series.dtype.hasobject:
+            values[str(i)] = series.to_numpy()
+        else:
+            return None
+    return {'columns': [str(c) for c in df.columns], 'values': values, 'categories': categories}
+
+def tree_to_frame(tree):
+    """Kebalikan frame_to_tree tanpa copy: kolom DataFrame menunjuk langsung ke mmap"""
+    columns = {}
+    for i, column in enumerate(tree['columns']):
+        data = tree['values'][str(i)]
+        if str(i) in tree['categories']:
+            data = pd.Categorical.from_codes(data, categories=tree['categories'][str(i)], validate=False)
+        columns[column] = data
+    return pd.DataFrame(columns, copy=False)
+
+def open_frame(root, version, name):
+    """DataFrame yang sudah dipublish untuk versi data `version`; None jika belum ada"""
+    tree = open_arrays(os.path.join(root, version, name))
+    return None if tree is None or 'columns' not in tree else tree_to_frame(tree)
+
+def shared_frame(root, version, name, build):
+    """
+    Seperti shared_artifact untuk DataFrame hasil build(). Jika cache bersama
+    nonaktif atau frame tidak bisa di-mmap, frame dikembalikan apa adanya
+    """
+    if not SHARED_CACHE['enabled']:
+        return build()
+    built = []
+
+    def build_tree():
+        built.append(build())
+        return frame_to_tree(built[0])
+
+    tree = shared_artifact(root, version, name, build_tree)
+    return built[0] if tree is None else tree_to_frame(tree)
@@ -0,0 +1,310 @@
+"""
+synthetic.py - Generator data transaksi sintetis untuk load testing
+Menulis file dengan format persis export "Transaksi Penjualan" (';', BOM,
+CRLF, baris TOTAL) dengan distribusi yang di-fit dari file asli
+
+Cara menjalankan:
+python synthetic.py --rows 100000000 --out data/synthetic/Transaksi-100M.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import DATA_FILES, OUTLET_CATEGORY_LABELS, TRANSACTION_CSV_OPTIONS
+from ingest import read_sales_export, write_atomic
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+
+EXPORT_COLUMNS = [
+    'No', 'Bulan', 'Jumlah Transaksi Bulan', 'Nama Kedai', 'Kategori Kedai',
+    'Nama Produk', 'Asal Daerah', 'Qty Kg', 'Harga Per Kg', 'Jumlah',
+]
+MONTH_CODES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+GENERATOR_CHUNK_ROWS = 250_000
+
+# ==================== PROFILE ====================
+
+def _distribution(series):
+    """Nilai unik + bobot (frekuensi relatif), urut menurut nilai"""
+    counts = series.value_counts(sort=False).sort_index()
+    return {'values': counts.index.tolist(), 'weights': (counts / counts.sum()).round(6).tolist()}
+
+def fit_profile(path=DATA_FILES['transactions']):
+    """
+    Fit distribusi dari export asli: seasonality bulanan, porsi kategori kedai
+    per bulan, outlet per kategori, daftar produk + harga per kategori, dan
+    profil qty per kategori (Big/Medium/Perorangan)
+    """
+    df = read_sales_export(path)
+    if df.empty:
+        raise ValueError(f"Tidak ada transaksi untuk di-fit: {path}")
+
+    observed = df['Kategori Kedai'].unique().tolist()
+    categories = [c for c in OUTLET_CATEGORY_LABELS if c in observed]
+    categories += sorted(c for c in observed if c not in categories)
+
+    month_of_year = df['Tanggal'].dt.month
+    seasonality = month_of_year.value_counts().reindex(range(1, 13), fill_value=0)
+    category_share = df.groupby([month_of_year, 'Kategori Kedai']).size().unstack(fill_value=0)
+    category_share = category_share.reindex(index=range(1, 13), columns=categories, fill_value=0)
+    overall = category_share.sum()
+    category_share.loc[category_share.sum(axis=1) == 0] = overall.values
+    category_share = category_share.div(category_share.sum(axis=1), axis=0)
+
+    profile = {
+        'source': os.path.basename(path),
+        'rows': len(df),
+        'year': int(df['Tanggal'].dt.year.min()),
+        'first_month': int(df['Tanggal'].min().month),
+        'seasonality': (seasonality / seasonality.sum()).round(6).tolist(),
+        'categories': categories,
+        'category_share': category_share.round(6).values.tolist(),
+        'outlets': {},
+        'items': {},
+        'qty': {},
+    }
+    for category, group in df.groupby('Kategori Kedai', sort=False):
+        profile['outlets'][category] = _distribution(group['Nama Kedai'])
+        items = group.groupby(['Nama Produk', 'Asal Daerah', 'Harga Per Kg']).size()
+        profile['items'][category] = {
+            'values': [[product, region, int(price)] for product, region, price in items.index],
+            'weights': (items / items.sum()).round(6).tolist(),
+        }
+        profile['qty'][category] = _distribution(group['Qty Kg'].astype('int64'))
+        profile['qty'][category]['values'] = [int(v) for v in profile['qty'][category]['values']]
+    return profile
+
+def save_profile(profile, path):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=1)
+    write_atomic(path, write)
+
+def load_profile(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def scale_items(items, product_scale):
+    """
+    Perbanyak katalog untuk uji kardinalitas: varian ke-k dari tiap produk jadi
+    produk + asal daerah baru (mis. "Bunar 2"), bobot dibagi rata
+    """
+    if product_scale <= 1:
+        return items
+    values, weights = [], []
+    for k in range(1, product_scale + 1):
+        suffix = '' if k == 1 else f" {k}"
+        for (product, region, price), weight in zip(items['values'], items['weights']):
+            values.append([product.replace(region, region + suffix, 1) if suffix else product, region + suffix, price])
+            weights.append(weight / product_scale)
+    return {'values': values, 'weights': weights}
+
+# ==================== ROW ENCODING ====================
+
+# Semua field dirakit sebagai matrix byte ber-padding \0 per baris, lalu byte
+# \0 dibuang sekaligus; tidak ada format string per baris
+_POWERS_OF_TEN = None
+_DIGIT_CELLS = None
+
+def _digit_tables():
+    """Lookup 0..999 -> sel uint32 berisi 3 digit ASCII (+ \0): versi lengkap dan tanpa nol depan"""
+    global _POWERS_OF_TEN, _DIGIT_CELLS
+    if _DIGIT_CELLS is None:
+        full = np.zeros((1000, 4), dtype=np.uint8)
+        lead = np.zeros((1000, 4), dtype=np.uint8)
+        for i in range(1000):
+            text = str(i).encode()
+            full[i, :3] = np.frombuffer(f"{i:03d}".encode(), dtype=np.uint8)
+            lead[i, 3 - len(text):3] = np.frombuffer(text, dtype=np.uint8)
+        _DIGIT_CELLS = (full.view(np.uint32).ravel(), lead.view(np.uint32).ravel())
+        _POWERS_OF_TEN = 1000 ** np.arange(7, dtype=np.int64)
+    return _DIGIT_CELLS
+
+def encode_integers(values, groups):
+    """Integer >= 0 -> matrix byte (n, groups * 4) berisi digit desimal + padding \0"""
+    full, lead = _digit_tables()
+    cells = np.zeros((len(values), groups), dtype=np.uint32)
+    for g in range(groups):
+        higher, group = np.divmod(values // _POWERS_OF_TEN[g], 1000)
+        top = lead[group]
+        if g:
+            top = np.where(group > 0, top, 0)
+        cells[:, groups - 1 - g] = np.where(higher > 0, full[group], top)
+    return cells.view(np.uint8)
+
+def _digit_groups(max_value):
+    return max(1, -(-len(str(int(max_value))) // 3))
+
+def encode_table(strings):
+    """List string -> matrix byte ber-padding \0 (satu baris per string)"""
+    data = [s.encode('utf-8') for s in strings]
+    width = max(map(len, data))
+    return np.frombuffer(b''.join(d.ljust(width, b'\0') for d in data), dtype=np.uint8).reshape(len(data), width)
+
+def sampling_table(weights):
+    """
+    Lookup table untuk sampling kategorikal: index acak uniform -> pilihan.
+    Probabilitas dibulatkan ke 1/len(table) (minimal satu slot per bobot > 0)
+    """
+    p = np.asarray(weights, dtype='float64')
+    p = p / p.sum()
+    size = 1 << 16 if len(p) <= 256 else 1 << 20
+    slots = np.floor(p * size).astype(np.int64)
+    slots[(p > 0) & (slots == 0)] = 1
+    # Sisa slot dibagikan ke pecahan terbesar (largest remainder)
+    shortfall = size - slots.sum()
+    order = np.argsort(-(p * size - slots), kind='stable')
+    if shortfall > 0:
+        slots[order[:shortfall]] += 1
+    else:
+        for i in np.argsort(-slots, kind='stable')[:-shortfall]:
+            slots[i] -= 1
+    return np.repeat(np.arange(len(p), dtype=np.int32), slots)
+
+def _sample(rng, table, n):
+    return np.take(table, rng.integers(0, len(table), n, dtype=np.uint32))
+
+def _category_tables(profile, category, product_scale):
+    """Tabel fragment per kategori: outlet, produk dan kombinasi qty × harga"""
+    outlets = profile['outlets'][category]
+    items = scale_items(profile['items'][category], product_scale)
+    qty = profile['qty'][category]
+
+    prices, item_price = np.unique([price for _, _, price in items['values']], return_inverse=True)
+    qty_values = np.asarray(qty['values'], dtype=np.int64)
+    amounts = (qty_values[:, None] * prices[None, :]).ravel()
+    combos = [f"{q};{p};{q * p}\r\n" for q in qty_values for p in prices]
+
+    return {
+        'outlet': sampling_table(outlets['weights']),
+        'outlet_bytes': encode_table([f";{name};{category};" for name in outlets['values']]),
+        'item': sampling_table(items['weights']),
+        'item_bytes': encode_table([f"{product};{region};" for product, region, _ in items['values']]),
+        'item_price': item_price,
+        'n_prices': len(prices),
+        'qty': sampling_table(qty['weights']),
+        'combo_bytes': encode_table(combos),
+        'combo_amount': amounts,
+    }
+
+def _encode_block(rng, tables, month_bytes, first_no, first_seq, n):
+    """n baris satu (bulan, kategori) -> (bytes, total Jumlah)"""
+    outlet = _sample(rng, tables['outlet'], n)
+    item = _sample(rng, tables['item'], n)
+    combo = _sample(rng, tables['qty'], n) * tables['n_prices'] + np.take(tables['item_price'], item)
+
+    no = np.arange(first_no, first_no + n, dtype=np.int64)
+    seq = np.arange(first_seq, first_seq + n, dtype=np.int64)
+    segments = [
+        encode_integers(no, _digit_groups(no[-1])),
+        np.broadcast_to(month_bytes, (n, len(month_bytes))),
+        encode_integers(seq, _digit_groups(seq[-1])),
+        np.take(tables['outlet_bytes'], outlet, axis=0),
+        np.take(tables['item_bytes'], item, axis=0),
+        np.take(tables['combo_bytes'], combo, axis=0),
+    ]
+    rows = np.empty((n, sum(segment.shape[1] for segment in segments)), dtype=np.uint8)
+    column = 0
+    for segment in segments:
+        rows[:, column:column + segment.shape[1]] = segment
+        column += segment.shape[1]
+    return rows[rows != 0].tobytes(), int(np.take(tables['combo_amount'], combo).sum())
+
+# ==================== GENERATOR ====================
+
+def _plan_blocks(profile, rows, rng, months, chunk_rows):
+    """Urutan blok (kategori, bytes bulan, No pertama, urutan-dalam-bulan pertama, n)"""
+    first = profile['year'] * 12 + profile['first_month'] - 1
+    month_index = np.arange(first, first + months)
+    seasonality = np.asarray(profile['seasonality'])[month_index % 12]
+    month_rows = rng.multinomial(rows, seasonality / seasonality.sum())
+    share = np.asarray(profile['category_share'])
+
+    no = 1
+    for index, n_month in zip(month_index, month_rows):
+        month_bytes = np.frombuffer(f";{MONTH_CODES[index % 12]}-{index // 12};".encode(), dtype=np.uint8)
+        seq = 1
+        for category, n_category in zip(profile['categories'], rng.multinomial(n_month, share[index % 12])):
+            for offset in range(0, n_category, chunk_rows):
+                n = min(chunk_rows, n_category - offset)
+                yield category, month_bytes, no, seq, n
+                no += n
+                seq += n
+
+def generate_sales_export(path, rows, profile=None, seed=0, months=12, product_scale=1,
+                          chunk_rows=GENERATOR_CHUNK_ROWS, workers=None):
+    """
+    Tulis export sintetis `rows` baris secara streaming (atomic). Baris terurut
+    per bulan lalu per kategori kedai seperti export asli. Blok di-encode paralel
+    (tiap blok punya seed sendiri, jadi hasilnya sama untuk berapa pun worker)
+    dan ditulis berurutan. Return ringkasan (rows, bytes, seconds, total)
+    """
+    start = time.perf_counter()
+    profile = profile or fit_profile()
+    workers = workers or os.cpu_count() or 1
+    tables = {c: _category_tables(profile, c, product_scale) for c in profile['categories']}
+    blocks = _plan_blocks(profile, rows, np.random.default_rng(seed), months, chunk_rows)
+    summary = {'rows': rows, 'bytes': 0, 'total': 0}
+
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f, ThreadPoolExecutor(max_workers=workers) as pool:
+            header = TRANSACTION_CSV_OPTIONS['sep'].join(EXPORT_COLUMNS) + '\r\n'
+            f.write(header.encode(TRANSACTION_CSV_OPTIONS['encoding']))
+
+            def flush(future):
+                data, amount = future.result()
+                f.write(data)
+                summary['total'] += amount
+
+            # Jumlah blok yang sedang di-encode dibatasi agar memory tetap konstan
+            pending = deque()
+            for block_id, (category, month_bytes, no, seq, n) in enumerate(blocks):
+                rng = np.random.default_rng([seed, block_id])
+                pending.append(pool.submit(_encode_block, rng, tables[category], month_bytes, no, seq, n))
+                if len(pending) >= 2 * workers:
+                    flush(pending.popleft())
+            while pending:
+                flush(pending.popleft())
+
+            f.write(f"TOTAL;;;;;;;;{summary['total']};".encode())
+            summary['bytes'] = f.tell()
+
+    write_atomic(path, write)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator export Transaksi Penjualan sintetis")
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--source', default=DATA_FILES['transactions'], help="Export asli untuk fit distribusi")
+    parser.add_argument('--profile', help="Pakai profil JSON (hasil --save-profile) alih-alih fit ulang")
+    parser.add_argument('--save-profile', help="Simpan profil hasil fit ke JSON")
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--product-scale', type=int, default=1, help="Kalikan jumlah produk/asal daerah")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help="Thread encoder (default: jumlah CPU)")
+    args = parser.parse_args(argv)
+
+    profile = load_profile(args.profile) if args.profile else fit_profile(args.source)
+    if args.save_profile:
+        save_profile(profile, args.save_profile)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    summary = generate_sales_export(
+        args.out, args.rows, profile, seed=args.seed,
+        months=args.months, product_scale=args.product_scale, workers=args.workers,
+    )
+    mb = summary['bytes'] / 2 ** 20
+    print(f"✅ {summary['rows']:,} baris, {mb:,.1f} MB dalam {summary['seconds']:.1f} s "
+          f"({mb / summary['seconds']:,.0f} MB/s) -> {args.out}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
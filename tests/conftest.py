@@ -0,0 +1,38 @@
+"""
+conftest.py - Fixture bersama untuk test
+Modul aplikasi berada di root repo (flat), jadi root ditambahkan ke sys.path
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from constants import DATA_FILES  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def export_lines():
+    """(header, baris data, trailer) dari export penjualan contoh, masing-masing bytes dengan CRLF"""
+    with open(os.path.join(ROOT, DATA_FILES['transactions']), 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    return lines[0], lines[1:-1], lines[-1]
+
+
+@pytest.fixture
+def write_export(tmp_path, export_lines):
+    """Tulis export berisi baris data tertentu (+ trailer TOTAL) ke file di tmp_path"""
+    header, _, trailer = export_lines
+    path = tmp_path / 'Transaksi-Penjualan.csv'
+
+    def write(rows):
+        previous = path.stat().st_mtime_ns if path.exists() else None
+        path.write_bytes(header + b''.join(rows) + trailer)
+        if previous is not None:
+            # mtime pasti berubah walau ditulis dalam tick clock yang sama
+            os.utime(path, ns=(previous + 1_000_000, previous + 1_000_000))
+        return str(path)
+    return write
@@ -0,0 +1,63 @@
+"""
+test_backends.py - Semua backend harus menghasilkan metrics, trend dan preferensi yang sama
+"""
+
+import pandas as pd
+import pytest
+
+from backends import PandasBackend, ProcessPoolBackend, SparkBackend, split_ranges
+
+
+@pytest.fixture
+def source(write_export, export_lines):
+    _, rows, _ = export_lines
+    return write_export(rows)
+
+
+def assert_same_results(backend, expected, source):
+    cube = backend.cube(source)
+    result = backend.metrics(cube=cube)
+    assert result.pop('avg_price') == pytest.approx(expected['metrics']['avg_price'])
+    assert result == {k: v for k, v in expected['metrics'].items() if k != 'avg_price'}
+    pd.testing.assert_frame_equal(backend.monthly_trend(cube=cube), expected['monthly'],
+                                  check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(backend.trend(cube=cube), expected['trend'], check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(backend.preference(cube=cube), expected['preference'],
+                                  check_dtype=False, rtol=1e-9)
+
+
+@pytest.fixture
+def expected(source):
+    backend = PandasBackend()
+    cube = backend.cube(source)
+    return {
+        'metrics': backend.metrics(cube=cube),
+        'monthly': backend.monthly_trend(cube=cube),
+        'trend': backend.trend(cube=cube),
+        'preference': backend.preference(cube=cube),
+    }
+
+
+def test_process_pool_with_small_chunks_matches_pandas(source, expected):
+    backend = ProcessPoolBackend(workers=2, chunk_bytes=4_096)
+    # Pastikan sumber benar-benar dipotong ke banyak rentang (dan merge_cubes k-way terpakai)
+    assert len(backend.tasks(source)) > 5
+    assert_same_results(backend, expected, source)
+
+
+def test_split_ranges_cover_every_row(source):
+    with open(source, 'rb') as f:
+        header = f.readline()
+        body = f.read()
+    ranges = split_ranges(source, len(header) + len(body), 1_000)
+    with open(source, 'rb') as f:
+        data = f.read()
+    assert b''.join(data[begin:end] for begin, end in ranges) == body
+    assert all(data[end - 1:end] == b'\n' for _, end in ranges[:-1])
+
+
+def test_spark_matches_pandas(source, expected):
+    pytest.importorskip('pyspark')
+    if not SparkBackend.available():
+        pytest.skip('Java tidak tersedia untuk PySpark')
+    assert_same_results(SparkBackend(master='local[2]'), expected, source)
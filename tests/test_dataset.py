@@ -0,0 +1,54 @@
+"""
+test_dataset.py - Folder partisi: urutan partisi stabil dan pruning per periode
+"""
+
+import pandas as pd
+
+from ingest import TransactionDataset, filter_months, ingest_parts
+
+
+def write_partitions(root, export_lines, layout):
+    """Tulis satu export per partisi; layout = {relpath: [kode bulan, ...]}"""
+    header, rows, trailer = export_lines
+    for relpath, months in layout.items():
+        path = root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        selected = [row for row in rows if row.split(b';')[1].decode() in months]
+        path.write_bytes(header + b''.join(selected) + trailer)
+    return str(root)
+
+
+def test_partition_order_does_not_depend_on_manifest(tmp_path, export_lines):
+    # Partisi tanpa petunjuk bulan di path ('east', 'west') di antara partisi ber-path bulan
+    root = write_partitions(tmp_path, export_lines, {
+        'sales-2025-01.csv': ['Jan-2025'],
+        'west.csv': ['Feb-2025', 'Mar-2025'],
+        'east.csv': ['Apr-2025'],
+        'year=2025/month=05/part.csv': ['May-2025'],
+    })
+    dataset = TransactionDataset(root)
+    before = [p['relpath'] for p in dataset.partitions()]
+    first = dataset.load()
+
+    # Manifest sekarang berisi bulan asli tiap partisi; urutan dan bagian frame tetap
+    assert [p['relpath'] for p in dataset.partitions()] == before
+    second = dataset.load()
+    assert ingest_parts(second) == ingest_parts(first)
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_period_reads_only_overlapping_partitions(tmp_path, export_lines):
+    months = ['Jan-2025', 'Feb-2025', 'Mar-2025', 'Apr-2025', 'May-2025', 'Jun-2025']
+    root = write_partitions(tmp_path, export_lines, {
+        f'year=2025/month={i:02d}/part.csv': [month] for i, month in enumerate(months, start=1)
+    })
+    dataset = TransactionDataset(root)
+    full = dataset.load()
+
+    df = dataset.load('2025-02', '2025-04')
+    assert df.attrs['ingest']['partitions_read'] == 3
+    assert df.attrs['ingest']['partitions_total'] == 6
+    expected = filter_months(full, '2025-02', '2025-04')
+    pd.testing.assert_frame_equal(
+        df.reset_index(drop=True), expected.reset_index(drop=True), check_categorical=False,
+    )
@@ -0,0 +1,27 @@
+"""
+test_forecast.py - Holt-Winters per seri harus mengembalikan trend seri linear
+"""
+
+import numpy as np
+import pytest
+
+from constants import FORECAST_CONFIG
+from forecast import fit_series
+
+
+@pytest.mark.parametrize('beta', [0.05, 0.3])
+def test_linear_series_recovers_slope(monkeypatch, beta):
+    # Satu nilai beta > 0 di grid: trend tetap di-update tiap bulan
+    monkeypatch.setitem(FORECAST_CONFIG, 'beta_grid', (beta,))
+    months = np.arange(10, dtype='float64')[:, None]
+    slopes = np.array([3.0, 0.5, -2.0])
+    y = 100.0 + months * slopes
+
+    model = fit_series(y, horizon=4)
+    assert not model['seasonal']
+    np.testing.assert_allclose(model['beta'], beta)
+    np.testing.assert_allclose(model['trend'], slopes)
+    np.testing.assert_allclose(model['level'], y[-1])
+    np.testing.assert_allclose(model['sse'], 0.0, atol=1e-9)
+    expected = 100.0 + (10 + np.arange(4.0))[:, None] * slopes
+    np.testing.assert_allclose(model['forecast'], np.maximum(expected, 0.0))
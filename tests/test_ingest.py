@@ -0,0 +1,90 @@
+"""
+test_ingest.py - Load inkremental export transaksi harus identik dengan parse ulang penuh
+"""
+
+import json
+
+import pandas as pd
+
+from ingest import appended_from, cache_paths, ingest_parts, load_transactions, read_transactions_csv
+
+
+def assert_same_frame(df, path):
+    """Frame hasil load sama dengan parse langsung file saat ini (tanpa cache)"""
+    fresh = read_transactions_csv(path)
+    pd.testing.assert_frame_equal(
+        df.reset_index(drop=True), fresh.reset_index(drop=True), check_categorical=False,
+    )
+
+
+def test_appended_rows_match_fresh_parse(write_export, export_lines):
+    _, rows, _ = export_lines
+    path = write_export(rows[:400])
+    first = load_transactions(path)
+    assert first.attrs['ingest']['source'] == 'csv'
+    assert_same_frame(first, path)
+
+    # Dua kali append: tiap kali hanya byte setelah checkpoint yang di-parse
+    for count in (700, len(rows)):
+        path = write_export(rows[:count])
+        df = load_transactions(path)
+        assert df.attrs['ingest']['source'] == 'append'
+        assert appended_from(df)['rows'] < count
+        assert len(df) == count
+        assert_same_frame(df, path)
+
+    # Load berikutnya tanpa perubahan dilayani cache dengan isi yang sama
+    cached = load_transactions(path)
+    assert cached.attrs['ingest']['source'] in ('shared', 'cache')
+    assert_same_frame(cached, path)
+
+
+def test_modified_prefix_forces_full_parse(write_export, export_lines):
+    _, rows, _ = export_lines
+    load_transactions(write_export(rows[:400]))
+
+    # Qty baris awal diubah sekaligus file bertambah: prefix lama tidak boleh dipakai
+    fields = rows[10].split(b';')
+    fields[7] = str(int(fields[7]) + 5).encode()
+    changed = [*rows[:10], b';'.join(fields), *rows[11:]]
+    path = write_export(changed)
+    df = load_transactions(path)
+    assert df.attrs['ingest']['source'] == 'csv'
+    assert appended_from(df) is None
+    assert_same_frame(df, path)
+
+
+def test_rewritten_tail_without_growth(write_export, export_lines):
+    _, rows, _ = export_lines
+    load_transactions(write_export(rows[:400]))
+
+    # Ukuran file sama, isi baris terakhir berbeda
+    fields = rows[399].split(b';')
+    fields[3] = fields[3][::-1]
+    path = write_export([*rows[:399], b';'.join(fields)])
+    df = load_transactions(path)
+    assert df.attrs['ingest']['source'] == 'csv'
+    assert_same_frame(df, path)
+
+
+def test_checkpoint_segments_are_coalesced(write_export, export_lines):
+    _, rows, _ = export_lines
+    load_transactions(write_export(rows[:200]))
+
+    # Banyak append kecil: manifest tetap prefix gabungan + segmen terakhir
+    for count in range(300, len(rows), 100):
+        path = write_export(rows[:count])
+        df = load_transactions(path)
+        assert df.attrs['ingest']['source'] == 'append'
+        assert_same_frame(df, path)
+        with open(cache_paths(path)[1], encoding='utf-8') as f:
+            segments = json.load(f)['segments']
+        assert len(segments) == 2
+        assert [part['rows'] for part in ingest_parts(df)] == [count - 100, 100]
+
+    # Perubahan di dalam prefix gabungan tetap terdeteksi lewat hash kumulatifnya
+    changed = [rows[0].replace(b';26;', b';40;', 1), *rows[1:]]
+    path = write_export(changed)
+    df = load_transactions(path)
+    assert df.attrs['ingest']['source'] == 'csv'
+    assert_same_frame(df, path)
@@ -0,0 +1,63 @@
+"""
+test_metrics.py - calculate_metrics harus sama dengan agregasi pandas biasa, termasuk nilai kosong
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import read_transactions_csv
+from utils import calculate_metrics, calculate_metrics_chunked
+
+
+def expected_metrics(df):
+    """Referensi: sum / mean / min / max / value_counts pandas (nilai kosong dilewati)"""
+    return {
+        'total_revenue': df['Jumlah'].sum(),
+        'total_volume': df['Qty Kg'].sum(),
+        'avg_price': df['Jumlah'].mean(),
+        'total_transactions': len(df),
+        'date_range': f"{df['Tanggal'].min().strftime('%d/%m/%Y')} - {df['Tanggal'].max().strftime('%d/%m/%Y')}",
+        'top_product': df['Asal Daerah'].value_counts().index[0],
+    }
+
+
+@pytest.fixture
+def transactions(write_export, export_lines):
+    _, rows, _ = export_lines
+    return read_transactions_csv(write_export(rows))
+
+
+@pytest.fixture
+def with_missing(transactions):
+    """Frame dengan NaN di revenue / volume / produk dan NaT di Tanggal (termasuk baris pertama & terakhir)"""
+    df = transactions.astype({'Jumlah': 'float64', 'Qty Kg': 'float64', 'Asal Daerah': 'object'})
+    rng = np.random.default_rng(0)
+    for column in ('Jumlah', 'Qty Kg', 'Asal Daerah', 'Tanggal'):
+        rows = np.concatenate([[0, len(df) - 1], rng.choice(len(df), 40, replace=False)])
+        df.loc[rows, column] = pd.NaT if column == 'Tanggal' else np.nan
+    return df
+
+
+@pytest.mark.parametrize('product_dtype', ['object', 'category'])
+def test_missing_values_are_skipped(with_missing, product_dtype):
+    df = with_missing.astype({'Asal Daerah': product_dtype})
+    result = calculate_metrics(df)
+    expected = expected_metrics(df)
+    assert result.pop('avg_price') == pytest.approx(expected.pop('avg_price'))
+    assert result == expected
+
+
+def test_chunked_matches_single_pass(with_missing):
+    chunks = [with_missing.iloc[begin:begin + 200] for begin in range(0, len(with_missing), 200)]
+    result = calculate_metrics_chunked(chunks)
+    expected = calculate_metrics(with_missing)
+    assert result.pop('avg_price') == pytest.approx(expected.pop('avg_price'))
+    assert result == expected
+
+
+def test_complete_frame_matches_pandas(transactions):
+    result = calculate_metrics(transactions)
+    expected = expected_metrics(transactions)
+    assert result.pop('avg_price') == pytest.approx(expected.pop('avg_price'))
+    assert result == expected
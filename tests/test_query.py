@@ -0,0 +1,75 @@
+"""
+test_query.py - Halaman Query hanya boleh membaca tabel transaksi, di engine mana pun
+"""
+
+import pytest
+
+import query
+from ingest import read_transactions_csv
+
+REJECTED = [
+    "WITH t AS (SELECT 1) DELETE FROM transaksi",
+    "SELECT * FROM pragma_table_info('transaksi')",
+    "SELECT load_extension('mod_spatialite')",
+    "SELECT 1; DROP TABLE transaksi",
+    "SELECT 1 /* ; */; DELETE FROM transaksi",
+    "DELETE FROM transaksi",
+]
+
+
+@pytest.fixture
+def transactions(write_export, export_lines):
+    _, rows, _ = export_lines
+    return read_transactions_csv(write_export(rows))
+
+
+@pytest.fixture(params=['sqlite', 'duckdb'])
+def engine(request, monkeypatch):
+    if request.param == 'duckdb':
+        pytest.importorskip('duckdb')
+    monkeypatch.setattr(query, 'engine_name', lambda: request.param)
+    monkeypatch.setattr(query, '_engines', {})
+    return request.param
+
+
+@pytest.mark.parametrize('sql', REJECTED)
+def test_non_read_queries_are_rejected(engine, transactions, sql):
+    with pytest.raises(ValueError):
+        query.execute_query(transactions, 'v1', sql)
+    # Tabel tetap utuh setelah query yang ditolak
+    result = query.execute_query(transactions, 'v1', 'SELECT COUNT(*) AS n FROM transaksi')
+    assert result['frame']['n'].tolist() == [len(transactions)]
+
+
+def test_select_matches_pandas(engine, transactions):
+    result = query.execute_query(
+        transactions, 'v1',
+        'SELECT "Asal Daerah" AS produk, SUM("Qty Kg") AS kg FROM transaksi GROUP BY 1 ORDER BY 1 -- total',
+    )
+    expected = transactions.groupby('Asal Daerah', observed=True)['Qty Kg'].sum()
+    assert result['engine'] == engine
+    assert result['frame']['produk'].tolist() == [str(p) for p in expected.index]
+    assert result['frame']['kg'].tolist() == pytest.approx(expected.tolist())
+
+
+def test_duckdb_wraps_query_as_subquery(transactions, monkeypatch):
+    pytest.importorskip('duckdb')
+    monkeypatch.setattr(query, '_engines', {})
+    engine = query._DuckDBEngine(transactions)
+    cursor, timer = engine.cursor('SELECT COUNT(*) FROM transaksi')
+    timer.cancel()
+    assert cursor.fetchall() == [(len(transactions),)]
+    # Statement selain query tidak lolos parser di dalam SELECT * FROM (...)
+    for sql in ("WITH t AS (SELECT 1) DELETE FROM transaksi", "SET threads = 1"):
+        with pytest.raises(Exception):
+            engine.cursor(sql)
+    # Akses file dimatikan
+    with pytest.raises(Exception):
+        engine.cursor("SELECT * FROM read_csv_auto('data/trend_analysis_results.csv')")
+
+
+def test_validate_read_only_ignores_semicolons_in_literals():
+    query.validate_read_only("SELECT ';' AS a, \";\" FROM transaksi;")
+    with pytest.raises(ValueError):
+        query.validate_read_only("SELECT 1; SELECT 2")
+    assert query.normalize_query("SELECT  1 -- x\n;") == 'SELECT 1'
@@ -0,0 +1,24 @@
+"""
+test_simulation.py - Band Monte Carlo harus identik untuk seed yang sama, berapa pun jumlah worker
+"""
+
+import numpy as np
+
+from simulation import simulate_growth
+
+
+def test_same_seed_same_bands_across_workers():
+    rng = np.random.default_rng(0)
+    changes = {'qty': rng.normal(0.02, 0.1, 11), 'price': rng.normal(0.0, 0.05, 11)}
+    kwargs = {'months': 6, 'paths': 10_000, 'seed': 7, 'chunk_paths': 1_500}
+
+    single = simulate_growth(changes, workers=1, **kwargs)
+    pooled = simulate_growth(changes, workers=3, **kwargs)
+    assert single.keys() == pooled.keys()
+    for key in single:
+        np.testing.assert_array_equal(single[key], pooled[key])
+
+    # Seed lain memberi band berbeda (hasil memang bergantung pada seed)
+    other = simulate_growth(changes, workers=1, **dict(kwargs, seed=8))
+    assert not np.array_equal(single['p50'], other['p50'])
+    assert single['p5'][-1] < single['p50'][-1] < single['p95'][-1]
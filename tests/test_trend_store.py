@@ -0,0 +1,99 @@
+"""
+test_trend_store.py - Statistik trend inkremental harus identik dengan fit ulang penuh
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics import TrendStatsStore, compute_trend_results, sync_trend_store
+from ingest import load_transactions, read_transactions_csv
+
+
+def assert_same_trend(result, df):
+    """Tabel trend sama dengan compute_trend_results atas seluruh frame"""
+    expected = compute_trend_results(df)
+    pd.testing.assert_frame_equal(
+        result.sort_values('Produk', ignore_index=True),
+        expected.sort_values('Produk', ignore_index=True),
+        check_dtype=False, rtol=1e-9,
+    )
+
+
+def month_slices(df, months):
+    mask = np.isin(df['Tanggal'].values.astype('datetime64[M]'), np.asarray(months, dtype='datetime64[M]'))
+    return df[mask]
+
+
+def test_out_of_order_months_match_full_refit(write_export, export_lines):
+    _, rows, _ = export_lines
+    df = read_transactions_csv(write_export(rows))
+    months = np.unique(df['Tanggal'].values.astype('datetime64[M]'))
+
+    # Bulan akhir dulu, lalu bulan awal (base_month digeser), lalu bulan tengah
+    store = TrendStatsStore()
+    for chunk in (months[8:], months[:3], months[3:8]):
+        store.update(month_slices(df, chunk))
+    assert store.rows == len(df)
+    assert_same_trend(store.results(), df)
+
+
+def test_new_products_in_later_update_match_full_refit(write_export, export_lines):
+    _, rows, _ = export_lines
+    df = read_transactions_csv(write_export(rows))
+    late = df['Asal Daerah'].isin(df['Asal Daerah'].unique()[:2])
+
+    # Dua produk baru muncul di update kedua, dengan bulan yang sudah ada di store
+    store = TrendStatsStore()
+    store.update(df[~late])
+    affected = store.update(df[late])
+    assert len(affected) == 2
+    assert_same_trend(store.results(), df)
+
+
+def test_sync_after_append_and_rewrite(tmp_path, write_export, export_lines):
+    _, rows, _ = export_lines
+    store_path = str(tmp_path / 'trend_store.npz')
+    sync_trend_store(load_transactions(write_export(rows[:400])), store_path)
+
+    # Append: store lama dilanjutkan dengan baris baru saja
+    df = load_transactions(write_export(rows))
+    store = sync_trend_store(df, store_path)
+    assert store.rows == len(df)
+    assert_same_trend(store.results(), df)
+
+    # Prefix berubah: store dibangun ulang dari frame baru
+    changed = [rows[0].replace(b';26;', b';40;', 1), *rows[1:]]
+    df = load_transactions(write_export(changed))
+    store = sync_trend_store(df, store_path)
+    assert store.rows == len(df)
+    assert_same_trend(store.results(), df)
+
+
+def test_rows_without_product_or_date_are_skipped(write_export, export_lines):
+    _, rows, _ = export_lines
+    df = read_transactions_csv(write_export(rows)).astype({'Asal Daerah': 'object'})
+    df.loc[[0, 5, len(df) - 1], 'Asal Daerah'] = np.nan
+    df.loc[[7, 9], 'Tanggal'] = pd.NaT
+
+    # Baris kosong tidak dibukukan ke produk lain, tapi tetap dihitung sebagai posisi baris
+    store = TrendStatsStore()
+    store.update(df.iloc[:300])
+    store.update(df.iloc[300:])
+    assert store.rows == len(df)
+    assert_same_trend(store.results(), df.dropna(subset=['Asal Daerah', 'Tanggal']))
+
+
+def test_sync_stays_incremental_across_many_appends(tmp_path, write_export, export_lines, monkeypatch):
+    _, rows, _ = export_lines
+    store_path = str(tmp_path / 'trend_store.npz')
+    sync_trend_store(load_transactions(write_export(rows[:200])), store_path)
+
+    updates = []
+    update = TrendStatsStore.update
+    monkeypatch.setattr(TrendStatsStore, 'update', lambda self, df: updates.append(len(df)) or update(self, df))
+    # Checkpoint ingest menggabungkan segmen lama; store tetap hanya menghitung baris baru
+    for count in range(300, len(rows), 100):
+        df = load_transactions(write_export(rows[:count]))
+        store = sync_trend_store(df, store_path)
+        assert updates[-1] == 100
+        assert_same_trend(store.results(), df)
@@ -3,54 +3,365 @@ utils.py - Utility functions untuk Streamlit Dashboard
 Berisi helper functions untuk data loading, processing, dan visualization
 """
 
-import pandas as pd
-import numpy as np
+import hashlib
+import os
+
 import streamlit as st
 from datetime import datetime, timedelta
-from constants import DATA_FILES, PRODUCTS, COLORS
-import plotly.graph_objects as go
-import plotly.express as px
+from constants import (
+    DATA_FILES, PRODUCTS, COLORS, HEATMAP_CONFIG, QUERY_CONFIG,
+    AMOUNT_COLUMNS, CATEGORICAL_COLUMNS, NARROW_INT_COLUMNS,
+)
+from ingest import (
+    TransactionDataset, appended_from, cache_file, data_version,
+    load_transactions, read_transactions_csv,
+)
+from analytics import (
+    build_cube, build_cube_index, condense_preference_matrix, cube_metrics, cube_monthly_revenue,
+    cube_preference_matrix, cube_trend_results, merge_cubes, preference_percentages, preference_table, select_cells,
+    sync_trend_store,
+)
+from forecast import fit_forecasts
+from instrument import cache_miss, span, timed
+from query import execute_query
+from lazy import lazy_import
+from refresh import stale_while_revalidate
+from shared_cache import open_arrays, shared_artifact
+from simulation import simulate_cube
+
+# Modul berat di-import saat data / chart pertama dibutuhkan
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
+
+# ==================== SCHEMA ====================
+
+def apply_transaction_schema(df):
+    """
+    Ubah kolom teks ke categorical dan angka ke integer sempit. Jumlah (IDR)
+    hanya tetap int64 jika nilainya tidak muat di int32
+    """
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column, dtype in NARROW_INT_COLUMNS.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    int32 = np.iinfo('int32')
+    for column in AMOUNT_COLUMNS:
+        if column in df.columns and len(df[column]):
+            values = df[column]
+            fits = int32.min <= values.min() and values.max() <= int32.max
+            df[column] = values.astype('int32' if fits else 'int64')
+    return df
+
+def read_typed_transactions(path):
+    """Parse CSV transaksi lalu terapkan schema compact"""
+    return apply_transaction_schema(read_transactions_csv(path))
+
+def memory_report(df):
+    """Pemakaian memory (bytes) per kolom, termasuk isi string object"""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'Kolom': usage.index,
+        'Dtype': [str(df[column].dtype) for column in usage.index],
+        'Bytes': usage.values,
+    })
+    report.loc[len(report)] = ['TOTAL', '', int(usage.sum())]
+    return report
 
 # ==================== DATA LOADING ====================
+# Loader publik memakai stale-while-revalidate (refresh.py): setelah TTL habis
+# data lama tetap disajikan sementara thread latar belakang memuat ulang
 
-@st.cache_data(ttl=3600)
+# Loader bisa berjalan di thread refresh (tanpa konteks script Streamlit), jadi
+# tidak memanggil API st.*; pesan error ditampilkan app.py dari refresh_status()
+
+def _missing_transactions(exc):
+    """Fallback load pertama: file sumber belum ada -> frame kosong (error tercatat di status loader)"""
+    if not isinstance(exc, FileNotFoundError):
+        raise exc
+    return pd.DataFrame()
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, version=data_version, fallback=_missing_transactions)
+@cache_miss
 def load_transaction_data():
-    """Load data transaksi dari CSV"""
-    try:
-        df = pd.read_csv(DATA_FILES['transactions'])
-        # Ensure date column
-        if 'Tanggal' in df.columns:
-            df['Tanggal'] = pd.to_datetime(df['Tanggal'])
-        return df
-    except FileNotFoundError:
-        st.error(f"File tidak ditemukan: {DATA_FILES['transactions']}")
-        return pd.DataFrame()
+    """
+    Load seluruh data transaksi (dari cache kolumnar jika CSV sumber tidak
+    berubah). Filter periode halaman cube bekerja di atas sel cube, jadi frame
+    selalu utuh (periode frame mentah: load_transaction_period); frame dikembalikan tanpa pickle/copy: kolomnya menunjuk ke
+    mmap read-only dari cache bersama (juga untuk folder partisi)
+    """
+    if os.path.isdir(DATA_FILES['transactions_dir']):
+        dataset = TransactionDataset(DATA_FILES['transactions_dir'], parser=read_typed_transactions)
+        return dataset.load()
+    return load_transactions(DATA_FILES['transactions'], parser=read_typed_transactions)
+
+def dataset_months():
+    """
+    Bulan yang dicakup folder partisi menurut manifest / path, tanpa membaca
+    data. None jika tidak ada folder partisi atau ada partisi tanpa info bulan
+    """
+    if not os.path.isdir(DATA_FILES['transactions_dir']):
+        return None
+    partitions = TransactionDataset(DATA_FILES['transactions_dir']).partitions()
+    if not partitions or any(p['min_month'] is None for p in partitions):
+        return None
+    first = min(np.datetime64(p['min_month'], 'M') for p in partitions)
+    last = max(np.datetime64(p['max_month'], 'M') for p in partitions)
+    return np.arange(first, last + 1)
+
+@timed(kind='loader')
+@st.cache_resource(ttl=3600, max_entries=4, show_spinner=False)
+@cache_miss
+def _load_period_for_version(start, end, version):
+    """Satu entry per periode & versi file partisi; frame dipakai bersama, jangan diubah"""
+    dataset = TransactionDataset(DATA_FILES['transactions_dir'], parser=read_typed_transactions)
+    return dataset.load(start, end)
+
+def load_transaction_period(start, end):
+    """
+    Transaksi satu periode dari folder partisi: hanya partisi yang rentang
+    bulannya beririsan dengan [start, end] yang dibaca (partition pruning)
+    """
+    partitions = TransactionDataset(DATA_FILES['transactions_dir']).partitions()
+    version = tuple((p['relpath'], p['size'], p['mtime_ns']) for p in partitions)
+    return _load_period_for_version(str(start), str(end), version)
 
-@st.cache_data(ttl=3600)
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_transaction_data',))
+@cache_miss
 def load_trend_results():
-    """Load hasil trend analysis"""
-    try:
-        df = pd.read_csv(DATA_FILES['trend_results'])
-        return df
-    except FileNotFoundError:
-        st.error(f"File tidak ditemukan: {DATA_FILES['trend_results']}")
+    """
+    Trend analysis per produk dari data transaksi. Statistik disimpan di disk,
+    sehingga baris baru hanya meng-update produk yang terdampak
+    """
+    df = load_transaction_data()
+    if df.empty or 'Qty Kg' not in df.columns:
         return pd.DataFrame()
+    store = sync_trend_store(df, cache_file(DATA_FILES['transactions'], '.trend_stats.npz'))
+    return store.results()
 
-@st.cache_data(ttl=3600)
+@timed(kind='aggregation')
+def _build_cube_for_version(df, version):
+    """
+    Cube hanya dibangun ulang jika versi data berubah, sekali untuk semua
+    worker (artefak bersama di disk; per proses sudah di-cache load_sales_cube).
+    Jika frame = versi lama + baris yang di-append, cube versi lama cukup
+    digabung dengan cube baris baru
+    """
+    root = cache_file(DATA_FILES['transactions'], '.shared')
+
+    def build():
+        appended = appended_from(df)
+        base = open_arrays(os.path.join(root, appended['version'], 'cube')) if appended else None
+        if base is None:
+            return build_cube(df)
+        return merge_cubes(base, build_cube(df.iloc[appended['rows']:]))
+    return shared_artifact(root, version, 'cube', build)
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_transaction_data',))
+@cache_miss
+def load_sales_cube():
+    """OLAP cube bulan × produk × kategori kedai × asal daerah untuk semua widget"""
+    df = load_transaction_data()
+    if df.empty or 'Qty Kg' not in df.columns:
+        return build_cube(pd.DataFrame())
+    return _build_cube_for_version(df, data_version(df))
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_sales_cube',))
+@cache_miss
+def load_cube_index():
+    """Index per dimensi atas sel cube untuk filter sidebar"""
+    return build_cube_index(load_sales_cube())
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_sales_cube',))
+@cache_miss
+def load_preference_matrix():
+    """Matrix jumlah transaksi & revenue produk × kategori kedai"""
+    return cube_preference_matrix(load_sales_cube())
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_preference_matrix',))
+@cache_miss
 def load_preference_results():
-    """Load hasil preference analysis"""
-    try:
-        df = pd.read_csv(DATA_FILES['preference_results'])
-        return df
-    except FileNotFoundError:
-        st.error(f"File tidak ditemukan: {DATA_FILES['preference_results']}")
-        return pd.DataFrame()
+    """Hasil preference analysis (bentuk tabel) dari matrix preferensi"""
+    return preference_table(load_preference_matrix())
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_sales_cube',))
+@cache_miss
+def load_forecast():
+    """
+    Model forecast kg & revenue per produk × kategori kedai. Di-fit sekali per
+    versi data dan dibagi ke semua worker lewat cache bersama
+    """
+    cube = load_sales_cube()
+    version = data_version(load_transaction_data())
+    if version is None:
+        return fit_forecasts(cube)
+    root = cache_file(DATA_FILES['transactions'], '.shared')
+    return shared_artifact(root, version, 'forecast', lambda: fit_forecasts(cube))
+
+@timed(kind='loader')
+@stale_while_revalidate(ttl=3600, after=('load_sales_cube',))
+@cache_miss
+def load_revenue_scenarios():
+    """Band percentil Monte Carlo pertumbuhan revenue dari histori (seed tetap)"""
+    return simulate_cube(load_sales_cube())
+
+@timed(kind='loader')
+@st.cache_resource(max_entries=QUERY_CONFIG['cache_entries'], show_spinner=False)
+@cache_miss
+def run_query(normalized_sql, version, _df):
+    """
+    Hasil query SQL read-only, di-cache per (query ternormalisasi, versi data).
+    Hasil dipakai bersama lintas sesi: jangan dimutasi oleh pemanggil
+    """
+    return execute_query(_df, version, normalized_sql)
+
+# ==================== PAGE DATA ====================
+
+# Artefak yang bisa diminta halaman; tanpa filter dijawab loader ber-cache
+# (dipakai bersama lintas halaman), dengan filter dihitung dari cube
+PAGE_ARTIFACTS = {
+    'transactions': lambda data: (
+        load_transaction_data() if data.period is None
+        else load_transaction_period(*data.period)
+    ),
+    'cube': lambda data: load_sales_cube(),
+    'trend': lambda data: (
+        load_trend_results() if data.selection is None
+        else cube_trend_results(data.resolve('cube'), data.selection)
+    ),
+    'preference_matrix': lambda data: (
+        load_preference_matrix() if data.selection is None
+        else cube_preference_matrix(data.resolve('cube'), mask=data.selection)
+    ),
+    'preference': lambda data: (
+        load_preference_results() if data.selection is None
+        else preference_table(data.resolve('preference_matrix'))
+    ),
+    'metrics': lambda data: cube_metrics(data.resolve('cube'), data.selection),
+    'monthly_revenue': lambda data: cube_monthly_revenue(data.resolve('cube'), data.selection),
+    'forecast': lambda data: (
+        load_forecast() if data.selection is None
+        else fit_forecasts(data.resolve('cube'), mask=data.selection)
+    ),
+    'scenarios': lambda data: (
+        load_revenue_scenarios() if data.selection is None
+        else simulate_cube(data.resolve('cube'), data.selection)
+    ),
+}
+
+class PageData:
+    """
+    Akses lazy ke artefak yang dideklarasikan sebuah halaman. Tiap artefak
+    dihitung saat pertama diakses lalu dipakai ulang selama satu run.
+    `selection` memfilter sel cube, `period` (start, end) memfilter partisi
+    yang dibaca untuk frame transaksi mentah
+    """
+
+    def __init__(self, needs, selection=None, period=None):
+        self.needs = set(needs)
+        self.selection = selection
+        self.period = period
+        self._values = {}
+
+    def resolve(self, name):
+        if name not in self._values:
+            with span(f"artifact:{name}", 'artifact'):
+                self._values[name] = PAGE_ARTIFACTS[name](self)
+        return self._values[name]
+
+    def __getitem__(self, name):
+        if name not in self.needs:
+            raise KeyError(f"Artefak '{name}' tidak dideklarasikan untuk halaman ini")
+        return self.resolve(name)
 
 # ==================== DATA PROCESSING ====================
 
-def calculate_metrics(df):
-    """Hitung key metrics dari transaction data"""
-    if df.empty:
+def transaction_columns(df):
+    """
+    Nama kolom revenue, volume dan produk. Export penjualan memakai
+    Jumlah (IDR) / Qty Kg / Asal Daerah, CSV lama memakai Harga / Jumlah / Produk
+    """
+    if 'Qty Kg' in df.columns:
+        return {'revenue': 'Jumlah', 'volume': 'Qty Kg', 'product': 'Asal Daerah'}
+    return {'revenue': 'Harga', 'volume': 'Jumlah', 'product': 'Produk'}
+
+def _metric_partials(df):
+    """
+    Satu kali lewat per kolom (array NumPy contiguous): jumlah revenue & volume,
+    min/max tanggal sebagai int64 dan jumlah transaksi per produk via bincount.
+    Nilai kosong (NaN / NaT / produk kosong) dilewati, seperti sum/min/value_counts
+    """
+    cols = transaction_columns(df)
+    partials = {
+        'rows': len(df), 'revenue': 0, 'priced': 0, 'volume': 0,
+        'date_min': None, 'date_max': None, 'products': None,
+    }
+    if not len(df):
+        return partials
+
+    if cols['revenue'] in df.columns:
+        revenue = df[cols['revenue']].to_numpy()
+        if revenue.dtype.kind == 'f':
+            partials['revenue'] = np.nansum(revenue).item()
+            partials['priced'] = int(np.count_nonzero(~np.isnan(revenue)))
+        else:
+            partials['revenue'] = np.add.reduce(revenue).item()
+            partials['priced'] = len(revenue)
+    if cols['volume'] in df.columns:
+        volume = df[cols['volume']].to_numpy()
+        partials['volume'] = (np.nansum(volume) if volume.dtype.kind == 'f' else np.add.reduce(volume)).item()
+    if 'Tanggal' in df.columns:
+        dates = df['Tanggal'].to_numpy(dtype='datetime64[ns]')
+        if np.isnat(dates).any():
+            dates = dates[~np.isnat(dates)]
+        if len(dates):
+            dates = dates.view('int64')
+            partials['date_min'], partials['date_max'] = dates.min().item(), dates.max().item()
+    if cols['product'] in df.columns:
+        products = df[cols['product']]
+        if isinstance(products.dtype, pd.CategoricalDtype):
+            codes, labels = products.cat.codes.to_numpy(), products.cat.categories
+            # Code -1 = produk kosong
+            if len(codes) and codes.min() < 0:
+                codes = codes[codes >= 0]
+            partials['products'] = pd.Series(np.bincount(codes, minlength=len(labels)), index=labels)
+        else:
+            # String: satu hash table (urutan kemunculan, NaN dilewati), tanpa factorize + bincount
+            partials['products'] = products.value_counts(sort=False).rename(None).rename_axis(None)
+    return partials
+
+def _add_counts(a, b):
+    """Jumlahkan hitungan per produk; urutan kemunculan tetap (tie-break top_product seperti value_counts)"""
+    labels = a.index.append(b.index.difference(a.index, sort=False))
+    return a.reindex(labels, fill_value=0) + b.reindex(labels, fill_value=0)
+
+def _merge_metric_partials(left, right):
+    """Gabungkan partial metrics dari dua chunk"""
+    def pick(a, b, fn):
+        return b if a is None else a if b is None else fn(a, b)
+
+    return {
+        'rows': left['rows'] + right['rows'],
+        'revenue': left['revenue'] + right['revenue'],
+        'priced': left['priced'] + right['priced'],
+        'volume': left['volume'] + right['volume'],
+        'date_min': pick(left['date_min'], right['date_min'], min),
+        'date_max': pick(left['date_max'], right['date_max'], max),
+        'products': pick(left['products'], right['products'], _add_counts),
+    }
+
+def _finalize_metrics(partials):
+    if partials['rows'] == 0:
         return {
             'total_revenue': 0,
             'total_volume': 0,
@@ -59,23 +370,42 @@ def calculate_metrics(df):
             'date_range': 'N/A',
             'top_product': 'N/A'
         }
-    
-    metrics = {
-        'total_revenue': df['Harga'].sum() if 'Harga' in df.columns else 0,
-        'total_volume': df['Jumlah'].sum() if 'Jumlah' in df.columns else 0,
-        'avg_price': df['Harga'].mean() if 'Harga' in df.columns else 0,
-        'total_transactions': len(df),
-        'date_range': f"{df['Tanggal'].min().strftime('%d/%m/%Y')} - {df['Tanggal'].max().strftime('%d/%m/%Y')}" if 'Tanggal' in df.columns else 'N/A',
-        'top_product': df['Produk'].value_counts().index[0] if 'Produk' in df.columns else 'N/A'
+
+    if partials['date_min'] is not None:
+        first, last = pd.to_datetime([partials['date_min'], partials['date_max']])
+        date_range = f"{first.strftime('%d/%m/%Y')} - {last.strftime('%d/%m/%Y')}"
+    else:
+        date_range = 'N/A'
+    products = partials['products']
+    return {
+        'total_revenue': partials['revenue'],
+        'total_volume': partials['volume'],
+        'avg_price': partials['revenue'] / partials['priced'] if partials['priced'] else 0,
+        'total_transactions': partials['rows'],
+        'date_range': date_range,
+        'top_product': products.index[int(products.to_numpy().argmax())] if products is not None and len(products) else 'N/A'
     }
-    return metrics
 
+@timed(kind='aggregation')
+def calculate_metrics(df):
+    """Hitung key metrics dari transaction data"""
+    return _finalize_metrics(_metric_partials(df))
+
+def calculate_metrics_chunked(chunks):
+    """Key metrics dari iterable of DataFrame (mis. ingest.iter_sales_export) tanpa memuat semua baris"""
+    partials = _metric_partials(pd.DataFrame())
+    for chunk in chunks:
+        partials = _merge_metric_partials(partials, _metric_partials(chunk))
+    return _finalize_metrics(partials)
+
+@timed(kind='aggregation')
 def get_monthly_trend(df):
     """Get monthly revenue trend"""
     if df.empty or 'Tanggal' not in df.columns:
         return pd.DataFrame()
     
-    df_monthly = df.set_index('Tanggal').resample('M')['Harga'].sum().reset_index()
+    revenue_col = transaction_columns(df)['revenue']
+    df_monthly = df.set_index('Tanggal').resample('M')[revenue_col].sum().reset_index()
     df_monthly.columns = ['Month', 'Revenue']
     return df_monthly
 
@@ -102,21 +432,37 @@ def create_metric_card(label, value, unit=""):
     """
     return card_html
 
-def create_trend_chart(trend_results):
-    """Create interactive trend chart"""
-    if trend_results.empty:
-        return go.Figure()
-    
-    fig = go.Figure()
-    
-    for idx, row in trend_results.iterrows():
-        fig.add_trace(go.Bar(
-            x=[row['Product']],
-            y=[row['Slope']] if 'Slope' in row.index else [0],
-            name=row['Product'],
-            marker_color=COLORS['primary'] if (row['Slope'] if 'Slope' in row.index else 0) > 0 else COLORS['danger'],
-            hovertemplate='<b>%{x}</b><br>Slope: %{y:.2f}<extra></extra>'
-        ))
+def find_column(df, candidates):
+    """Nama kolom pertama dari candidates yang ada di df"""
+    for col_name in candidates:
+        if col_name in df.columns:
+            return col_name
+    return None
+
+def frame_hash(df):
+    """Hash isi DataFrame, dipakai sebagai cache key"""
+    hashed = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+@timed(kind='chart')
+@st.cache_resource(max_entries=32, show_spinner=False)
+@cache_miss
+def _trend_chart_for(key, _products, _slopes):
+    """
+    Figure trend untuk satu isi data (key). Objek Figure yang sama dipakai
+    bersama lintas sesi: jangan dimutasi oleh pemanggil (update_layout dll.)
+    """
+    fig = go.Figure(go.Bar(
+        x=_products,
+        y=_slopes,
+        marker=dict(
+            color=(_slopes > 0).astype('int8'),
+            colorscale=[[0, COLORS['danger']], [1, COLORS['primary']]],
+            cmin=0,
+            cmax=1
+        ),
+        hovertemplate='<b>%{x}</b><br>Slope: %{y:.2f}<extra></extra>'
+    ))
     
     fig.update_layout(
         title="📈 Trend Analysis - Monthly Slope per Product",
@@ -131,45 +477,104 @@ def create_trend_chart(trend_results):
     
     return fig
 
-def create_preference_heatmap(preference_results):
-    """Create preference heatmap visualization"""
-    if preference_results.empty:
+@timed(kind='chart')
+def create_trend_chart(trend_results):
+    """
+    Create interactive trend chart (satu trace Bar, warna per produk dari array).
+    Figure berasal dari cache bersama: tampilkan apa adanya, atau ubah salinannya
+    (go.Figure(fig)) jika perlu diubah
+    """
+    if trend_results.empty:
         return go.Figure()
     
-    # Pivot untuk membuat matrix
-    pivot_data = preference_results.pivot_table(
-        index='Product',
-        columns='Category',
-        values='Preference_Percentage',
-        aggfunc='first'
-    )
+    product_col = find_column(trend_results, ['Produk', 'Product'])
+    slope_col = find_column(trend_results, ['Slope_Kg_Per_Bulan', 'Slope'])
+    chart_data = pd.DataFrame({
+        'product': trend_results[product_col].astype(str).to_numpy(),
+        'slope': trend_results[slope_col].to_numpy(dtype='float64') if slope_col else 0.0,
+    })
+    return _trend_chart_for(frame_hash(chart_data), chart_data['product'].to_numpy(), chart_data['slope'].to_numpy())
+
+@timed(kind='chart')
+def create_preference_heatmap(preference_matrix):
+    """
+    Create preference heatmap visualization dari matrix preferensi. Matrix besar
+    diringkas dulu (top-N + "Lainnya") agar payload tetap di bawah max_cells.
+    """
+    if not len(preference_matrix['products']):
+        return go.Figure()
+    
+    max_categories = min(HEATMAP_CONFIG['max_categories'], len(preference_matrix['categories']))
+    max_products = min(HEATMAP_CONFIG['max_products'], max(2, HEATMAP_CONFIG['max_cells'] // max(max_categories, 1)))
+    view = condense_preference_matrix(preference_matrix, max_products, max_categories)
     
     fig = go.Figure(data=go.Heatmap(
-        z=pivot_data.values,
-        x=pivot_data.columns,
-        y=pivot_data.index,
-        colorscale='Blues',
+        z=np.round(preference_percentages(view), 1).astype('float32'),
+        x=view['categories'],
+        y=view['products'],
+        colorscale=HEATMAP_CONFIG['colorscale'],
         hovertemplate='<b>%{y}</b><br>%{x}: %{z:.1f}%<extra></extra>'
     ))
     
+    title = "🔥 Customer Preference Heatmap - Product × Category"
+    if view['folded']['products']:
+        title += f" (top {len(view['products']) - 1} dari {len(preference_matrix['products'])} produk)"
+    
     fig.update_layout(
-        title="🔥 Customer Preference Heatmap - Product × Category",
+        title=title,
         xaxis_title="Customer Category",
         yaxis_title="Product",
-        height=400,
+        height=max(HEATMAP_CONFIG['height'], HEATMAP_CONFIG['row_height'] * len(view['products'])),
         plot_bgcolor='white',
         paper_bgcolor='white'
     )
     
     return fig
 
-def create_revenue_projection(base_revenue, growth_rate, months=6):
-    """Create revenue projection chart"""
+def latest_month_revenue(monthly):
+    """Revenue bulan terakhir yang berisi transaksi (basis proyeksi per bulan)"""
+    revenue = monthly['Revenue'].to_numpy()
+    active = np.flatnonzero(revenue > 0)
+    return float(revenue[active[-1]]) if len(active) else 0.0
+
+@timed(kind='chart')
+def create_revenue_projection(base_revenue, growth_rate, months=6, scenarios=None):
+    """
+    Create revenue projection chart. base_revenue adalah revenue satu bulan
+    (bulan 0), bukan total periode. `scenarios` (hasil simulation.simulate_growth)
+    menambah band P5-P95 dan median Monte Carlo di atas garis target
+    """
     months_range = np.arange(0, months + 1)
     projected_revenue = base_revenue * (1 + growth_rate/100) ** months_range
     
     fig = go.Figure()
     
+    if scenarios is not None:
+        horizon = months_range[months_range < len(scenarios['month'])]
+        fig.add_trace(go.Scatter(
+            x=horizon,
+            y=base_revenue * scenarios['p95'][horizon],
+            mode='lines',
+            name='Skenario P95',
+            line=dict(color=COLORS['primary'], width=1, dash='dot')
+        ))
+        fig.add_trace(go.Scatter(
+            x=horizon,
+            y=base_revenue * scenarios['p5'][horizon],
+            mode='lines',
+            name='Skenario P5',
+            line=dict(color=COLORS['primary'], width=1, dash='dot'),
+            fill='tonexty',
+            fillcolor='rgba(52, 152, 219, 0.15)'
+        ))
+        fig.add_trace(go.Scatter(
+            x=horizon,
+            y=base_revenue * scenarios['p50'][horizon],
+            mode='lines+markers',
+            name=f"Median ({scenarios['paths']:,} path)",
+            line=dict(color=COLORS['primary'], width=3)
+        ))
+    
     fig.add_trace(go.Scatter(
         x=months_range,
         y=projected_revenue,
@@ -177,12 +582,12 @@ def create_revenue_projection(base_revenue, growth_rate, months=6):
         name='Projected Revenue',
         line=dict(color=COLORS['success'], width=3),
         marker=dict(size=8),
-        fill='tozeroy',
+        fill=None if scenarios is not None else 'tozeroy',
         fillcolor=f'rgba(39, 174, 96, 0.2)'
     ))
     
     fig.update_layout(
-        title="💰 6-Month Revenue Projection (20% Growth)",
+        title=f"💰 {months}-Month Revenue Projection ({growth_rate}% Growth)",
         xaxis_title="Month",
         yaxis_title="Revenue (IDR)",
         height=400,
@@ -193,6 +598,41 @@ def create_revenue_projection(base_revenue, growth_rate, months=6):
     
     return fig
 
+@timed(kind='chart')
+def create_forecast_chart(totals, title, yaxis_title):
+    """Histori (garis) dan forecast (putus-putus) dari forecast.forecast_totals"""
+    history = totals[totals['Jenis'] == 'Histori']
+    # Forecast disambung dari titik histori terakhir
+    future = pd.concat([history.tail(1), totals[totals['Jenis'] == 'Forecast']])
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history['Month'],
+        y=history['Value'],
+        mode='lines+markers',
+        name='Histori',
+        line=dict(color=COLORS['primary'], width=3)
+    ))
+    fig.add_trace(go.Scatter(
+        x=future['Month'],
+        y=future['Value'],
+        mode='lines+markers',
+        name='Forecast',
+        line=dict(color=COLORS['warning'], width=3, dash='dash')
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="Bulan",
+        yaxis_title=yaxis_title,
+        height=400,
+        hovermode='x unified',
+        plot_bgcolor='rgba(240,240,240,0.5)',
+        paper_bgcolor='white'
+    )
+    
+    return fig
+
 # ==================== FORMATTING ====================
 
 def format_currency(value):